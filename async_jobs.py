@@ -0,0 +1,461 @@
+from __future__ import annotations
+
+import asyncio
+import multiprocessing
+import time
+from collections import Counter
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+from typing import Callable
+from typing import Optional
+from urllib.parse import urlsplit
+
+import aiohttp
+
+from configuration.config import ASYNC_COROUTINES_PER_WORKER
+from configuration.config import ASYNC_MAX_CONCURRENCY
+from configuration.config import ASYNC_MAX_CONCURRENCY_PER_HOST
+from configuration.config import JOB_ROLES
+from configuration.config import MAX_BODY_SIZE
+from configuration.config import STREAMING_CHUNK_SIZE
+from helpers import CrawlTask
+from helpers import LoggerT
+from jobs import CareerLinksFetcher
+from jobs import FetchBudget
+from jobs import JobsChecker
+from metrics import get_crawl_metrics
+from politeness import get_politeness_policy
+from politeness import PolitenessPolicy
+from politeness import robots_txt_origin
+from verdict_cache import JobsVerdictCache
+
+
+class AsyncUrlFetcher:
+    """Implements asynchronous url html content fetching (aiohttp based).
+
+    Number of requests in flight is limited globally and per host (semaphore of a host is kept only while
+    its requests are in flight or waiting), so thousands of coroutines can share one fetcher safely.
+    robots.txt rules and crawl delays are respected like in UrlFetcher (robots.txt files are fetched with aiohttp,
+    robots.txt store is used from executor threads and pacing sleeps do not block other coroutines) and at most
+    max body size bytes of every page are downloaded.
+    Requests are counted by outcome and their durations are recorded in crawler metrics.
+
+    Usage:
+        async with aiohttp.ClientSession() as session:
+            www_html_text = await AsyncUrlFetcher(logger, session).fetch(url)
+
+    Args:
+        logger (LoggerT): logger object
+        session (aiohttp.ClientSession): session used for all requests
+        max_concurrency: max number of requests in flight (ASYNC_MAX_CONCURRENCY by default)
+        max_concurrency_per_host: max number of requests in flight per host (ASYNC_MAX_CONCURRENCY_PER_HOST by default)
+        politeness (PolitenessPolicy): politeness policy (politeness policy of the current process by default)
+        max_body_size: max number of bytes downloaded per page (MAX_BODY_SIZE by default)
+
+    Attributes:
+        logger (LoggerT): logger object
+        session (aiohttp.ClientSession): session used for all requests
+        max_body_size (int): max number of bytes downloaded per page
+    """
+
+    TIMEOUT = aiohttp.ClientTimeout(total=5)
+
+    def __init__(
+        self,
+        logger: LoggerT,
+        session: aiohttp.ClientSession,
+        max_concurrency: Optional[int] = None,
+        max_concurrency_per_host: Optional[int] = None,
+        politeness: Optional[PolitenessPolicy] = None,
+        max_body_size: Optional[int] = None,
+    ) -> None:
+        self.logger = logger
+        self.session = session
+        self.max_body_size = max_body_size or MAX_BODY_SIZE
+        self.__politeness = politeness
+        self.__semaphore = asyncio.Semaphore(max_concurrency or ASYNC_MAX_CONCURRENCY)
+        self.__max_concurrency_per_host = max_concurrency_per_host or ASYNC_MAX_CONCURRENCY_PER_HOST
+        self.__host_semaphores: dict[str, asyncio.Semaphore] = {}
+        self.__host_users: Counter[str] = Counter()
+
+    @property
+    def politeness(self) -> Optional[PolitenessPolicy]:
+        """Politeness policy applied to requests (None if politeness is disabled)."""
+        return self.__politeness or get_politeness_policy()
+
+    async def fetch(self, url: str) -> Optional[str]:
+        """Fetches link (http request execution).
+
+        Args:
+            url: website url link
+
+        Returns:
+            Text with website content or None in case of issues
+        """
+        self.logger.info(f"Fetching the given url: {url}")
+
+        if not await self.__allowed(url):
+            self.logger.info(f"Returning None, because robots.txt disallows fetching the given url: {url}.")
+            get_crawl_metrics().inc("finder_fetches_total", label="disallowed")
+            return None
+
+        async with self.__semaphore, self.__host_slot(url):
+            try:
+                return await self.__get(url)
+
+            except aiohttp.ClientSSLError:
+                get_crawl_metrics().inc("finder_fetches_total", label="ssl_error")
+                get_crawl_metrics().inc("finder_ssl_fallbacks_total")
+                if url.startswith("https://"):
+                    url = url.replace("https://", "http://")
+                try:
+                    return await self.__get(url, " [backup http flow]")
+                except Exception as e:
+                    get_crawl_metrics().inc("finder_fetches_total", label=self.error_outcome(e))
+                    self.logger.error(
+                        f"Returning None, because something went wrong with request execution ({url}). "
+                        f"Details: {e!r} [backup http flow]"
+                    )
+                    return None
+
+            except Exception as e:
+                get_crawl_metrics().inc("finder_fetches_total", label=self.error_outcome(e))
+                self.logger.error(
+                    f"Returning None, because something went wrong with request execution ({url}). Details: {e!r}"
+                )
+                return None
+
+    @staticmethod
+    def error_outcome(error: Exception) -> str:
+        """Returns outcome (crawler metrics label) of request which raised the given error.
+
+        Args:
+            error: error raised by request
+
+        Returns:
+            "ssl_error", "timeout", "connection_error" or "error".
+        """
+        if isinstance(error, aiohttp.ClientSSLError):
+            return "ssl_error"
+        if isinstance(error, asyncio.TimeoutError):
+            return "timeout"
+        if isinstance(error, aiohttp.ClientConnectionError):
+            return "connection_error"
+        return "error"
+
+    @asynccontextmanager
+    async def __host_slot(self, url: str) -> AsyncIterator[None]:
+        """Holds one of the request slots of the url host, semaphore of the host is dropped by its last user."""
+        host = urlsplit(url).netloc
+        if host not in self.__host_semaphores:
+            self.__host_semaphores[host] = asyncio.Semaphore(self.__max_concurrency_per_host)
+        self.__host_users[host] += 1
+        try:
+            async with self.__host_semaphores[host]:
+                yield
+        finally:
+            self.__host_users[host] -= 1
+            if not self.__host_users[host]:
+                del self.__host_users[host]
+                del self.__host_semaphores[host]
+
+    async def __allowed(self, url: str) -> bool:
+        """Checks robots.txt rules of the url host and waits for its crawl delay (sleeping only this coroutine).
+
+        Args:
+            url: website url link
+
+        Returns:
+            False if robots.txt disallows fetching the url.
+        """
+        politeness = self.politeness
+        if politeness is None:
+            return True
+
+        # SQLite calls do not block the event loop (robots.txt parser of the host is cached by allows() then).
+        if not await asyncio.to_thread(politeness.has_robots_txt, url):
+            origin = robots_txt_origin(url)
+            async with self.__semaphore, self.__host_slot(url):
+                status_code, body = await self.__fetch_robots_txt(origin)
+            await asyncio.to_thread(politeness.robots_txt_store.save, origin, status_code, body)
+
+        if not await asyncio.to_thread(politeness.allows, url):
+            return False
+        await asyncio.sleep(politeness.reserve(url))
+        return True
+
+    async def __fetch_robots_txt(self, origin: str) -> tuple[int, str]:
+        try:
+            async with self.session.get(origin + "/robots.txt", allow_redirects=True, timeout=self.TIMEOUT) as response:
+                return response.status, await self.__read_text(response, PolitenessPolicy.ROBOTS_TXT_MAX_SIZE)
+        except Exception:
+            return 0, ""
+
+    async def __read_text(self, response: aiohttp.ClientResponse, max_body_size: int) -> str:
+        """Downloads response body chunk after chunk, stopping at max body size.
+
+        Args:
+            response: response with not yet downloaded body
+            max_body_size: max number of bytes downloaded
+
+        Returns:
+            Decoded body (its first max_body_size bytes).
+        """
+        body = bytearray()
+        async for chunk in response.content.iter_chunked(STREAMING_CHUNK_SIZE):
+            body += chunk[: max_body_size - len(body)]
+            if len(body) >= max_body_size:
+                self.logger.debug(
+                    f"Max body size ({max_body_size} bytes) reached, so stopping download: {response.url}"
+                )
+                break
+
+        try:
+            return body.decode(response.charset or "utf-8", errors="replace")
+        except LookupError:
+            return body.decode("utf-8", errors="replace")
+
+    async def __get(self, url: str, flow_note: str = "") -> Optional[str]:
+        """Executes single GET request.
+
+        Args:
+            url: website url link
+            flow_note: suffix added to log messages
+
+        Returns:
+            Text with website content or None for not successful status code
+        """
+        crawl_metrics = get_crawl_metrics()
+        started_at = time.perf_counter()
+        try:
+            async with self.session.get(url, allow_redirects=True, timeout=self.TIMEOUT) as response:
+                if response.ok:
+                    crawl_metrics.inc("finder_fetches_total", label="ok")
+                    self.logger.debug(f"Successfully fetched the given url: {url}{flow_note}.")
+                    return await self.__read_text(response, self.max_body_size)
+        finally:
+            crawl_metrics.observe("finder_fetch_duration_seconds", time.perf_counter() - started_at)
+
+        crawl_metrics.inc("finder_fetches_total", label="non_2xx")
+        self.logger.error(
+            f"Returning None, because something went wrong with request execution ({url}). "
+            f"Returned status code: {response.status}{flow_note}."
+        )
+        return None
+
+
+class AsyncCareerLinksFetcher:
+    """Asynchronous variant of CareerLinksFetcher.
+
+    Usage:
+        career_links = await AsyncCareerLinksFetcher(logger, url_fetcher).get_career_links(url)
+
+    Args:
+        logger (LoggerT): logger object
+        url_fetcher (AsyncUrlFetcher): fetcher used for http requests
+
+    Attributes:
+        logger (LoggerT): logger object
+        url_fetcher (AsyncUrlFetcher): fetcher used for http requests
+    """
+
+    def __init__(self, logger: LoggerT, url_fetcher: AsyncUrlFetcher) -> None:
+        self.logger = logger
+        self.url_fetcher = url_fetcher
+        self.__career_links_fetcher = CareerLinksFetcher(logger)
+
+    async def get_career_links(self, baseurl: str) -> list[str]:
+        """Filters for potential career related links from list of the links.
+
+        Args:
+            baseurl: base part of url
+
+        Returns:
+            List with potential career related links.
+        """
+        website_html_text = await self.url_fetcher.fetch(baseurl)
+
+        if website_html_text is None:
+            self.logger.debug(f"Http request failed, so returning empty list of career links [{baseurl}].")
+            return []
+
+        return self.__career_links_fetcher.filter_career_links(baseurl, website_html_text)
+
+
+class AsyncJobsChecker:
+    """Asynchronous variant of JobsChecker.
+
+    Usage:
+        has_needed_jobs = await AsyncJobsChecker(logger, url_fetcher).may_company_have_the_needed_jobs(url, www)
+
+    Args:
+        logger (LoggerT): logger object
+        url_fetcher (AsyncUrlFetcher): fetcher used for http requests
+        verdict_cache (JobsVerdictCache): cache of external pages verdicts shared by workers
+
+    Attributes:
+        logger (LoggerT): logger object
+        url_fetcher (AsyncUrlFetcher): fetcher used for http requests
+    """
+
+    def __init__(
+        self, logger: LoggerT, url_fetcher: AsyncUrlFetcher, verdict_cache: Optional[JobsVerdictCache] = None
+    ) -> None:
+        self.logger = logger
+        self.url_fetcher = url_fetcher
+        self.__jobs_checker = JobsChecker(logger, verdict_cache=verdict_cache)
+
+    async def may_company_have_the_needed_jobs(self, url: str, www: Optional[str] = None) -> bool:
+        """Checks if the given link www may contain jobs that are searched.
+
+        Args:
+            url: www link to be checked for jobs search
+            www: website of the company the link was found on (verdict cache is not used if None)
+
+        Returns:
+            Boolean value describing probability that link contains jobs that are searched.
+        """
+        # Verdict cache is a SQLite store, so it is used from executor threads not to block the event loop.
+        cached_verdict = await asyncio.to_thread(self.__jobs_checker.cached_verdict, url, www)
+        if cached_verdict is not None:
+            return cached_verdict
+
+        self.logger.debug(f"Checking if the given link: {url} contains jobs that are searched ({JOB_ROLES}).")
+
+        started_at = time.perf_counter()
+        website_text = await self.url_fetcher.fetch(url)
+        has_needed_jobs = website_text is not None and self.__jobs_checker.has_needed_jobs(website_text)
+
+        crawl_metrics = get_crawl_metrics()
+        crawl_metrics.observe("finder_jobs_check_duration_seconds", time.perf_counter() - started_at)
+        crawl_metrics.inc("finder_jobs_checks_total", label="found" if has_needed_jobs else "not_found")
+        if website_text is not None:
+            await asyncio.to_thread(self.__jobs_checker.save_verdict, url, www, has_needed_jobs)
+        return has_needed_jobs
+
+
+class AsyncCrawlEngine:
+    """Runs many company checks concurrently inside one worker process.
+
+    Usage:
+        AsyncCrawlEngine(logger).run(work_queue, on_job_found)
+
+    Args:
+        logger (LoggerT): logger object
+        coroutines_count: number of companies checked concurrently (ASYNC_COROUTINES_PER_WORKER by default)
+        max_concurrency: max number of requests in flight (ASYNC_MAX_CONCURRENCY by default)
+        max_concurrency_per_host: max number of requests in flight per host (ASYNC_MAX_CONCURRENCY_PER_HOST by default)
+        verdict_cache (JobsVerdictCache): cache of external pages verdicts shared by workers
+
+    Attributes:
+        logger (LoggerT): logger object
+        coroutines_count (int): number of companies checked concurrently
+        max_concurrency (int): max number of requests in flight
+        max_concurrency_per_host (int): max number of requests in flight per host
+        verdict_cache (JobsVerdictCache): cache of external pages verdicts (None if disabled)
+    """
+
+    def __init__(
+        self,
+        logger: LoggerT,
+        coroutines_count: Optional[int] = None,
+        max_concurrency: Optional[int] = None,
+        max_concurrency_per_host: Optional[int] = None,
+        verdict_cache: Optional[JobsVerdictCache] = None,
+    ) -> None:
+        self.logger = logger
+        self.coroutines_count = coroutines_count or ASYNC_COROUTINES_PER_WORKER
+        self.max_concurrency = max_concurrency or ASYNC_MAX_CONCURRENCY
+        self.max_concurrency_per_host = max_concurrency_per_host or ASYNC_MAX_CONCURRENCY_PER_HOST
+        self.verdict_cache = verdict_cache
+
+    def run(
+        self,
+        work_queue: multiprocessing.Queue[Optional[CrawlTask]],
+        on_job_found: Callable[[CrawlTask, str], None],
+        on_row_done: Optional[Callable[[CrawlTask, Optional[str]], None]] = None,
+    ) -> None:
+        """Processes company rows from the work queue until the None sentinel is received.
+
+        Args:
+            work_queue: queue with company data rows
+            on_job_found: callback called with company row and link for which searched job was found
+            on_row_done: callback called with company row and found link (None if not found) after the row
+                is processed
+
+        Returns:
+            None
+        """
+        asyncio.run(self.__run(work_queue, on_job_found, on_row_done))
+
+    async def __run(
+        self,
+        work_queue: multiprocessing.Queue[Optional[CrawlTask]],
+        on_job_found: Callable[[CrawlTask, str], None],
+        on_row_done: Optional[Callable[[CrawlTask, Optional[str]], None]],
+    ) -> None:
+        connector = aiohttp.TCPConnector(limit=self.max_concurrency, limit_per_host=self.max_concurrency_per_host)
+        async with aiohttp.ClientSession(connector=connector) as session:
+            url_fetcher = AsyncUrlFetcher(self.logger, session, self.max_concurrency, self.max_concurrency_per_host)
+            career_links_fetcher = AsyncCareerLinksFetcher(self.logger, url_fetcher)
+            jobs_checker = AsyncJobsChecker(self.logger, url_fetcher, self.verdict_cache)
+
+            local_queue: asyncio.Queue[Optional[CrawlTask]] = asyncio.Queue(maxsize=self.coroutines_count)
+            consumers = [
+                asyncio.create_task(
+                    self.__consume(local_queue, career_links_fetcher, jobs_checker, on_job_found, on_row_done)
+                )
+                for _ in range(self.coroutines_count)
+            ]
+
+            loop = asyncio.get_running_loop()
+            while True:
+                # multiprocessing queue is blocking, so it is read from the default thread pool.
+                crawl_task = await loop.run_in_executor(None, work_queue.get)
+                if crawl_task is None:
+                    break
+                await local_queue.put(crawl_task)
+
+            for _ in consumers:
+                await local_queue.put(None)
+            await asyncio.gather(*consumers)
+
+    async def __consume(
+        self,
+        local_queue: asyncio.Queue[Optional[CrawlTask]],
+        career_links_fetcher: AsyncCareerLinksFetcher,
+        jobs_checker: AsyncJobsChecker,
+        on_job_found: Callable[[CrawlTask, str], None],
+        on_row_done: Optional[Callable[[CrawlTask, Optional[str]], None]],
+    ) -> None:
+        while True:
+            crawl_task = await local_queue.get()
+            if crawl_task is None:
+                break
+
+            line_number, www = crawl_task.line_number, crawl_task.www
+            self.logger.info(f"Processing line number: {line_number}, {www}")
+
+            started_at = time.perf_counter()
+            verdict_link = None
+            # Coroutines of the worker share the fetcher, so downloaded bytes are not limited per company.
+            budget = FetchBudget(downloaded_bytes=None)
+            try:
+                career_links = await career_links_fetcher.get_career_links(www)
+                budget.spend()
+                for index, link in enumerate(career_links):
+                    limit = budget.exhausted()
+                    if limit is not None:
+                        budget.abandon(self.logger, www, limit, len(career_links) - index)
+                        break
+                    budget.spend()
+                    if await jobs_checker.may_company_have_the_needed_jobs(link, www):
+                        on_job_found(crawl_task, link)
+                        verdict_link = link
+                        break
+            except Exception as e:
+                self.logger.error(f"Unexpected error during processing line number: {line_number}. Details: {e!r}")
+            get_crawl_metrics().observe("finder_row_duration_seconds", time.perf_counter() - started_at)
+
+            if on_row_done is not None:
+                on_row_done(crawl_task, verdict_link)
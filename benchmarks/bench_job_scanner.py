@@ -0,0 +1,454 @@
+"""End-to-end benchmark of JobScanner.run against a local farm of fake company websites.
+
+Results (throughput, CPU, memory, rows and requests latency) are appended to RESULTS_FILEPATH,
+so runs of different versions with the same settings can be compared.
+
+Run from main directory (Linux, fake hosts listen on 127.0.x.y addresses):
+ - PYTHONPATH=. python benchmarks/bench_job_scanner.py run --companies 500 --engines sync,async --workers 4,12
+ - PYTHONPATH=. python benchmarks/bench_job_scanner.py compare
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import multiprocessing
+import random
+import resource
+import subprocess  # nosec
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer
+from os.path import dirname
+from typing import Any
+from typing import NamedTuple
+from typing import Optional
+
+import checkpoint
+import host_health
+import http_cache
+import metrics
+import politeness
+import tracing
+import verdict_cache
+from configuration.config import JOB_ROLES
+from helpers import configure_logger
+from jobs import JobScanner
+from metrics import CrawlMetrics
+from metrics import FETCH_OUTCOMES
+from storage import CsvResultStore
+
+
+VOIVODESHIPS = ("małopolskie", "mazowieckie", "pomorskie", "śląskie", "wielkopolskie", "dolnośląskie")
+RESULTS_FILEPATH = dirname(__file__) + "/JOB_SCANNER_RESULTS.jsonl"
+FILLER_PARAGRAPH = "<p>Lorem ipsum dolor sit amet, consectetur adipiscing elit, sed do eiusmod tempor.</p>\n"
+
+
+class FakeWebFarmSettings(NamedTuple):
+    """Settings of fake company websites (rates are fractions of companies).
+
+    hosts_count: number of fake hosts (127.0.x.y loopback addresses, companies are spread evenly)
+    latency: mean delay in seconds before every response
+    page_size: size of every page in bytes
+    links_count: number of links on every homepage (one of them leads to career page)
+    error_rate: companies whose homepage responds with 500
+    timeout_rate: companies whose homepage responds after timeout_delay (longer than UrlFetcher timeout)
+    ssl_error_rate: companies with https www, which fails (the farm speaks plain http), so http fallback is used
+    job_rate: companies whose career page mentions the first of searched job roles
+    timeout_delay: delay in seconds of responses which time out
+    crawl_delay: politeness delay in seconds between requests to one host used during benchmark
+    seed: seed making companies profiles reproducible
+    """
+
+    hosts_count: int = 16
+    latency: float = 0.05
+    page_size: int = 20 * 1024
+    links_count: int = 50
+    error_rate: float = 0.05
+    timeout_rate: float = 0.01
+    ssl_error_rate: float = 0.05
+    job_rate: float = 0.2
+    timeout_delay: float = 6.0
+    crawl_delay: float = 0.0
+    seed: int = 1
+
+
+def fake_host_ip(host_index: int) -> str:
+    """Returns loopback address of fake host (Linux routes the whole 127.0.0.0/8 to loopback).
+
+    Args:
+        host_index: number of fake host
+
+    Returns:
+        IP address.
+    """
+    return f"127.0.{1 + host_index // 254}.{1 + host_index % 254}"
+
+
+def company_profile(settings: FakeWebFarmSettings, company_number: int) -> str:
+    """Returns reproducible profile of fake company website.
+
+    Args:
+        settings: fake web farm settings
+        company_number: company number
+
+    Returns:
+        "error", "timeout", "ssl_error" or "ok".
+    """
+    draw = random.Random(f"{settings.seed}-{company_number}").random()  # nosec
+    for profile, rate in (
+        ("error", settings.error_rate),
+        ("timeout", settings.timeout_rate),
+        ("ssl_error", settings.ssl_error_rate),
+    ):
+        if draw < rate:
+            return profile
+        draw -= rate
+    return "ok"
+
+
+def company_has_job(settings: FakeWebFarmSettings, company_number: int) -> bool:
+    """Checks if career page of fake company mentions searched job role (reproducible).
+
+    Args:
+        settings: fake web farm settings
+        company_number: company number
+
+    Returns:
+        True if the career page mentions searched job role.
+    """
+    return random.Random(f"{settings.seed}-job-{company_number}").random() < settings.job_rate  # nosec
+
+
+class FakeHostServer(ThreadingHTTPServer):
+    """Http server of one fake host."""
+
+    daemon_threads = True
+
+    def __init__(self, settings: FakeWebFarmSettings, server_address: tuple[str, int]) -> None:
+        super().__init__(server_address, FakeWebRequestHandler)
+        self.settings = settings
+
+    def handle_error(self, request: Any, client_address: Any) -> None:
+        pass  # Clients close connections of timed out responses.
+
+
+class FakeWebRequestHandler(BaseHTTPRequestHandler):
+    """Serves pages of fake companies, path of every page starts with /c<company number>/."""
+
+    protocol_version = "HTTP/1.1"
+    server: FakeHostServer
+
+    def do_GET(self) -> None:
+        settings = self.server.settings
+        path_parts = self.path.strip("/").split("/")
+        if not path_parts[0].startswith("c") or not path_parts[0][1:].isdigit():
+            self.__respond(404, "")  # robots.txt and unknown pages.
+            return
+
+        company_number = int(path_parts[0][1:])
+        profile = company_profile(settings, company_number)
+        time.sleep(random.uniform(0.5, 1.5) * settings.latency)  # nosec
+
+        if len(path_parts) == 1:
+            if profile == "error":
+                self.__respond(500, "Internal Server Error")
+                return
+            if profile == "timeout":
+                time.sleep(settings.timeout_delay)
+            links = [
+                f'<a href="/c{company_number}/strona-{index}">Strona {index}</a>\n'
+                for index in range(1, settings.links_count)
+            ]
+            links.insert(len(links) // 2, f'<a href="/c{company_number}/kariera">Kariera</a>\n')
+            self.__respond(200, self.__page("".join(links)))
+            return
+
+        job_offer = (
+            f"<h2>{JOB_ROLES[0]}</h2>\n"
+            if path_parts[1] == "kariera" and company_has_job(settings, company_number)
+            else ""
+        )
+        self.__respond(200, self.__page(job_offer))
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+    def __page(self, content: str) -> str:
+        filler_size = max(0, self.server.settings.page_size - len(content))
+        filler = (FILLER_PARAGRAPH * (filler_size // len(FILLER_PARAGRAPH) + 1))[:filler_size]
+        half = len(filler) // 2
+        return f"<html><body>\n{filler[:half]}{content}{filler[half:]}</body></html>\n"
+
+    def __respond(self, status_code: int, content: str) -> None:
+        body = content.encode()
+        self.send_response(status_code)
+        self.send_header("Content-type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class FakeWebFarm:
+    """Local farm of fake company websites served by a separate process (its CPU is not measured).
+
+    Every fake host listens on its own loopback address, so politeness scheduler treats them as different hosts.
+
+    Usage:
+        with FakeWebFarm(settings) as web_farm:
+            www = web_farm.company_www(company_number)
+
+    Args:
+        settings: fake web farm settings
+
+    Attributes:
+        settings (FakeWebFarmSettings): fake web farm settings
+        port (int): port on which all fake hosts listen (0 until started)
+    """
+
+    def __init__(self, settings: FakeWebFarmSettings) -> None:
+        self.settings = settings
+        self.port = 0
+        self.__process: Optional[multiprocessing.Process] = None
+
+    def __enter__(self) -> FakeWebFarm:
+        self.start()
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.stop()
+
+    def start(self) -> None:
+        """Starts servers process and waits until all fake hosts listen."""
+        port_queue: multiprocessing.Queue[int] = multiprocessing.Queue()
+        self.__process = multiprocessing.Process(target=self.__serve, args=(port_queue,), daemon=True)
+        self.__process.start()
+        self.port = port_queue.get(timeout=30)
+
+    def stop(self) -> None:
+        """Stops servers process."""
+        if self.__process is not None:
+            self.__process.terminate()
+            self.__process.join()
+            self.__process = None
+
+    def company_www(self, company_number: int) -> str:
+        """Returns www of fake company.
+
+        Args:
+            company_number: company number
+
+        Returns:
+            Company homepage url.
+        """
+        scheme = "https" if company_profile(self.settings, company_number) == "ssl_error" else "http"
+        host_ip = fake_host_ip(company_number % self.settings.hosts_count)
+        return f"{scheme}://{host_ip}:{self.port}/c{company_number}/"
+
+    def __serve(self, port_queue: multiprocessing.Queue[int]) -> None:
+        servers = []
+        port = 0
+        for host_index in range(self.settings.hosts_count):
+            servers.append(FakeHostServer(self.settings, (fake_host_ip(host_index), port)))
+            port = servers[0].server_address[1]
+        port_queue.put(port)
+
+        for server in servers[1:]:
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers[0].serve_forever()
+
+
+def generate_companies_csv(filepath: str, companies_count: int, web_farm: FakeWebFarm) -> None:
+    """Generates DB file with fake companies.
+
+    Args:
+        filepath: DB filepath
+        companies_count: number of companies
+        web_farm: started fake web farm serving companies websites
+
+    Returns:
+        None
+    """
+    with open(filepath, "w") as companies_file:
+        for company_number in range(1, companies_count + 1):
+            companies_file.write(
+                f"{company_number};FIRMA {company_number} SPÓŁKA Z OGRANICZONĄ ODPOWIEDZIALNOŚCIĄ;"
+                f"{company_number:010d};[];[];brak_email;{web_farm.company_www(company_number)};"
+                f"{VOIVODESHIPS[company_number % len(VOIVODESHIPS)]};Testowa,{company_number},Kraków,Polska\n"
+            )
+
+
+def current_version() -> str:
+    """Returns git commit of the benchmarked code ("unknown" outside of git repository)."""
+    try:
+        completed_process = subprocess.run(  # nosec
+            ["git", "rev-parse", "--short", "HEAD"], cwd=dirname(__file__), capture_output=True, text=True, check=True
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+    return completed_process.stdout.strip()
+
+
+def run_benchmark(
+    engine: str, workers_count: int, companies_count: int, web_farm: FakeWebFarm, directory: str
+) -> dict[str, Any]:
+    """Measures JobScanner.run over fake companies.
+
+    Files written by the run (checkpoint, robots.txt store, verdict cache, tripped hosts, http cache, trace,
+    output) are kept in the given directory.
+
+    Args:
+        engine: crawl engine, "sync" or "async"
+        workers_count: number of worker processes
+        companies_count: number of companies
+        web_farm: started fake web farm
+        directory: directory for files written by the run
+
+    Returns:
+        Benchmark result.
+    """
+    db_filepath = f"{directory}/COMPANIES.csv"
+    generate_companies_csv(db_filepath, companies_count, web_farm)
+    # Settings are imported by modules as constants, so they are overridden in modules (benchmark process only).
+    for module, setting, value in (
+        (checkpoint, "CHECKPOINT_FILEPATH", f"{directory}/CHECKPOINT.json"),
+        (politeness, "ROBOTS_TXT_FILEPATH", f"{directory}/ROBOTS_TXT.sqlite3"),
+        (politeness, "POLITENESS_CRAWL_DELAY", web_farm.settings.crawl_delay),
+        (host_health, "HOST_HEALTH_FILEPATH", f"{directory}/HOST_HEALTH.sqlite3"),
+        (http_cache, "HTTP_CACHE_DIRECTORY", f"{directory}/HTTP_CACHE"),
+        (tracing, "TRACE_FILEPATH", f"{directory}/TRACE.jsonl"),
+        (verdict_cache, "VERDICT_CACHE_FILEPATH", f"{directory}/VERDICT_CACHE.sqlite3"),
+        (metrics, "_crawl_metrics", CrawlMetrics()),
+    ):
+        setattr(module, setting, value)
+    crawl_metrics = metrics.get_crawl_metrics()
+
+    logger = configure_logger("Benchmark")
+    job_scanner = JobScanner(
+        workers_count=workers_count,
+        engine=engine,
+        incremental=False,
+        result_store=CsvResultStore(logger, f"{directory}/RESULT.csv"),
+        db_filepath=db_filepath,
+    )
+
+    self_usage = resource.getrusage(resource.RUSAGE_SELF)
+    children_usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    started_at = time.perf_counter()
+    job_scanner.run(resume=False)
+    duration = time.perf_counter() - started_at
+    self_usage_after = resource.getrusage(resource.RUSAGE_SELF)
+    # Workers and results writer are already joined, fake web farm process is not.
+    children_usage_after = resource.getrusage(resource.RUSAGE_CHILDREN)
+
+    cpu_seconds = sum(
+        after.ru_utime - before.ru_utime + after.ru_stime - before.ru_stime
+        for before, after in ((self_usage, self_usage_after), (children_usage, children_usage_after))
+    )
+    rows_count = crawl_metrics.value("finder_rows_processed_total")
+    return {
+        "version": current_version(),
+        "timestamp": time.time(),
+        "engine": engine,
+        "workers_count": workers_count,
+        "companies_count": companies_count,
+        "web_farm": web_farm.settings._asdict(),
+        "duration": round(duration, 3),
+        "rows_per_second": round(rows_count / duration, 3),
+        "cpu_seconds": round(cpu_seconds, 3),
+        "cpu_utilization": round(cpu_seconds / duration, 3),
+        "peak_rss_mb": round(self_usage_after.ru_maxrss / 1024, 1),
+        "peak_worker_rss_mb": round(children_usage_after.ru_maxrss / 1024, 1),
+        "row_duration_seconds": {
+            f"p{round(fraction * 100)}": crawl_metrics.quantile("finder_row_duration_seconds", fraction)
+            for fraction in (0.5, 0.95, 0.99)
+        },
+        "fetch_duration_seconds": {
+            f"p{round(fraction * 100)}": crawl_metrics.quantile("finder_fetch_duration_seconds", fraction)
+            for fraction in (0.5, 0.95, 0.99)
+        },
+        "fetches": {outcome: crawl_metrics.value("finder_fetches_total", outcome) for outcome in FETCH_OUTCOMES},
+        "jobs_found": crawl_metrics.value("finder_jobs_checks_total", "found"),
+    }
+
+
+def save_result(result: dict[str, Any], results_filepath: Optional[str] = None) -> None:
+    """Appends benchmark result to the results file (JSON lines).
+
+    Args:
+        result: benchmark result
+        results_filepath: results filepath (RESULTS_FILEPATH by default)
+
+    Returns:
+        None
+    """
+    with open(results_filepath or RESULTS_FILEPATH, "a") as results_file:
+        results_file.write(json.dumps(result, ensure_ascii=False) + "\n")
+
+
+def compare_results(results_filepath: Optional[str] = None) -> str:
+    """Lists saved results of the same settings next to each other, so versions can be compared.
+
+    Args:
+        results_filepath: results filepath (RESULTS_FILEPATH by default)
+
+    Returns:
+        Text table with results.
+    """
+    with open(results_filepath or RESULTS_FILEPATH, "r") as results_file:
+        results = [json.loads(line) for line in results_file]
+
+    results.sort(
+        key=lambda result: (
+            json.dumps(result["web_farm"], sort_keys=True),
+            result["companies_count"],
+            result["engine"],
+            result["workers_count"],
+            result["timestamp"],
+        )
+    )
+    report_lines = [
+        f"{'Version':<10}{'Engine':<8}{'Workers':>8}{'Companies':>10}{'Rows/s':>10}"
+        f"{'CPU [s]':>10}{'RSS [MB]':>10}{'Row p50 [s]':>13}{'Row p95 [s]':>13}"
+    ]
+    for result in results:
+        row_duration = result["row_duration_seconds"]
+        report_lines.append(
+            f"{result['version']:<10}{result['engine']:<8}{result['workers_count']:>8}{result['companies_count']:>10}"
+            f"{result['rows_per_second']:>10.2f}{result['cpu_seconds']:>10.2f}{result['peak_worker_rss_mb']:>10.1f}"
+            f"{row_duration['p50'] or 0.0:>13.3f}{row_duration['p95'] or 0.0:>13.3f}"
+        )
+    return "\n".join(report_lines)
+
+
+def main() -> None:
+    arguments_parser = argparse.ArgumentParser(description="Benchmarks JobScanner.run against local fake websites.")
+    subparsers = arguments_parser.add_subparsers(dest="command", required=True)
+    run_parser = subparsers.add_parser("run", help="runs benchmark and saves its results")
+    run_parser.add_argument("--companies", type=int, default=500, help="number of companies")
+    run_parser.add_argument("--engines", default="sync", help="comma separated crawl engines")
+    run_parser.add_argument("--workers", default="4,12", help="comma separated numbers of workers")
+    for field, default in FakeWebFarmSettings._field_defaults.items():
+        run_parser.add_argument(f"--{field.replace('_', '-')}", type=type(default), default=default)
+    run_parser.add_argument("--results", default=RESULTS_FILEPATH, help="results filepath")
+    compare_parser = subparsers.add_parser("compare", help="lists saved results")
+    compare_parser.add_argument("--results", default=RESULTS_FILEPATH, help="results filepath")
+    arguments = arguments_parser.parse_args()
+
+    if arguments.command == "compare":
+        print(compare_results(arguments.results))
+    else:
+        settings = FakeWebFarmSettings(**{field: getattr(arguments, field) for field in FakeWebFarmSettings._fields})
+        with FakeWebFarm(settings) as web_farm:
+            for engine in arguments.engines.split(","):
+                for workers_count in map(int, arguments.workers.split(",")):
+                    with tempfile.TemporaryDirectory() as directory:
+                        result = run_benchmark(engine, workers_count, arguments.companies, web_farm, directory)
+                    save_result(result, arguments.results)
+                    print(json.dumps(result, ensure_ascii=False))
+        print(compare_results(arguments.results))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Micro-benchmark comparing KeywordMatcher with the plain keyword loops it replaced.
+
+Run from main directory:
+ - PYTHONPATH=. python benchmarks/bench_keyword_matcher.py
+"""
+from __future__ import annotations
+
+import random
+import string
+import timeit
+from typing import Callable
+
+from jobs import CareerLinksFetcher
+from keyword_matcher import KeywordMatcher
+
+
+def random_words(count: int) -> list[str]:
+    return ["".join(random.choices(string.ascii_lowercase, k=random.randint(3, 10))) for _ in range(count)]
+
+
+def loop_over_keywords(keywords: list[str]) -> Callable[[str], bool]:
+    """Job roles check as it was done before KeywordMatcher (page lowercased, one `in` per keyword)."""
+    lowered_keywords = [keyword.lower() for keyword in keywords]
+
+    def check(text: str) -> bool:
+        text = text.lower()
+        for keyword in lowered_keywords:
+            if keyword in text:
+                return True
+        return False
+
+    return check
+
+
+def list_comprehension_over_keywords(keywords: list[str]) -> Callable[[str], bool]:
+    """Career links check as it was done before KeywordMatcher (all keywords checked for every link)."""
+
+    def check(text: str) -> bool:
+        return bool([keyword for keyword in keywords if keyword in text])
+
+    return check
+
+
+def measure(check: Callable[[str], object], texts: list[str], repeat: int) -> float:
+    return min(timeit.repeat(lambda: [check(text) for text in texts], number=1, repeat=repeat))
+
+
+def print_row(scenario: str, old_time: float, search_time: float, find_all_time: float) -> None:
+    print(
+        f"{scenario:<44} {old_time * 1000:>10.2f} {search_time * 1000:>10.2f} {find_all_time * 1000:>10.2f}"
+        f" {old_time / search_time:>8.1f}x"
+    )
+
+
+def main() -> None:
+    random.seed(0)
+    vocabulary = random_words(5000)
+    page = " ".join(random.choices(vocabulary, k=150_000))  # ~1 MB of text without any job role.
+
+    print(f"{'scenario':<44} {'loop [ms]':>10} {'search':>10} {'find_all':>10} {'speedup':>9}")
+
+    for keywords_count in (3, 50, 200, 1000):
+        job_roles = [" ".join(random.choices(vocabulary, k=2)) + "x" for _ in range(keywords_count)]
+        matcher = KeywordMatcher(job_roles)
+        print_row(
+            f"1 MB page, {keywords_count} job roles",
+            measure(loop_over_keywords(job_roles), [page], 3),
+            measure(matcher.search, [page], 3),
+            measure(matcher.find_all, [page], 1),
+        )
+
+    links = ["https://example.com/" + "/".join(random.choices(vocabulary, k=3)) for _ in range(10_000)]
+    for career_keywords in (CareerLinksFetcher.CAREER_KEYWORDS, CareerLinksFetcher.CAREER_KEYWORDS + vocabulary[:500]):
+        matcher = KeywordMatcher(career_keywords, case_sensitive=True)
+        print_row(
+            f"10000 links, {len(career_keywords)} career keywords",
+            measure(list_comprehension_over_keywords(career_keywords), links, 3),
+            measure(matcher.search, links, 3),
+            measure(matcher.find_all, links, 3),
+        )
+
+
+if __name__ == "__main__":
+    main()
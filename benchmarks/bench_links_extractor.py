@@ -0,0 +1,45 @@
+"""Micro-benchmark comparing LinksExtractor backends.
+
+Run from main directory:
+ - PYTHONPATH=. python benchmarks/bench_links_extractor.py
+"""
+from __future__ import annotations
+
+import random
+import string
+import timeit
+
+from helpers import configure_logger
+from jobs import LinksExtractor
+
+
+def generate_html(links_count: int, paragraphs_count: int) -> str:
+    paragraphs = [
+        f"<p class='text'>{' '.join(random.choices(string.ascii_letters, k=80))}</p>" for _ in range(paragraphs_count)
+    ]
+    links = [f'<li><a href="/page-{i}" class="nav">Page {i}</a></li>' for i in range(links_count)]
+    body = f"<ul>{''.join(links)}</ul>{''.join(paragraphs)}"
+    return f"<html><head><title>Company</title></head><body>{body}</body></html>"
+
+
+def main() -> None:
+    random.seed(0)
+    logger = configure_logger("Benchmark")
+
+    print(f"{'html size':>10} {'links':>6} {'bs4 [ms]':>10} {'lxml [ms]':>10} {'speedup':>9}")
+    for links_count, paragraphs_count in ((50, 100), (300, 1000), (1000, 5000)):
+        html = generate_html(links_count, paragraphs_count)
+        times = {}
+        for backend in LinksExtractor.BACKENDS:
+            links_extractor = LinksExtractor(logger, backend=backend)
+            times[backend] = min(
+                timeit.repeat(lambda: links_extractor.extract_links("https://xyz.com/", html), number=1, repeat=5)
+            )
+        print(
+            f"{len(html):>10} {links_count:>6} {times['bs4'] * 1000:>10.2f} {times['lxml'] * 1000:>10.2f}"
+            f" {times['bs4'] / times['lxml']:>8.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
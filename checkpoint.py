@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+import json
+import os
+import tempfile
+import threading
+from typing import Optional
+
+from configuration.config import CHECKPOINT_FILEPATH
+from configuration.config import CHECKPOINT_INTERVAL
+
+
+class CrawlCheckpoint:
+    """Durable progress of the DB file processing, allowing to resume crashed run.
+
+    Progress is described by a low-water mark (every row with line number up to it
+    is finished) and by line numbers of rows finished above the mark (rows processed
+    out of order by other workers). Together they stay small, whatever the DB file size.
+    The output position (end of the result store when the run started) limits the companies
+    skipped on resume as already saved to the ones saved by the unfinished run.
+
+    Checkpoint file is rewritten atomically every `interval` finished rows, so after
+    a crash at most `interval` rows (plus rows in flight) are processed again on resume.
+
+    Usage:
+        checkpoint = CrawlCheckpoint()
+        checkpoint.load()
+        if not checkpoint.is_finished(line_number):
+            checkpoint.start_row(line_number)
+            ...
+            checkpoint.finish_row(line_number)
+
+    Args:
+        filepath: checkpoint filepath (CHECKPOINT_FILEPATH by default)
+        interval: number of finished rows between checkpoint writes (CHECKPOINT_INTERVAL by default)
+
+    Attributes:
+        filepath (str): checkpoint filepath
+        interval (int): number of finished rows between checkpoint writes
+        low_water_mark (int): line number up to which all rows are finished
+        finished_rows (set): line numbers of rows finished above the low-water mark
+        output_position (int): end position of the result store when the run started (see ResultStore.end_position)
+    """
+
+    def __init__(self, filepath: Optional[str] = None, interval: Optional[int] = None) -> None:
+        self.filepath = filepath or CHECKPOINT_FILEPATH
+        self.interval = interval or CHECKPOINT_INTERVAL
+        self.low_water_mark = -1
+        self.finished_rows: set[int] = set()
+        self.output_position = 0
+        self.__pending_rows: dict[int, None] = {}
+        self.__last_started_row = -1
+        self.__finished_since_save = 0
+        self.__lock = threading.Lock()
+
+    def load(self) -> bool:
+        """Loads progress saved by previous (unfinished) run.
+
+        Returns:
+            True if checkpoint file was found.
+        """
+        try:
+            with open(self.filepath, "r") as checkpoint_file:
+                checkpoint_data = json.load(checkpoint_file)
+        except FileNotFoundError:
+            return False
+
+        with self.__lock:
+            self.low_water_mark = checkpoint_data["low_water_mark"]
+            self.finished_rows = set(checkpoint_data["finished_rows"])
+            self.output_position = checkpoint_data.get("output_position", 0)
+            self.__last_started_row = self.low_water_mark
+        return True
+
+    def is_finished(self, line_number: int) -> bool:
+        """Checks if the given row was finished by previous run.
+
+        Args:
+            line_number: row line number
+
+        Returns:
+            True if the row does not have to be processed again.
+        """
+        return line_number <= self.low_water_mark or line_number in self.finished_rows
+
+    def start_row(self, line_number: int) -> None:
+        """Marks row as sent for processing (rows are started in ascending line numbers order).
+
+        Args:
+            line_number: row line number
+
+        Returns:
+            None
+        """
+        with self.__lock:
+            self.__pending_rows[line_number] = None
+            self.__last_started_row = line_number
+
+    def finish_row(self, line_number: int) -> None:
+        """Marks row as finished and saves checkpoint every `interval` finished rows.
+
+        Args:
+            line_number: row line number
+
+        Returns:
+            None
+        """
+        with self.__lock:
+            self.__pending_rows.pop(line_number, None)
+            self.finished_rows.add(line_number)
+            self.__finished_since_save += 1
+            if self.__finished_since_save >= self.interval:
+                self.__save()
+
+    def save(self) -> None:
+        """Saves checkpoint file atomically."""
+        with self.__lock:
+            self.__save()
+
+    def clear(self) -> None:
+        """Removes checkpoint file (whole DB file was processed)."""
+        with self.__lock:
+            if os.path.exists(self.filepath):
+                os.remove(self.filepath)
+            self.__finished_since_save = 0
+
+    def __save(self) -> None:
+        # Rows started before the oldest pending one are finished (or were skipped).
+        if self.__pending_rows:
+            low_water_mark = next(iter(self.__pending_rows)) - 1
+        else:
+            low_water_mark = self.__last_started_row
+        self.low_water_mark = max(self.low_water_mark, low_water_mark)
+        self.finished_rows = {line_number for line_number in self.finished_rows if line_number > self.low_water_mark}
+
+        checkpoint_directory = os.path.dirname(os.path.abspath(self.filepath))
+        checkpoint_fd, temporary_path = tempfile.mkstemp(dir=checkpoint_directory)
+        try:
+            with os.fdopen(checkpoint_fd, "w") as checkpoint_file:
+                json.dump(
+                    {
+                        "low_water_mark": self.low_water_mark,
+                        "finished_rows": sorted(self.finished_rows),
+                        "output_position": self.output_position,
+                    },
+                    checkpoint_file,
+                )
+                checkpoint_file.flush()
+                os.fsync(checkpoint_file.fileno())
+            os.replace(temporary_path, self.filepath)
+        finally:
+            if os.path.exists(temporary_path):
+                os.remove(temporary_path)
+        self.__finished_since_save = 0
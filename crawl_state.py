@@ -0,0 +1,223 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from typing import Any
+from typing import Optional
+
+from configuration.config import CRAWL_STATE_FILEPATH
+
+
+def content_hash(text: str) -> str:
+    """Returns short hash of website content.
+
+    Args:
+        text: website content
+
+    Returns:
+        Hex digest of the content.
+    """
+    return hashlib.blake2b(text.encode(errors="replace"), digest_size=16).hexdigest()
+
+
+def settings_fingerprint(*settings: Any) -> str:
+    """Returns short hash of settings which results saved for a page depend on (e.g. matcher keywords).
+
+    Args:
+        settings: JSON serializable settings (sets are serialized sorted)
+
+    Returns:
+        Hex digest of the settings.
+    """
+    return content_hash(json.dumps(settings, sort_keys=True, default=sorted))
+
+
+class PageState:
+    """State of a page saved during previous crawl.
+
+    Args:
+        url: page url
+        content_hash: hash of page content
+        has_needed_jobs: last verdict of jobs check (None if page was not checked for jobs)
+        career_links: career links found on the page (None if page was not searched for career links)
+        checked_at: timestamp of the last check
+
+    Attributes:
+        url (str): page url
+        content_hash (str): hash of page content
+        has_needed_jobs (bool): last verdict of jobs check
+        career_links (list): career links found on the page
+        checked_at (float): timestamp of the last check
+    """
+
+    def __init__(
+        self,
+        url: str,
+        content_hash: str,
+        has_needed_jobs: Optional[bool],
+        career_links: Optional[list[str]],
+        checked_at: float,
+    ) -> None:
+        self.url = url
+        self.content_hash = content_hash
+        self.has_needed_jobs = has_needed_jobs
+        self.career_links = career_links
+        self.checked_at = checked_at
+
+
+class CrawlStateStore:
+    """Persistent (SQLite based) store of per-page crawl state.
+
+    It lets the next run skip work for pages which did not change:
+     - unchanged homepage - career links saved previously are reused,
+     - unchanged career page - jobs check verdict saved previously is reused.
+    Every result is saved with a fingerprint of settings it depends on (e.g. JOB_ROLES),
+    results saved with other settings are not returned.
+
+    Every process opens its own connection (WAL mode), so the store can be
+    created once and used by all workers.
+
+    Usage:
+        crawl_state = CrawlStateStore()
+        page_state = crawl_state.get_page(url, fingerprint)
+
+    Args:
+        filepath: SQLite database filepath (CRAWL_STATE_FILEPATH by default)
+
+    Attributes:
+        filepath (str): SQLite database filepath
+        unchanged_pages (int): number of pages found unchanged by the current process
+        changed_pages (int): number of new or changed pages found by the current process
+    """
+
+    def __init__(self, filepath: Optional[str] = None) -> None:
+        self.filepath = filepath or CRAWL_STATE_FILEPATH
+        self.unchanged_pages = 0
+        self.changed_pages = 0
+        self.__connections: dict[int, sqlite3.Connection] = {}
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        """Connection of the current process."""
+        pid = os.getpid()
+        if pid not in self.__connections:
+            self.__connections.clear()
+            self.unchanged_pages = 0
+            self.changed_pages = 0
+            self.__connections[pid] = self.__connect()
+        return self.__connections[pid]
+
+    def __connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.filepath, timeout=30)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        with connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS pages ("
+                " url TEXT PRIMARY KEY, content_hash TEXT NOT NULL, has_needed_jobs INTEGER, jobs_fingerprint TEXT,"
+                " career_links TEXT, links_fingerprint TEXT, checked_at REAL NOT NULL)"
+            )
+            # State saved before fingerprints were introduced is never reused (fingerprints are NULL).
+            columns = {row[1] for row in connection.execute("PRAGMA table_info(pages)")}
+            for column in ("jobs_fingerprint", "links_fingerprint"):
+                if column not in columns:
+                    connection.execute(f"ALTER TABLE pages ADD COLUMN {column} TEXT")
+        return connection
+
+    def get_page(self, url: str, fingerprint: str = "") -> Optional[PageState]:
+        """Returns page state saved during previous crawl.
+
+        Args:
+            url: page url
+            fingerprint: fingerprint of current settings (results saved with another one are returned as None)
+
+        Returns:
+            PageState object or None if page was never crawled.
+        """
+        row = self.connection.execute(
+            "SELECT content_hash, has_needed_jobs, jobs_fingerprint, career_links, links_fingerprint, checked_at"
+            " FROM pages WHERE url = ?",
+            (url,),
+        ).fetchone()
+        if row is None:
+            return None
+
+        page_hash, has_needed_jobs, jobs_fingerprint, career_links, links_fingerprint, checked_at = row
+        if jobs_fingerprint != fingerprint:
+            has_needed_jobs = None
+        if links_fingerprint != fingerprint:
+            career_links = None
+        return PageState(
+            url,
+            page_hash,
+            None if has_needed_jobs is None else bool(has_needed_jobs),
+            None if career_links is None else json.loads(career_links),
+            checked_at,
+        )
+
+    def is_unchanged(self, page_state: Optional[PageState], page_hash: str) -> bool:
+        """Checks if page content is the same as during previous crawl (and counts it).
+
+        Args:
+            page_state: page state saved during previous crawl
+            page_hash: hash of current page content
+
+        Returns:
+            True if page content did not change.
+        """
+        if page_state is not None and page_state.content_hash == page_hash:
+            self.unchanged_pages += 1
+            return True
+
+        self.changed_pages += 1
+        return False
+
+    def save_page(
+        self,
+        url: str,
+        page_hash: str,
+        has_needed_jobs: Optional[bool] = None,
+        career_links: Optional[list[str]] = None,
+        fingerprint: str = "",
+    ) -> None:
+        """Saves page state (fields passed as None keep their previous values and fingerprints).
+
+        Args:
+            url: page url
+            page_hash: hash of page content
+            has_needed_jobs: verdict of jobs check
+            career_links: career links found on the page
+            fingerprint: fingerprint of settings the passed results depend on
+
+        Returns:
+            None
+        """
+        with self.connection:
+            self.connection.execute(
+                "INSERT INTO pages"
+                " (url, content_hash, has_needed_jobs, jobs_fingerprint, career_links, links_fingerprint, checked_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)"
+                " ON CONFLICT(url) DO UPDATE SET content_hash = excluded.content_hash,"
+                " has_needed_jobs = CASE WHEN pages.content_hash = excluded.content_hash"
+                "  THEN coalesce(excluded.has_needed_jobs, pages.has_needed_jobs) ELSE excluded.has_needed_jobs END,"
+                " jobs_fingerprint = CASE WHEN pages.content_hash = excluded.content_hash"
+                "  THEN coalesce(excluded.jobs_fingerprint, pages.jobs_fingerprint) ELSE excluded.jobs_fingerprint END,"
+                " career_links = CASE WHEN pages.content_hash = excluded.content_hash"
+                "  THEN coalesce(excluded.career_links, pages.career_links) ELSE excluded.career_links END,"
+                " links_fingerprint = CASE WHEN pages.content_hash = excluded.content_hash"
+                "  THEN coalesce(excluded.links_fingerprint, pages.links_fingerprint)"
+                "  ELSE excluded.links_fingerprint END,"
+                " checked_at = excluded.checked_at",
+                (
+                    url,
+                    page_hash,
+                    None if has_needed_jobs is None else int(has_needed_jobs),
+                    None if has_needed_jobs is None else fingerprint,
+                    None if career_links is None else json.dumps(career_links),
+                    None if career_links is None else fingerprint,
+                    time.time(),
+                ),
+            )
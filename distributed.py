@@ -0,0 +1,420 @@
+from __future__ import annotations
+
+import argparse
+import itertools
+import os
+import socket
+import threading
+import time
+from collections import deque
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client
+from multiprocessing.connection import Connection
+from multiprocessing.connection import Listener
+from typing import Any
+from typing import NamedTuple
+from typing import Optional
+
+from configuration.config import DISTRIBUTED_AUTHKEY_ENV
+from configuration.config import DISTRIBUTED_COORDINATOR_ADDRESS
+from configuration.config import DISTRIBUTED_LEASE_TIMEOUT
+from configuration.config import DISTRIBUTED_NODE_DIRECTORY
+from configuration.config import DISTRIBUTED_POLL_INTERVAL
+from configuration.config import DISTRIBUTED_RANGE_SIZE
+from helpers import CompanyDbFile
+from helpers import configure_logger
+from jobs import JobScanner
+from storage import get_result_store
+from storage import ResultRecord
+from storage import ResultStore
+from storage import SqliteResultStore
+from tracing import get_tracer
+
+
+class Lease(NamedTuple):
+    """Range of DB file row positions leased to a crawl node until expiry (monotonic time)."""
+
+    lease_id: int
+    rows: range
+    node_id: str
+    expires_at: float
+
+
+class CrawlCoordinator:
+    """Leases DB file row ranges to crawl nodes and merges their found jobs into one result store.
+
+    Nodes connect over multiprocessing connection (pickled tuples, authenticated with the shared
+    key) and ask for leases: ("lease", node_id) is answered with ("range", lease_id, start, stop,
+    lease_timeout), ("wait", seconds) while all ranges are leased or ("done",) once all ranges
+    are completed.
+    Node renews its lease with ("renew", lease_id) while crawling and sends found jobs of the
+    range with ("complete", lease_id, start, records).
+
+    Leases not renewed within the lease timeout (hung nodes) and leases of disconnected nodes
+    go back to the pending ranges and are leased to another node. The first completion of a
+    range wins, found jobs sent by a late node for already completed range are dropped, so
+    every range is merged into the result store exactly once.
+
+    Usage:
+        coordinator = CrawlCoordinator()
+        coordinator.run()
+
+    Args:
+        address: listen address (DISTRIBUTED_COORDINATOR_ADDRESS by default, port 0 for any free port)
+        authkey: shared secret of the coordinator and its nodes (DISTRIBUTED_AUTHKEY_ENV variable by default)
+        range_size: number of rows leased at once (DISTRIBUTED_RANGE_SIZE by default)
+        lease_timeout: seconds without renewal after which lease expires (DISTRIBUTED_LEASE_TIMEOUT by default)
+        poll_interval: seconds nodes wait while all ranges are leased (DISTRIBUTED_POLL_INTERVAL by default)
+        result_store: store to which found jobs are merged (store selected by RESULT_STORE_BACKEND by default)
+        db_filepath: DB file with company rows (DB_FILEPATH by default)
+
+    Attributes:
+        logger (LoggerT): logger object
+        address (tuple): listen address (bound address once started)
+        authkey (bytes): shared secret of the coordinator and its nodes
+        range_size (int): number of rows leased at once
+        lease_timeout (float): seconds without renewal after which lease expires
+        poll_interval (float): seconds nodes wait while all ranges are leased
+        result_store (ResultStore): store to which found jobs are merged
+        ranges_count (int): number of row ranges of the DB file
+    """
+
+    def __init__(
+        self,
+        address: Optional[tuple[str, int]] = None,
+        authkey: Optional[bytes] = None,
+        range_size: Optional[int] = None,
+        lease_timeout: Optional[float] = None,
+        poll_interval: Optional[float] = None,
+        result_store: Optional[ResultStore] = None,
+        db_filepath: Optional[str] = None,
+    ) -> None:
+        self.logger = configure_logger("CrawlCoordinator")
+        self.address = address or DISTRIBUTED_COORDINATOR_ADDRESS
+        self.authkey = authkey or environment_authkey()
+        self.range_size = range_size or DISTRIBUTED_RANGE_SIZE
+        self.lease_timeout = lease_timeout or DISTRIBUTED_LEASE_TIMEOUT
+        self.poll_interval = poll_interval or DISTRIBUTED_POLL_INTERVAL
+        self.result_store = result_store or get_result_store(self.logger)
+
+        with CompanyDbFile(db_filepath) as company_db:
+            rows_count = len(company_db)
+        self.__pending_ranges = deque(
+            range(start, min(start + self.range_size, rows_count)) for start in range(0, rows_count, self.range_size)
+        )
+        self.ranges_count = len(self.__pending_ranges)
+        self.__leases: dict[int, Lease] = {}
+        self.__lease_ids = itertools.count(1)
+        self.__completed_ranges: set[int] = set()
+        self.__lock = threading.Lock()
+        self.__finished = threading.Event()
+        self.__listener: Optional[Listener] = None
+        if not self.ranges_count:
+            self.__finished.set()
+
+    @property
+    def completed_ranges_count(self) -> int:
+        """Number of ranges completed by nodes."""
+        with self.__lock:
+            return len(self.__completed_ranges)
+
+    def run(self) -> None:
+        """Serves nodes until all ranges are completed.
+
+        Returns:
+            None, but saves found jobs of all nodes to the result store
+        """
+        self.start()
+        self.wait()
+
+    def start(self) -> None:
+        """Starts listening for nodes in background threads.
+
+        Returns:
+            None
+        """
+        self.__listener = Listener(self.address, authkey=self.authkey)
+        self.address = self.__listener.address
+        threading.Thread(target=self.__accept_nodes, args=(self.__listener,), daemon=True).start()
+        self.logger.info(f"Coordinator listens on {self.address}, {self.ranges_count} ranges to lease.")
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Waits until all ranges are completed and stops listening.
+
+        Args:
+            timeout: max number of seconds to wait
+
+        Returns:
+            True if all ranges were completed.
+        """
+        finished = self.__finished.wait(timeout)
+        if finished:
+            # Nodes asking for the next lease get "done" within the poll interval.
+            time.sleep(self.poll_interval)
+            self.logger.info(f"All {self.ranges_count} ranges completed.")
+        if self.__listener is not None:
+            self.__listener.close()
+            self.__listener = None
+        return finished
+
+    def __accept_nodes(self, listener: Listener) -> None:
+        while True:
+            try:
+                connection = listener.accept()
+            except (OSError, EOFError, AuthenticationError):
+                # Listener closed or node failed authentication.
+                if self.__listener is not listener:
+                    return
+                continue
+            threading.Thread(target=self.__serve_node, args=(connection,), daemon=True).start()
+
+    def __serve_node(self, connection: Connection) -> None:
+        node_id = None
+        try:
+            while True:
+                message = connection.recv()
+                if message[0] == "lease":
+                    node_id = message[1]
+                    connection.send(self.__lease(message[1]))
+                elif message[0] == "renew":
+                    connection.send(self.__renew(message[1]))
+                elif message[0] == "complete":
+                    connection.send(self.__complete(*message[1:]))
+                else:
+                    connection.send(("error", f"Unknown message: {message[0]!r}."))
+        except (EOFError, OSError):
+            pass
+        finally:
+            connection.close()
+            if node_id is not None:
+                self.__release_leases(node_id)
+
+    def __lease(self, node_id: str) -> tuple[Any, ...]:
+        with self.__lock:
+            self.__expire_leases()
+            if self.__finished.is_set():
+                return ("done",)
+            if not self.__pending_ranges:
+                return ("wait", self.poll_interval)
+
+            rows = self.__pending_ranges.popleft()
+            lease = Lease(next(self.__lease_ids), rows, node_id, time.monotonic() + self.lease_timeout)
+            self.__leases[lease.lease_id] = lease
+        self.logger.info(f"Leased rows {rows.start}-{rows.stop - 1} to node {node_id} [lease: {lease.lease_id}].")
+        return ("range", lease.lease_id, rows.start, rows.stop, self.lease_timeout)
+
+    def __renew(self, lease_id: int) -> tuple[Any, ...]:
+        with self.__lock:
+            self.__expire_leases()
+            lease = self.__leases.get(lease_id)
+            if lease is None:
+                return ("lost",)
+            self.__leases[lease_id] = lease._replace(expires_at=time.monotonic() + self.lease_timeout)
+        return ("ok",)
+
+    def __complete(self, lease_id: int, start: int, records: list[ResultRecord]) -> tuple[Any, ...]:
+        with self.__lock:
+            lease = self.__leases.pop(lease_id, None)
+            if start in self.__completed_ranges:
+                self.logger.warning(f"Dropped {len(records)} found jobs of already completed rows from {start}.")
+                return ("ok",)
+
+            self.__completed_ranges.add(start)
+            # Range of expired lease may wait for another node.
+            self.__pending_ranges = deque(rows for rows in self.__pending_ranges if rows.start != start)
+            # Merged under the lock, so found jobs of every range are saved once.
+            self.result_store.save(records, fsync=True)
+            if len(self.__completed_ranges) == self.ranges_count:
+                self.__finished.set()
+        node_id = "unknown node" if lease is None else f"node {lease.node_id}"
+        self.logger.info(f"Rows from {start} completed by {node_id}, found jobs: {len(records)}.")
+        return ("ok",)
+
+    def __expire_leases(self) -> None:
+        now = time.monotonic()
+        for lease in list(self.__leases.values()):
+            if lease.expires_at <= now:
+                self.logger.warning(f"Lease {lease.lease_id} of node {lease.node_id} expired.")
+                self.__return_lease(lease)
+
+    def __release_leases(self, node_id: str) -> None:
+        with self.__lock:
+            for lease in list(self.__leases.values()):
+                if lease.node_id == node_id:
+                    self.logger.warning(f"Node {node_id} disconnected, lease {lease.lease_id} released.")
+                    self.__return_lease(lease)
+
+    def __return_lease(self, lease: Lease) -> None:
+        del self.__leases[lease.lease_id]
+        if lease.rows.start not in self.__completed_ranges:
+            self.__pending_ranges.appendleft(lease.rows)
+
+
+class CrawlNode:
+    """Crawls row ranges leased by the coordinator with JobScanner, until all ranges are completed.
+
+    Found jobs of the leased range are saved to the node own SQLite store and sent to the
+    coordinator when the range is completed. The lease is renewed by a background thread
+    while JobScanner processes the range. Nodes running on one machine need their own
+    directories (node id, i.e. host name and pid, by default). State shared during one run
+    (robots.txt files, verdicts of external pages, tripped hosts) is cleared once per node session,
+    so leased ranges reuse it instead of clearing it for every lease.
+
+    Usage:
+        CrawlNode(workers_count=4).run()
+
+    Args:
+        address: coordinator address (DISTRIBUTED_COORDINATOR_ADDRESS by default)
+        authkey: shared secret of the coordinator and its nodes (DISTRIBUTED_AUTHKEY_ENV variable by default)
+        directory: node working directory (node id directory in DISTRIBUTED_NODE_DIRECTORY by default)
+        workers_count: number of JobScanner worker processes (WORKERS_COUNT by default)
+        engine: JobScanner crawl engine (CRAWL_ENGINE by default)
+        db_filepath: DB file with company rows (DB_FILEPATH by default)
+
+    Attributes:
+        logger (LoggerT): logger object
+        address (tuple): coordinator address
+        authkey (bytes): shared secret of the coordinator and its nodes
+        node_id (str): node id (host name and pid)
+        directory (str): node working directory
+        completed_ranges_count (int): number of ranges completed by the node
+    """
+
+    def __init__(
+        self,
+        address: Optional[tuple[str, int]] = None,
+        authkey: Optional[bytes] = None,
+        directory: Optional[str] = None,
+        workers_count: Optional[int] = None,
+        engine: Optional[str] = None,
+        db_filepath: Optional[str] = None,
+    ) -> None:
+        self.logger = configure_logger("CrawlNode")
+        self.address = address or DISTRIBUTED_COORDINATOR_ADDRESS
+        self.authkey = authkey or environment_authkey()
+        self.node_id = f"{socket.gethostname()}-{os.getpid()}"
+        self.directory = directory or f"{DISTRIBUTED_NODE_DIRECTORY}/{self.node_id}"
+        self.completed_ranges_count = 0
+        self.__workers_count = workers_count
+        self.__engine = engine
+        self.__db_filepath = db_filepath
+        self.__connection_lock = threading.Lock()
+
+    def run(self) -> None:
+        """Crawls leased ranges until the coordinator has no more ranges.
+
+        Returns:
+            None
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        results_filepath = f"{self.directory}/RESULTS.sqlite3"
+        for filepath in (results_filepath, f"{results_filepath}-wal", f"{results_filepath}-shm"):
+            if os.path.exists(filepath):
+                os.remove(filepath)
+        result_store = SqliteResultStore(self.logger, results_filepath)
+        job_scanner = JobScanner(
+            workers_count=self.__workers_count,
+            engine=self.__engine,
+            result_store=result_store,
+            db_filepath=self.__db_filepath,
+            checkpoint_filepath=f"{self.directory}/CHECKPOINT.json",
+        )
+        job_scanner.clear_run_state()
+        if get_tracer().enabled:
+            get_tracer().clear()  # Spans of all ranges crawled by the node are appended to one trace.
+        cursor = 0
+
+        with Client(self.address, authkey=self.authkey) as connection:
+            while True:
+                reply = self.__request(connection, ("lease", self.node_id))
+                if reply[0] == "done":
+                    break
+                if reply[0] == "wait":
+                    time.sleep(reply[1])
+                    continue
+
+                _, lease_id, start, stop, lease_timeout = reply
+                self.logger.info(f"Node {self.node_id} crawls rows {start}-{stop - 1} [lease: {lease_id}].")
+                lease_finished = threading.Event()
+                renewer = threading.Thread(
+                    target=self.__renew_lease, args=(connection, lease_id, lease_timeout, lease_finished)
+                )
+                renewer.start()
+                try:
+                    job_scanner.run(resume=False, rows=range(start, stop), new_run=False)
+                finally:
+                    lease_finished.set()
+                    renewer.join()
+
+                records, cursor = self.__read_new_records(result_store, cursor)
+                self.__request(connection, ("complete", lease_id, start, records))
+                self.completed_ranges_count += 1
+
+        self.logger.info(f"Node {self.node_id} finished, completed ranges: {self.completed_ranges_count}.")
+
+    def __request(self, connection: Connection, message: tuple[Any, ...]) -> tuple[Any, ...]:
+        with self.__connection_lock:
+            connection.send(message)
+            reply: tuple[Any, ...] = connection.recv()
+        return reply
+
+    def __renew_lease(
+        self, connection: Connection, lease_id: int, lease_timeout: float, lease_finished: threading.Event
+    ) -> None:
+        # Lease is renewed a few times per timeout, so one delayed renewal does not expire it.
+        while not lease_finished.wait(lease_timeout / 3):
+            if self.__request(connection, ("renew", lease_id))[0] == "lost":
+                self.logger.warning(f"Lease {lease_id} expired, the range may be crawled by another node as well.")
+                return
+
+    @staticmethod
+    def __read_new_records(result_store: ResultStore, cursor: int) -> tuple[list[ResultRecord], int]:
+        records: list[ResultRecord] = []
+        while True:
+            page = result_store.query(limit=1000, after=cursor)
+            if not page.records:
+                return records, cursor
+            records.extend(record for _, record in page.records)
+            cursor = page.records[-1][0]
+
+
+def environment_authkey() -> bytes:
+    """Returns shared secret of the coordinator and its nodes set in the DISTRIBUTED_AUTHKEY_ENV environment variable.
+
+    Returns:
+        Shared secret bytes.
+
+    Raises:
+        ValueError: if the environment variable is not set (there is no default secret)
+    """
+    authkey = os.environ.get(DISTRIBUTED_AUTHKEY_ENV)
+    if not authkey:
+        raise ValueError(f"Shared secret of distributed crawl is not set, set {DISTRIBUTED_AUTHKEY_ENV} variable.")
+    return authkey.encode()
+
+
+if __name__ == "__main__":
+    arguments_parser = argparse.ArgumentParser(description="Distributed crawl of the DB file by many nodes.")
+    subparsers = arguments_parser.add_subparsers(dest="mode", required=True)
+    coordinator_parser = subparsers.add_parser("coordinator", help="lease DB file row ranges to nodes")
+    coordinator_parser.add_argument("--range-size", type=int, default=None, help="number of rows leased at once")
+    node_parser = subparsers.add_parser("node", help="crawl row ranges leased by the coordinator")
+    node_parser.add_argument("--workers", type=int, default=None, help="number of JobScanner worker processes")
+    for parser in (coordinator_parser, node_parser):
+        parser.add_argument("--host", default=DISTRIBUTED_COORDINATOR_ADDRESS[0], help="coordinator host")
+        parser.add_argument("--port", type=int, default=DISTRIBUTED_COORDINATOR_ADDRESS[1], help="coordinator port")
+        parser.add_argument(
+            "--authkey",
+            default=os.environ.get(DISTRIBUTED_AUTHKEY_ENV),
+            help=f"shared secret of the coordinator and its nodes ({DISTRIBUTED_AUTHKEY_ENV} environment variable)",
+        )
+    arguments = arguments_parser.parse_args()
+    # Pickled messages are trusted once the secret is verified, so no host (loopback one neither) runs without it.
+    if not arguments.authkey:
+        arguments_parser.error(f"--authkey or {DISTRIBUTED_AUTHKEY_ENV} environment variable is required.")
+    address, authkey = (arguments.host, arguments.port), arguments.authkey.encode()
+
+    if arguments.mode == "coordinator":
+        CrawlCoordinator(address=address, authkey=authkey, range_size=arguments.range_size).run()
+    else:
+        CrawlNode(address=address, authkey=authkey, workers_count=arguments.workers).run()
@@ -1,6 +1,8 @@
 from __future__ import annotations
 
 import functools
+import hashlib
+import json
 import os
 import signal
 import threading
@@ -8,12 +10,24 @@ from os.path import dirname
 from types import FrameType
 from typing import Any
 from typing import Callable
+from typing import Iterator
 from typing import Optional
 
 from flask import Flask
+from flask import jsonify
+from flask import request
+from flask import Response
 
-from configuration.config import CRAWLED_JOBS_OUTPUT_FILE
 from configuration.config import JOB_ROLES
+from configuration.config import LIVE_EVENTS_HEARTBEAT_INTERVAL
+from configuration.config import RESULTS_API_DEFAULT_LIMIT
+from configuration.config import RESULTS_API_MAX_LIMIT
+from helpers import configure_logger
+from host_health import TrippedHostsStore
+from live_events import get_live_events
+from metrics import get_crawl_metrics
+from storage import get_result_store
+from storage import ResultStore
 
 
 app = Flask(__name__)
@@ -28,10 +42,15 @@ def home() -> str:
         </head>
         <body>
             <h1>Hello!</h1>
-            <p>This simple Web app allow you to use following two endpoints:</>
+            <p>This simple Web app allow you to use following endpoints:</>
             <ul>
                 <li><a href="/logs">/logs</a> - displaying latest logs</li>
-                <li><a href="/results">/results</a> - displaying all results collected till now</li>
+                <li><a href="/results">/results</a> - JSON page of results collected till now
+                    (query parameters: limit, offset, cursor, voivodeship, krs_number)</li>
+                <li><a href="/stream">/stream</a> - server-sent events with new logs and results
+                    (query parameter: events, e.g. events=result)</li>
+                <li><a href="/metrics">/metrics</a> - crawler metrics in Prometheus text format</li>
+                <li><a href="/tripped_hosts">/tripped_hosts</a> - hosts with circuit breaker tripped during the run</li>
                 <li><a href="/jobs_definition">/jobs_definition</a> - displaying job keywords used for Job Search</li>
             </ul>
         </body>
@@ -84,28 +103,113 @@ def logs() -> str:
     """
 
 
-def results() -> str:
-    try:
-        output_str = ""
-        line_counter = 0
-        with open(CRAWLED_JOBS_OUTPUT_FILE, "r") as output_file:
-            for line in output_file:
-                line_counter += 1
-                output_str += f"line{line_counter};{line}"
-    except FileNotFoundError:
-        return "There is no output file."
+@functools.lru_cache(maxsize=1)
+def api_result_store() -> ResultStore:
+    """Returns store of found jobs (created once, so its index is reused between requests)."""
+    return get_result_store(configure_logger("FlaskApi"))
 
-    return f"""
-    <!DOCTYPE html>
-    <html>
-        <head>
-            <title>Flask App</title>
-        </head>
-        <body>
-            <pre>{output_str}</pre>
-        </body>
-    </html>
+
+def results() -> Response:
+    """Returns JSON page of found jobs.
+
+    Query parameters:
+        limit: max number of returned results (RESULTS_API_DEFAULT_LIMIT by default, RESULTS_API_MAX_LIMIT at most)
+        offset: number of skipped results (counted from the cursor)
+        cursor: next_cursor value from the previous page, only results saved after it are returned
+        voivodeship: only results of companies from the given voivodeship are returned
+        krs_number: only results of company with the given KRS number are returned
+
+    Responses are tagged with the result store version and a hash of the query parameters (defaults applied),
+    so polling clients sending If-None-Match header get 304 Not Modified until new results are saved.
+    """
+    try:
+        limit = int(request.args.get("limit", RESULTS_API_DEFAULT_LIMIT))
+        offset = int(request.args.get("offset", 0))
+        cursor = int(request.args.get("cursor", 0))
+    except ValueError:
+        return Response("Parameters limit, offset and cursor have to be integers.", status=400)
+    if not 0 < limit <= RESULTS_API_MAX_LIMIT or offset < 0 or cursor < 0:
+        return Response(
+            f"Parameter limit has to be between 1 and {RESULTS_API_MAX_LIMIT}, offset and cursor cannot be negative.",
+            status=400,
+        )
+    voivodeship = request.args.get("voivodeship")
+    krs_number = request.args.get("krs_number")
+
+    result_store = api_result_store()
+    query = json.dumps([limit, offset, cursor, voivodeship, krs_number])
+    etag = f"results-{result_store.version()}-{hashlib.blake2b(query.encode(), digest_size=8).hexdigest()}"
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+        response.set_etag(etag)
+        return response
+
+    # One additional record tells whether the next page exists.
+    results_page = result_store.query(offset, limit + 1, cursor, voivodeship, krs_number)
+    records = results_page.records[:limit]
+    has_next_page = len(results_page.records) > limit
+    response = jsonify(
+        {
+            "results": [{"id": record_id, **record._asdict()} for record_id, record in records],
+            "total": results_page.total,
+            "offset": offset,
+            "limit": limit,
+            "next_cursor": records[-1][0] if has_next_page else None,
+        }
+    )
+    response.set_etag(etag)
+    return response
+
+
+def stream() -> Response:
+    """Streams live events (new log lines and found jobs) as server-sent events.
+
+    Query parameters:
+        events: comma separated event kinds, "log" and / or "result" (both by default)
+
+    Events are pushed from the in-memory live events buffer as soon as they are published.
+    Reconnecting clients (sending Last-Event-ID header) get the buffered events they missed.
+    """
+    kinds = set(request.args.get("events", "log,result").split(","))
+    try:
+        last_event_id = int(request.headers.get("Last-Event-ID", 0))
+    except ValueError:
+        return Response("Last-Event-ID header has to be an integer.", status=400)
+    live_events = get_live_events()
+
+    def generate_events() -> Iterator[str]:
+        event_id = last_event_id
+        while True:
+            events = live_events.wait(event_id, LIVE_EVENTS_HEARTBEAT_INTERVAL)
+            if events:
+                event_id = events[-1].id
+            chunk = "".join(
+                f"id: {event.id}\nevent: {event.kind}\ndata: {json.dumps(event.data)}\n\n"
+                for event in events
+                if event.kind in kinds
+            )
+            # Comment line keeps idle connection open through proxies.
+            yield chunk or ": keep-alive\n\n"
+
+    return Response(
+        generate_events(),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def metrics() -> Response:
+    """Returns crawler metrics (aggregated across all JobScanner processes) in Prometheus text format."""
+    return Response(get_crawl_metrics().render(), content_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+def tripped_hosts() -> Response:
+    """Returns hosts with circuit breaker tripped during the current run, the most recently tripped first.
+
+    Requests to hosts with "open" breaker are skipped by all workers until "tripped_until" timestamp.
     """
+    hosts = TrippedHostsStore().tripped()
+    return jsonify({"hosts": hosts, "open": sum(1 for host in hosts if host["open"])})
 
 
 def jobs_definition() -> str:
@@ -130,6 +234,9 @@ def jobs_definition() -> str:
 app.add_url_rule("/", view_func=home, methods=("GET",))
 app.add_url_rule("/logs", view_func=logs, methods=("GET",))
 app.add_url_rule("/results", view_func=results, methods=("GET",))
+app.add_url_rule("/stream", view_func=stream, methods=("GET",))
+app.add_url_rule("/metrics", view_func=metrics, methods=("GET",))
+app.add_url_rule("/tripped_hosts", view_func=tripped_hosts, methods=("GET",))
 app.add_url_rule("/jobs_definition", view_func=jobs_definition, methods=("GET",))
 
 
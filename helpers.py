@@ -1,11 +1,21 @@
 from __future__ import annotations
 
 import logging
+import mmap
+import os
+import tempfile
+from array import array
+from bisect import bisect_left
 from logging.handlers import RotatingFileHandler
 from os import getenv
+from typing import Any
+from typing import BinaryIO
 from typing import Generator
+from typing import Iterator
+from typing import NamedTuple
 from typing import Optional
 from typing import TypeAlias
+from urllib.parse import urlsplit
 
 from configuration.config import DB_FILEPATH
 
@@ -62,3 +72,316 @@ def iterate_over_csv_db_file(db_filepath: Optional[str] = None) -> Generator[lis
             split_line = line.replace("\n", "").split(";")
             # line_number, company_name, krs_number, main_pkd, other_pkd, email, www, voivodeship, address = split_line
             yield split_line
+
+
+def website_key(www: str) -> str:
+    """Normalizes company website, so that addresses differing only in scheme, "www." prefix,
+    letter case or trailing slash are equal.
+
+    Args:
+        www: company website
+
+    Returns:
+        Website key, e.g. "firma.pl/kariera" for "HTTPS://www.Firma.pl/kariera/".
+    """
+    key = www.strip().lower().removeprefix("https://").removeprefix("http://")
+    return key.removeprefix("www.").rstrip("/")
+
+
+def is_external_link(www: str, link: str) -> bool:
+    """Checks if the link leads outside of company website (its domain and subdomains).
+
+    Args:
+        www: company website
+        link: absolute link found on the website
+
+    Returns:
+        True for links to other domains, e.g. job boards.
+    """
+    host = (urlsplit(link).hostname or "").removeprefix("www.")
+    base_host = (urlsplit(www).hostname or "").removeprefix("www.")
+    return not (host == base_host or host.endswith(f".{base_host}"))
+
+
+class CompanyRecord(NamedTuple):
+    """Company row of DB file without fields unused by the crawl (PKD codes)."""
+
+    line_number: int
+    company_name: str
+    krs_number: str
+    email: str
+    www: str
+    voivodeship: str
+    address: str
+
+    @classmethod
+    def from_fields(cls, fields: list[str]) -> CompanyRecord:
+        """Creates record from DB file row fields.
+
+        Args:
+            fields: [line_number, company_name, krs_number, main_pkd, other_pkd, email, www, voivodeship, address]
+
+        Returns:
+            CompanyRecord object.
+
+        Raises:
+            ValueError: if the row has wrong number of fields or its line number is not a number
+        """
+        if len(fields) != 9:
+            raise ValueError(f"Company row has {len(fields)} fields instead of 9: {fields!r}.")
+        line_number, company_name, krs_number, _, _, email, www, voivodeship, address = fields
+        if not line_number.isdigit():
+            raise ValueError(f"Company row has invalid line number: {line_number!r}.")
+        return cls(int(line_number), company_name, krs_number, email, www, voivodeship, address)
+
+
+class CrawlTask(NamedTuple):
+    """Company row passed to workers, only fields needed by the crawl (full record is joined back by the writer)."""
+
+    row_position: int
+    line_number: int
+    krs_number: str
+    www: str
+
+
+class CompanyRow:
+    """Company row of memory-mapped DB file, fields are decoded only when accessed.
+
+    Row keeps only its byte range in the DB file, so rows skipped by the caller (e.g. without
+    website or already finished) cost a few byte searches instead of decoding the whole line.
+    Row is valid as long as its CompanyDbFile is open.
+
+    Usage:
+        line_number, www = row.line_number, row.www
+        company_data = row.fields()
+
+    Args:
+        db_file_map: memory-mapped DB file content
+        position: 0-based row position in DB file
+        start: offset of the first byte of the row
+        end: offset of the end of the row (without newline)
+
+    Attributes:
+        position (int): 0-based row position in DB file
+    """
+
+    __slots__ = ("position", "__db_file_map", "__start", "__end")
+
+    def __init__(self, db_file_map: mmap.mmap, position: int, start: int, end: int) -> None:
+        self.position = position
+        self.__db_file_map = db_file_map
+        self.__start = start
+        self.__end = end
+
+    def __getitem__(self, field_index: int) -> str:
+        field_start = self.__start
+        for _ in range(field_index):
+            separator = self.__db_file_map.find(b";", field_start, self.__end)
+            if separator == -1:
+                raise IndexError(f"Company row has no field with index {field_index}.")
+            field_start = separator + 1
+        field_end = self.__db_file_map.find(b";", field_start, self.__end)
+        if field_end == -1:
+            field_end = self.__end
+        return self.__db_file_map[field_start:field_end].decode()
+
+    @property
+    def line_number(self) -> int:
+        return int(self[0])
+
+    @property
+    def www(self) -> str:
+        return self[6]
+
+    def fields(self) -> list[str]:
+        """Decodes all fields of the row.
+
+        Returns:
+            list: [line_number, company_name, krs_number, main_pkd, other_pkd, email, www, voivodeship, address]
+        """
+        start, end = self.__start, self.__end
+        return self.__db_file_map[start:end].decode().split(";")
+
+    def record(self) -> CompanyRecord:
+        """Decodes the row as company record.
+
+        Returns:
+            CompanyRecord object.
+        """
+        return CompanyRecord.from_fields(self.fields())
+
+    def crawl_task(self) -> CrawlTask:
+        """Decodes only fields needed by workers.
+
+        Returns:
+            CrawlTask object.
+        """
+        return CrawlTask(self.position, self.line_number, self[2], self.www)
+
+
+class CompanyDbFile:
+    """Memory-mapped DB file with byte offsets of its rows, allowing to slice any row range instantly.
+
+    Offsets index is built with one pass over the file and cached next to it (DB filepath
+    with ".index" suffix), the cached index is reused as long as size and modification time
+    of the DB file are unchanged. Row positions are 0-based and rows are expected to be
+    sorted by their line numbers (as in the DB file), so a row range (e.g. a shard processed
+    by one machine) is found without reading rows outside of it.
+
+    Usage:
+        with CompanyDbFile() as company_db:
+            for row in company_db.iterate_rows(company_db.find_row(start_line_number)):
+                company_data = row.fields()
+
+    Args:
+        db_filepath: DB filepath (DB_FILEPATH by default)
+
+    Attributes:
+        db_filepath (str): DB filepath
+        index_filepath (str): filepath of the cached offsets index
+    """
+
+    INDEX_FORMAT_VERSION = 1
+
+    def __init__(self, db_filepath: Optional[str] = None) -> None:
+        self.db_filepath = db_filepath or DB_FILEPATH
+        self.index_filepath = f"{self.db_filepath}.index"
+        self.__db_file: Optional[BinaryIO] = None
+        self.__db_file_map: Optional[mmap.mmap] = None
+        # Offsets of the rows starts, followed by offset of the end of the last row plus one.
+        self.__offsets = array("q", [0])
+
+    def __enter__(self) -> CompanyDbFile:
+        self.open()
+        return self
+
+    def __exit__(self, *_: Any) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self.__offsets) - 1
+
+    def open(self) -> None:
+        """Memory-maps DB file and loads (or builds and caches) its offsets index.
+
+        Returns:
+            None
+        """
+        self.__db_file = open(self.db_filepath, "rb")
+        file_stat = os.fstat(self.__db_file.fileno())
+        if not file_stat.st_size:
+            self.__offsets = array("q", [0])
+            return
+
+        self.__db_file_map = mmap.mmap(self.__db_file.fileno(), 0, access=mmap.ACCESS_READ)
+        offsets = self.__load_index(file_stat)
+        if offsets is None:
+            offsets = self.__build_index()
+            self.__save_index(file_stat, offsets)
+        self.__offsets = offsets
+
+    def close(self) -> None:
+        """Unmaps and closes DB file (rows of the file must not be used anymore).
+
+        Returns:
+            None
+        """
+        if self.__db_file_map is not None:
+            self.__db_file_map.close()
+            self.__db_file_map = None
+        if self.__db_file is not None:
+            self.__db_file.close()
+            self.__db_file = None
+
+    def row(self, position: int) -> CompanyRow:
+        """Returns row at given position.
+
+        Args:
+            position: 0-based row position
+
+        Returns:
+            CompanyRow object.
+        """
+        if not 0 <= position < len(self):
+            raise IndexError(f"Row position {position} out of range (rows: {len(self)}).")
+        assert self.__db_file_map is not None
+        return CompanyRow(self.__db_file_map, position, self.__offsets[position], self.__offsets[position + 1] - 1)
+
+    def iterate_rows(self, start: int = 0, stop: Optional[int] = None) -> Iterator[CompanyRow]:
+        """Iterates over rows in range of positions.
+
+        Args:
+            start: position of the first row
+            stop: position after the last row (end of file by default)
+
+        Yields:
+            CompanyRow objects.
+        """
+        for position in range(start, len(self) if stop is None else min(stop, len(self))):
+            yield self.row(position)
+
+    def find_row(self, line_number: int) -> int:
+        """Finds position of the first row with line number not lower than given one.
+
+        Args:
+            line_number: row line number
+
+        Returns:
+            Row position (number of rows if all rows have lower line numbers).
+        """
+        return bisect_left(range(len(self)), line_number, key=lambda position: self.row(position).line_number)
+
+    def shard(self, shard_index: int, shards_count: int) -> range:
+        """Returns range of row positions of one of equal shards of the file.
+
+        Args:
+            shard_index: 0-based shard index
+            shards_count: number of shards
+
+        Returns:
+            Range of row positions, to be passed to iterate_rows.
+        """
+        if not 0 <= shard_index < shards_count:
+            raise ValueError(f"Shard index {shard_index} out of range (shards: {shards_count}).")
+        return range(len(self) * shard_index // shards_count, len(self) * (shard_index + 1) // shards_count)
+
+    def __build_index(self) -> array[int]:
+        assert self.__db_file_map is not None
+        db_file_map = self.__db_file_map
+        offsets = array("q", [0])
+        newline = db_file_map.find(b"\n")
+        while newline != -1:
+            offsets.append(newline + 1)
+            newline = db_file_map.find(b"\n", newline + 1)
+        if offsets[-1] != len(db_file_map):
+            # The last row without trailing newline.
+            offsets.append(len(db_file_map) + 1)
+        return offsets
+
+    def __load_index(self, file_stat: os.stat_result) -> Optional[array[int]]:
+        try:
+            with open(self.index_filepath, "rb") as index_file:
+                header = array("q")
+                header.fromfile(index_file, 3)
+                if list(header) != [self.INDEX_FORMAT_VERSION, file_stat.st_size, file_stat.st_mtime_ns]:
+                    return None
+                offsets = array("q")
+                offsets.frombytes(index_file.read())
+                return offsets
+        except (OSError, EOFError, ValueError):
+            return None
+
+    def __save_index(self, file_stat: os.stat_result, offsets: array[int]) -> None:
+        index_directory = os.path.dirname(os.path.abspath(self.index_filepath))
+        try:
+            index_fd, temporary_path = tempfile.mkstemp(dir=index_directory, suffix=".tmp")
+        except OSError:
+            return  # Read-only DB directory, index is rebuilt by every run.
+        try:
+            with os.fdopen(index_fd, "wb") as index_file:
+                array("q", [self.INDEX_FORMAT_VERSION, file_stat.st_size, file_stat.st_mtime_ns]).tofile(index_file)
+                offsets.tofile(index_file)
+            os.replace(temporary_path, self.index_filepath)
+        finally:
+            if os.path.exists(temporary_path):
+                os.remove(temporary_path)
@@ -0,0 +1,327 @@
+from __future__ import annotations
+
+import os
+import sqlite3
+import time
+from collections import OrderedDict
+from typing import Any
+from typing import Optional
+from urllib.parse import urlsplit
+
+from configuration.config import HOST_BREAKER_COOLDOWN
+from configuration.config import HOST_BREAKER_FAILURES
+from configuration.config import HOST_CONNECT_TIMEOUT
+from configuration.config import HOST_HEALTH_ENABLED
+from configuration.config import HOST_HEALTH_FILEPATH
+from configuration.config import HOST_MIN_TIMEOUT
+from configuration.config import HOST_READ_TIMEOUT
+from metrics import get_crawl_metrics
+
+
+def host_key(url: str) -> str:
+    """Returns host of the url, requests over http and https to the same host share its health.
+
+    Args:
+        url: website url link
+
+    Returns:
+        Lowercased host name, e.g. "firma.pl" for "https://Firma.pl:443/kariera".
+    """
+    return (urlsplit(url).hostname or "").lower()
+
+
+class TrippedHostsStore:
+    """SQLite store of hosts with open circuit breaker, shared by all worker processes and the monitoring API.
+
+    Usage:
+        tripped_hosts = TrippedHostsStore()
+        tripped_hosts.trip(host, failures, last_error, cooldown)
+        tripped_until = tripped_hosts.get(host)
+
+    Args:
+        filepath: SQLite database filepath (HOST_HEALTH_FILEPATH by default)
+
+    Attributes:
+        filepath (str): SQLite database filepath
+    """
+
+    def __init__(self, filepath: Optional[str] = None) -> None:
+        self.filepath = filepath or HOST_HEALTH_FILEPATH
+        self.__connections: dict[int, sqlite3.Connection] = {}
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        """Connection of the current process."""
+        pid = os.getpid()
+        if pid not in self.__connections:
+            self.__connections.clear()
+            connection = sqlite3.connect(self.filepath, timeout=30)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            with connection:
+                connection.execute(
+                    "CREATE TABLE IF NOT EXISTS tripped_hosts ("
+                    " host TEXT PRIMARY KEY, failures INTEGER NOT NULL, last_error TEXT NOT NULL,"
+                    " tripped_at REAL NOT NULL, tripped_until REAL NOT NULL)"
+                )
+            self.__connections[pid] = connection
+        return self.__connections[pid]
+
+    def get(self, host: str) -> Optional[float]:
+        """Returns time until which requests to the host are skipped.
+
+        Args:
+            host: host name
+
+        Returns:
+            Timestamp (also a past one, after cooldown) or None if breaker of the host was not tripped.
+        """
+        row = self.connection.execute("SELECT tripped_until FROM tripped_hosts WHERE host = ?", (host,)).fetchone()
+        return None if row is None else float(row[0])
+
+    def trip(self, host: str, failures: int, last_error: str, cooldown: float) -> None:
+        """Saves host with open circuit breaker.
+
+        Args:
+            host: host name
+            failures: number of consecutive failed requests
+            last_error: outcome of the last failed request
+            cooldown: number of seconds requests to the host are skipped
+
+        Returns:
+            None
+        """
+        tripped_at = time.time()
+        with self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO tripped_hosts (host, failures, last_error, tripped_at, tripped_until)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (host, failures, last_error, tripped_at, tripped_at + cooldown),
+            )
+
+    def claim_trial(self, host: str, cooldown: float) -> bool:
+        """Claims the trial request to the host after its cooldown, so only one process sends it.
+
+        Requests of other processes stay skipped for another cooldown, unless the trial request closes the breaker.
+
+        Args:
+            host: host name
+            cooldown: number of seconds requests to the host are skipped during the trial
+
+        Returns:
+            True if the current process claimed the trial request.
+        """
+        now = time.time()
+        with self.connection:
+            cursor = self.connection.execute(
+                "UPDATE tripped_hosts SET tripped_until = ? WHERE host = ? AND tripped_until <= ?",
+                (now + cooldown, host, now),
+            )
+        return cursor.rowcount == 1
+
+    def reset(self, host: str) -> None:
+        """Closes circuit breaker of the host (its trial request succeeded)."""
+        with self.connection:
+            self.connection.execute("DELETE FROM tripped_hosts WHERE host = ?", (host,))
+
+    def tripped(self) -> list[dict[str, Any]]:
+        """Returns hosts with circuit breaker tripped during the current run, the most recently tripped first.
+
+        Returns:
+            List with host, failures, last_error, tripped_at, tripped_until and open (whether requests
+            are still skipped) of every host.
+        """
+        now = time.time()
+        rows = self.connection.execute(
+            "SELECT host, failures, last_error, tripped_at, tripped_until FROM tripped_hosts ORDER BY tripped_at DESC"
+        ).fetchall()
+        return [
+            {
+                "host": host,
+                "failures": failures,
+                "last_error": last_error,
+                "tripped_at": tripped_at,
+                "tripped_until": tripped_until,
+                "open": tripped_until > now,
+            }
+            for host, failures, last_error, tripped_at, tripped_until in rows
+        ]
+
+    def clear(self) -> None:
+        """Removes all tripped hosts (every run gives hosts a new chance)."""
+        with self.connection:
+            self.connection.execute("DELETE FROM tripped_hosts")
+
+
+class HostState:
+    """Latency and failures of one host observed by the current process.
+
+    Attributes:
+        smoothed_latency (float): smoothed time to response headers (None before the first response)
+        latency_variation (float): smoothed deviation of time to response headers
+        failures (int): number of consecutive failed requests
+        trial (bool): whether the last request was a trial one (sent after breaker cooldown)
+    """
+
+    def __init__(self) -> None:
+        self.smoothed_latency: Optional[float] = None
+        self.latency_variation = 0.0
+        self.failures = 0
+        self.trial = False
+
+
+class HostHealth:
+    """Adapts request timeouts to observed latency of every host and skips requests to failing hosts.
+
+    Timeouts are derived like TCP retransmission timeout: smoothed time to response headers plus four times
+    its smoothed deviation, kept between min timeout and the configured connect / read timeouts (used until
+    the first response of the host). After `breaker_failures` consecutive failed requests (timeouts, connection
+    errors, 5xx responses) the circuit breaker of the host is tripped and its requests are skipped for `cooldown`
+    seconds by all processes. Then one process claims a trial request: its failure trips the breaker again,
+    its success closes it. Only HOSTS_CACHE_SIZE recently requested hosts are tracked by a process.
+
+    Usage:
+        host_health = get_host_health()
+        if host_health is not None and host_health.allows(url):
+            response = session.get(url, timeout=host_health.timeouts(url))
+            host_health.record_success(url, response.elapsed.total_seconds())
+
+    Args:
+        tripped_hosts: store of tripped hosts (TrippedHostsStore with default filepath by default)
+        connect_timeout: max connect timeout in seconds (HOST_CONNECT_TIMEOUT by default)
+        read_timeout: max read timeout in seconds (HOST_READ_TIMEOUT by default)
+        min_timeout: min timeout in seconds (HOST_MIN_TIMEOUT by default)
+        breaker_failures: consecutive failures tripping the breaker (HOST_BREAKER_FAILURES by default)
+        cooldown: seconds requests to tripped host are skipped (HOST_BREAKER_COOLDOWN by default)
+
+    Attributes:
+        tripped_hosts (TrippedHostsStore): store of tripped hosts
+        connect_timeout (float): max connect timeout in seconds
+        read_timeout (float): max read timeout in seconds
+        min_timeout (float): min timeout in seconds
+        breaker_failures (int): consecutive failures tripping the breaker
+        cooldown (float): seconds requests to tripped host are skipped
+    """
+
+    LATENCY_GAIN = 0.125
+    VARIATION_GAIN = 0.25
+    VARIATION_FACTOR = 4.0
+    HOSTS_CACHE_SIZE = 1024
+
+    def __init__(
+        self,
+        tripped_hosts: Optional[TrippedHostsStore] = None,
+        connect_timeout: Optional[float] = None,
+        read_timeout: Optional[float] = None,
+        min_timeout: Optional[float] = None,
+        breaker_failures: Optional[int] = None,
+        cooldown: Optional[float] = None,
+    ) -> None:
+        self.tripped_hosts = tripped_hosts or TrippedHostsStore()
+        self.connect_timeout = connect_timeout or HOST_CONNECT_TIMEOUT
+        self.read_timeout = read_timeout or HOST_READ_TIMEOUT
+        self.min_timeout = min_timeout or HOST_MIN_TIMEOUT
+        self.breaker_failures = breaker_failures or HOST_BREAKER_FAILURES
+        self.cooldown = HOST_BREAKER_COOLDOWN if cooldown is None else cooldown
+        self.__hosts: OrderedDict[str, HostState] = OrderedDict()
+
+    def __host_state(self, host: str) -> HostState:
+        host_state = self.__hosts.pop(host, None) or HostState()
+        self.__hosts[host] = host_state
+        if len(self.__hosts) > self.HOSTS_CACHE_SIZE:
+            self.__hosts.popitem(last=False)
+        return host_state
+
+    def timeouts(self, url: str) -> tuple[float, float]:
+        """Returns timeouts of the next request to the url host.
+
+        Args:
+            url: website url link
+
+        Returns:
+            Tuple with connect and read timeouts in seconds.
+        """
+        connect_timeout, read_timeout = self.connect_timeout, self.read_timeout
+        host_state = self.__hosts.get(host_key(url))
+        if host_state is not None and host_state.smoothed_latency is not None:
+            timeout = host_state.smoothed_latency + self.VARIATION_FACTOR * host_state.latency_variation
+            connect_timeout = min(max(timeout, self.min_timeout), connect_timeout)
+            read_timeout = min(max(timeout, self.min_timeout), read_timeout)
+        return connect_timeout, read_timeout
+
+    def allows(self, url: str) -> bool:
+        """Checks if circuit breaker of the url host lets the request through.
+
+        Args:
+            url: website url link
+
+        Returns:
+            False while the breaker of the host is open (also during trial request of another process).
+        """
+        host = host_key(url)
+        tripped_until = self.tripped_hosts.get(host)
+        if tripped_until is None:
+            return True
+        if time.time() < tripped_until or not self.tripped_hosts.claim_trial(host, self.cooldown):
+            return False
+
+        # Cooldown passed, so the request is a trial: one more failure trips the breaker again.
+        self.__host_state(host).trial = True
+        return True
+
+    def record_success(self, url: str, latency: float) -> None:
+        """Records response of the url host (any status code below 500).
+
+        Args:
+            url: website url link
+            latency: time to response headers in seconds
+
+        Returns:
+            None
+        """
+        host = host_key(url)
+        host_state = self.__host_state(host)
+        if host_state.smoothed_latency is None:
+            host_state.smoothed_latency, host_state.latency_variation = latency, latency / 2
+        else:
+            deviation = abs(host_state.smoothed_latency - latency)
+            host_state.latency_variation += self.VARIATION_GAIN * (deviation - host_state.latency_variation)
+            host_state.smoothed_latency += self.LATENCY_GAIN * (latency - host_state.smoothed_latency)
+
+        if host_state.trial:
+            self.tripped_hosts.reset(host)
+        host_state.failures, host_state.trial = 0, False
+
+    def record_failure(self, url: str, error: str) -> None:
+        """Records failed request to the url host, tripping its circuit breaker after too many failures in a row.
+
+        Args:
+            url: website url link
+            error: request outcome, e.g. "timeout" or "connection_error"
+
+        Returns:
+            None
+        """
+        host = host_key(url)
+        host_state = self.__host_state(host)
+        host_state.failures += 1
+        if host_state.trial or host_state.failures >= self.breaker_failures:
+            self.tripped_hosts.trip(host, host_state.failures, error, self.cooldown)
+            get_crawl_metrics().inc("finder_host_breaker_trips_total")
+            host_state.failures, host_state.trial = 0, False
+
+
+_host_healths: dict[int, Optional[HostHealth]] = {}
+
+
+def get_host_health() -> Optional[HostHealth]:
+    """Returns host health of the current process.
+
+    Returns:
+        HostHealth object or None if host health tracking is disabled (HOST_HEALTH_ENABLED).
+    """
+    pid = os.getpid()
+    if pid not in _host_healths:
+        _host_healths.clear()
+        _host_healths[pid] = HostHealth() if HOST_HEALTH_ENABLED else None
+    return _host_healths[pid]
@@ -0,0 +1,263 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sqlite3
+import tempfile
+import time
+import zlib
+from typing import Optional
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from configuration.config import HTTP_CACHE_DIRECTORY
+from configuration.config import HTTP_CACHE_ENABLED
+from configuration.config import HTTP_CACHE_EVICTION_INTERVAL
+from configuration.config import HTTP_CACHE_MAX_SIZE
+from configuration.config import HTTP_CACHE_TTL_SECONDS
+
+
+class CachedResponse:
+    """Response body stored in ResponseCache together with its validators.
+
+    Usage:
+        cached_response = ResponseCache().get(url)
+        headers = cached_response.conditional_headers()
+
+    Args:
+        url: requested url
+        body: response body
+        encoding: response text encoding
+        etag: value of ETag header
+        last_modified: value of Last-Modified header
+        stored_at: timestamp of storing response in cache
+
+    Attributes:
+        url (str): requested url
+        body (bytes): response body
+        encoding (str): response text encoding
+        etag (str): value of ETag header
+        last_modified (str): value of Last-Modified header
+        stored_at (float): timestamp of storing response in cache
+    """
+
+    def __init__(
+        self,
+        url: str,
+        body: bytes,
+        encoding: Optional[str],
+        etag: Optional[str],
+        last_modified: Optional[str],
+        stored_at: float,
+    ) -> None:
+        self.url = url
+        self.body = body
+        self.encoding = encoding
+        self.etag = etag
+        self.last_modified = last_modified
+        self.stored_at = stored_at
+
+    def conditional_headers(self) -> dict[str, str]:
+        """Returns headers making the next request conditional (server answers 304 if nothing changed)."""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+    def to_response(self) -> requests.Response:
+        """Builds requests response object serving cached body."""
+        response = requests.Response()
+        response.status_code = 200
+        response.url = self.url
+        response.encoding = self.encoding
+        response.headers = CaseInsensitiveDict({"Content-Length": str(len(self.body))})
+        response._content = self.body
+        response._content_consumed = True  # type: ignore[attr-defined]
+        return response
+
+
+class ResponseCache:
+    """On-disk http response cache keyed by url.
+
+    Only responses having ETag or Last-Modified header are stored, because
+    they can be cheaply revalidated with conditional requests on the next run.
+    Every entry is a single file (json metadata line + zlib compressed body),
+    written atomically, so many worker processes can share one cache directory.
+    Sizes and last use times of entries are kept in a SQLite index in the cache directory.
+    Entries older than ttl are dropped. When cache grows above max size,
+    the least recently used entries are evicted (found with an indexed query, without scanning the directory).
+
+    Usage:
+        cache = ResponseCache()
+        cached_response = cache.get(url)
+        cache.store(url, response)
+
+    Args:
+        directory: cache directory (HTTP_CACHE_DIRECTORY by default)
+        max_size: max size of all entries in bytes (HTTP_CACHE_MAX_SIZE by default)
+        ttl: max age of entries in seconds (HTTP_CACHE_TTL_SECONDS by default)
+
+    Attributes:
+        directory (str): cache directory
+        max_size (int): max size of all entries in bytes
+        ttl (float): max age of entries in seconds
+    """
+
+    INDEX_FILENAME = "INDEX.sqlite3"
+
+    def __init__(
+        self, directory: Optional[str] = None, max_size: Optional[int] = None, ttl: Optional[float] = None
+    ) -> None:
+        self.directory = directory or HTTP_CACHE_DIRECTORY
+        self.max_size = max_size or HTTP_CACHE_MAX_SIZE
+        self.ttl = ttl or HTTP_CACHE_TTL_SECONDS
+        self.__stores_count = 0
+        self.__connections: dict[int, sqlite3.Connection] = {}
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        """Connection to the entries index of the current process."""
+        pid = os.getpid()
+        if pid not in self.__connections:
+            self.__connections.clear()
+            os.makedirs(self.directory, exist_ok=True)
+            connection = sqlite3.connect(os.path.join(self.directory, self.INDEX_FILENAME), timeout=30)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            with connection:
+                connection.execute(
+                    "CREATE TABLE IF NOT EXISTS entries ("
+                    " path TEXT PRIMARY KEY, size INTEGER NOT NULL, used_at REAL NOT NULL)"
+                )
+                connection.execute("CREATE INDEX IF NOT EXISTS entries_used_at ON entries (used_at)")
+            self.__connections[pid] = connection
+        return self.__connections[pid]
+
+    def get(self, url: str) -> Optional[CachedResponse]:
+        """Returns cached response for the given url.
+
+        Args:
+            url: requested url
+
+        Returns:
+            CachedResponse object or None if url is not cached (or entry expired).
+        """
+        entry_path = self.__entry_path(url)
+        try:
+            with open(entry_path, "rb") as entry_file:
+                metadata = json.loads(entry_file.readline())
+                if time.time() - metadata["stored_at"] > self.ttl:
+                    self.__remove(entry_path)
+                    return None
+                body = zlib.decompress(entry_file.read())
+        except (OSError, ValueError, KeyError, zlib.error):
+            return None
+
+        with self.connection:  # Marks entry as recently used.
+            self.connection.execute("UPDATE entries SET used_at = ? WHERE path = ?", (time.time(), entry_path))
+
+        return CachedResponse(
+            url,
+            body,
+            metadata.get("encoding"),
+            metadata.get("etag"),
+            metadata.get("last_modified"),
+            metadata["stored_at"],
+        )
+
+    def store(self, url: str, response: requests.Response, body: Optional[bytes] = None) -> bool:
+        """Stores response in cache, if it has validators allowing revalidation.
+
+        Args:
+            url: requested url
+            response: response object
+            body: response body (response.content by default)
+
+        Returns:
+            True if response was stored.
+        """
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        if not etag and not last_modified:
+            return False
+
+        metadata = {
+            "url": url,
+            "encoding": response.encoding,
+            "etag": etag,
+            "last_modified": last_modified,
+            "stored_at": time.time(),
+        }
+        entry_path = self.__entry_path(url)
+        os.makedirs(os.path.dirname(entry_path), exist_ok=True)
+
+        entry = json.dumps(metadata).encode() + b"\n" + zlib.compress(response.content if body is None else body)
+        entry_fd, temporary_path = tempfile.mkstemp(dir=os.path.dirname(entry_path))
+        try:
+            with os.fdopen(entry_fd, "wb") as entry_file:
+                entry_file.write(entry)
+            os.replace(temporary_path, entry_path)
+        except OSError:
+            if os.path.exists(temporary_path):
+                os.remove(temporary_path)
+            return False
+
+        with self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO entries (path, size, used_at) VALUES (?, ?, ?)",
+                (entry_path, len(entry), metadata["stored_at"]),
+            )
+
+        self.__stores_count += 1
+        if self.__stores_count % HTTP_CACHE_EVICTION_INTERVAL == 0:
+            self.evict()
+        return True
+
+    def evict(self) -> None:
+        """Removes the least recently used entries until cache fits in max size."""
+        (total_size,) = self.connection.execute("SELECT coalesce(sum(size), 0) FROM entries").fetchone()
+        if total_size <= self.max_size:
+            return
+
+        evicted_paths = []
+        for entry_path, size in self.connection.execute("SELECT path, size FROM entries ORDER BY used_at"):
+            if total_size <= self.max_size:
+                break
+            evicted_paths.append(entry_path)
+            total_size -= size
+
+        for entry_path in evicted_paths:
+            self.__remove(entry_path)
+
+    def __remove(self, entry_path: str) -> None:
+        """Removes entry file and its index row."""
+        try:
+            os.remove(entry_path)
+        except OSError:
+            pass
+        with self.connection:
+            self.connection.execute("DELETE FROM entries WHERE path = ?", (entry_path,))
+
+    def __entry_path(self, url: str) -> str:
+        url_hash = hashlib.sha256(url.encode()).hexdigest()
+        return os.path.join(self.directory, url_hash[:2], url_hash)
+
+
+_caches: dict[int, Optional[ResponseCache]] = {}
+
+
+def get_response_cache() -> Optional[ResponseCache]:
+    """Returns response cache of the current process.
+
+    Returns:
+        ResponseCache object or None if cache is disabled (HTTP_CACHE_ENABLED).
+    """
+    pid = os.getpid()
+    if pid not in _caches:
+        _caches.clear()
+        _caches[pid] = ResponseCache() if HTTP_CACHE_ENABLED else None
+    return _caches[pid]
@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import os
+from typing import Any
+from typing import TYPE_CHECKING
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection
+from urllib3.connection import HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool
+from urllib3.connectionpool import HTTPSConnectionPool
+
+from configuration.config import HTTP_KEEP_ALIVE
+from configuration.config import HTTP_MAX_CONNECTIONS_PER_HOST
+from configuration.config import HTTP_POOL_SIZE
+
+if TYPE_CHECKING:
+    from urllib3._base_connection import BaseHTTPConnection
+
+
+class ConnectionStats:
+    """Counts how often pooled http connections are reused in the current process.
+
+    Usage:
+        CONNECTION_STATS.reused_connections
+
+    Attributes:
+        requests (int): number of requests which needed a connection
+        new_connections (int): number of newly opened connections
+    """
+
+    def __init__(self) -> None:
+        self.requests = 0
+        self.new_connections = 0
+
+    @property
+    def reused_connections(self) -> int:
+        """Number of requests served by already opened (kept alive) connection."""
+        return self.requests - self.new_connections
+
+    def reset(self) -> None:
+        """Resets all counters."""
+        self.requests = 0
+        self.new_connections = 0
+
+    def __str__(self) -> str:
+        return (
+            f"requests: {self.requests}, new connections: {self.new_connections}, "
+            f"reused connections: {self.reused_connections}"
+        )
+
+
+CONNECTION_STATS = ConnectionStats()
+
+
+class CountingHTTPConnection(HTTPConnection):
+    """HTTP connection counting (re)connects in CONNECTION_STATS."""
+
+    def connect(self) -> None:
+        CONNECTION_STATS.new_connections += 1
+        super().connect()
+
+
+class CountingHTTPSConnection(HTTPSConnection):
+    """HTTPS connection counting (re)connects in CONNECTION_STATS."""
+
+    def connect(self) -> None:
+        CONNECTION_STATS.new_connections += 1
+        super().connect()
+
+
+class CountingHTTPConnectionPool(HTTPConnectionPool):
+    """HTTP connection pool counting requests in CONNECTION_STATS."""
+
+    ConnectionCls = CountingHTTPConnection
+
+    def _get_conn(self, timeout: float | None = None) -> BaseHTTPConnection:
+        CONNECTION_STATS.requests += 1
+        return super()._get_conn(timeout)
+
+
+class CountingHTTPSConnectionPool(HTTPSConnectionPool):
+    """HTTPS connection pool counting requests in CONNECTION_STATS."""
+
+    ConnectionCls = CountingHTTPSConnection
+
+    def _get_conn(self, timeout: float | None = None) -> BaseHTTPConnection:
+        CONNECTION_STATS.requests += 1
+        return super()._get_conn(timeout)
+
+
+class PooledHTTPAdapter(HTTPAdapter):
+    """Requests adapter using connection pools which count connections reuse."""
+
+    def init_poolmanager(self, connections: int, maxsize: int, block: bool = False, **pool_kwargs: Any) -> None:
+        super().init_poolmanager(connections, maxsize, block, **pool_kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": CountingHTTPConnectionPool,
+            "https": CountingHTTPSConnectionPool,
+        }
+
+
+def create_session(
+    pool_size: int = HTTP_POOL_SIZE,
+    max_connections_per_host: int = HTTP_MAX_CONNECTIONS_PER_HOST,
+    keep_alive: bool = HTTP_KEEP_ALIVE,
+) -> requests.Session:
+    """Creates requests session with pooled connections.
+
+    Args:
+        pool_size: number of hosts for which connection pools are kept
+        max_connections_per_host: max number of connections kept per host
+        keep_alive: whether connections should be kept open between requests
+
+    Returns:
+        Session object.
+    """
+    session = requests.Session()
+    adapter = PooledHTTPAdapter(pool_connections=pool_size, pool_maxsize=max_connections_per_host)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    if not keep_alive:
+        session.headers["Connection"] = "close"
+    return session
+
+
+_sessions: dict[int, requests.Session] = {}
+
+
+def get_session() -> requests.Session:
+    """Returns pooled session of the current process.
+
+    Sessions are never shared between processes, because forked
+    workers would otherwise use the same sockets as their parent.
+
+    Returns:
+        Session object.
+    """
+    pid = os.getpid()
+    if pid not in _sessions:
+        _sessions.clear()
+        CONNECTION_STATS.reset()
+        _sessions[pid] = create_session()
+    return _sessions[pid]
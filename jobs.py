@@ -1,23 +1,99 @@
 from __future__ import annotations
 
+import codecs
 import multiprocessing
+import queue
+import threading
+import time
+from contextlib import closing
+from fnmatch import fnmatchcase
+from typing import Callable
+from typing import Generator
+from typing import cast
 from typing import Optional
+from urllib.parse import parse_qsl
+from urllib.parse import urlencode
 from urllib.parse import urljoin
+from urllib.parse import urlsplit
+from urllib.parse import urlunsplit
 
 import requests
 from bs4 import BeautifulSoup
 
-from configuration.config import CRAWLED_JOBS_OUTPUT_FILE
+try:
+    from lxml import etree as lxml_etree
+except ImportError:  # pragma: no cover
+    lxml_etree = None  # type: ignore[assignment]
+
+from checkpoint import CrawlCheckpoint
+from configuration.config import CAREER_JOB_BOARDS
+from configuration.config import CHECKPOINT_RESUME
+from configuration.config import COMPANY_MAX_BYTES
+from configuration.config import COMPANY_MAX_FETCHES
+from configuration.config import COMPANY_MAX_SECONDS
+from configuration.config import CRAWL_ENGINE
+from configuration.config import HOST_HEALTH_ENABLED
+from configuration.config import INCREMENTAL_CRAWL
 from configuration.config import JOB_ROLES
+from configuration.config import JOBS_CHECKER_STREAMING
+from configuration.config import LINKS_ALLOWED_SCHEMES
+from configuration.config import LINKS_EXTRACTOR_BACKEND
+from configuration.config import LINKS_HEAD_CHECK
+from configuration.config import LINKS_SKIPPED_EXTENSIONS
+from configuration.config import LINKS_TRACKING_PARAMS
+from configuration.config import MAX_BODY_SIZE
+from configuration.config import POLITENESS_ENABLED
+from configuration.config import STREAMING_CHUNK_SIZE
+from configuration.config import VERDICT_CACHE_ENABLED
+from configuration.config import WEBSITE_DEDUP_ENABLED
+from configuration.config import WORK_QUEUE_SIZE
+from configuration.config import WORKERS_COUNT
+from configuration.config import WORKERS_LIVENESS_INTERVAL
+from crawl_state import content_hash
+from crawl_state import CrawlStateStore
+from crawl_state import settings_fingerprint
 from flask_api import run_flask_monitoring_api
+from helpers import CompanyDbFile
 from helpers import configure_logger
-from helpers import iterate_over_csv_db_file
+from helpers import CrawlTask
+from helpers import is_external_link
 from helpers import LoggerT
+from helpers import website_key
+from host_health import get_host_health
+from host_health import HostHealth
+from host_health import TrippedHostsStore
+from http_cache import get_response_cache
+from http_cache import ResponseCache
+from http_session import CONNECTION_STATS
+from http_session import get_session
+from keyword_matcher import get_keyword_matcher
+from keyword_matcher import KeywordMatcher
+from live_events import get_live_events
+from live_events import LiveEventsHandler
+from metrics import get_crawl_metrics
+from politeness import get_politeness_policy
+from politeness import HostScheduler
+from politeness import PolitenessPolicy
+from politeness import RobotsTxtStore
+from results_writer import FinishedRow
+from results_writer import ResultsWriter
+from storage import get_result_store
+from storage import ResultStore
+from tracing import get_tracer
+from verdict_cache import JobsVerdictCache
 
 
 class UrlFetcher:
     """Implements url html content fetching.
 
+    All requests go through a pooled session, so connections to the same
+    host are kept alive and reused between fetches. Responses with validators
+    are cached on disk and revalidated with conditional requests. Urls disallowed
+    by robots.txt are not fetched and requests to the same host are paced.
+    Timeouts adapt to observed latency of every host, requests to hosts failing repeatedly
+    are skipped (circuit breaker) and no request lasts past the deadline of the fetcher.
+    Requests are counted by outcome and their durations are recorded in crawler metrics.
+
     Usage:
         www_html_text = UrlFetcher().fetch(url)
         if www_html_text is None:
@@ -25,13 +101,56 @@ class UrlFetcher:
 
     Args:
         logger (LoggerT): logger object
+        session (requests.Session): session used for requests (pooled session of the current process by default)
+        cache (ResponseCache): response cache (response cache of the current process by default)
+        politeness (PolitenessPolicy): politeness policy (politeness policy of the current process by default)
+        host_health (HostHealth): host health tracker (host health of the current process by default)
 
     Attributes:
         logger (LoggerT): logger object
+        downloaded_bytes (int): number of content bytes of all fetched pages
+        last_fetch_complete (bool): whether the last fetched page was downloaded to its end or max body size
+            (False after failed request, deadline or error during streaming download)
+        deadline (float): monotonic time after which nothing is fetched, e.g. company deadline (None for no deadline)
     """
 
-    def __init__(self, logger: LoggerT) -> None:
+    def __init__(
+        self,
+        logger: LoggerT,
+        session: Optional[requests.Session] = None,
+        cache: Optional[ResponseCache] = None,
+        politeness: Optional[PolitenessPolicy] = None,
+        host_health: Optional[HostHealth] = None,
+    ) -> None:
         self.logger = logger
+        self.downloaded_bytes = 0
+        self.last_fetch_complete = False
+        self.deadline: Optional[float] = None
+        self.__session = session
+        self.__cache = cache
+        self.__politeness = politeness
+        self.__host_health = host_health
+        self.__deadline_limited = False
+
+    @property
+    def session(self) -> requests.Session:
+        """Session used for requests."""
+        return self.__session or get_session()
+
+    @property
+    def cache(self) -> Optional[ResponseCache]:
+        """Response cache used for requests (None if caching is disabled)."""
+        return self.__cache or get_response_cache()
+
+    @property
+    def politeness(self) -> Optional[PolitenessPolicy]:
+        """Politeness policy applied to requests (None if politeness is disabled)."""
+        return self.__politeness or get_politeness_policy()
+
+    @property
+    def host_health(self) -> Optional[HostHealth]:
+        """Host health tracker applied to requests (None if host health tracking is disabled)."""
+        return self.__host_health or get_host_health()
 
     def fetch(self, url: str) -> Optional[str]:
         """Fetches link (http request execution).
@@ -43,35 +162,166 @@ class UrlFetcher:
             Text with website content or None in case of issues
         """
         self.logger.info(f"Fetching the given url: {url}")
+        self.last_fetch_complete = False
 
-        try:
-            response = requests.get(url, allow_redirects=True, timeout=5)
-            if response.ok:
-                self.logger.debug(f"Successfully fetched the given url: {url}")
-                return response.text
-            else:
+        response = self.get_response(url)
+        if response is None:
+            return None
+
+        self.downloaded_bytes += len(response.content)
+        self.last_fetch_complete = True
+        return response.text
+
+    def iter_text(
+        self, url: str, chunk_size: Optional[int] = None, max_body_size: Optional[int] = None
+    ) -> Generator[str, None, None]:
+        """Fetches link and yields its content chunk after chunk, while it is downloaded.
+
+        Download stops as soon as the caller stops iteration (e.g. closes the generator)
+        or when max body size is reached.
+
+        Args:
+            url: website url link
+            chunk_size: number of bytes downloaded per chunk (STREAMING_CHUNK_SIZE by default)
+            max_body_size: max number of bytes downloaded (MAX_BODY_SIZE by default)
+
+        Yields:
+            Decoded parts of website content. Nothing is yielded in case of issues.
+        """
+        self.logger.info(f"Fetching the given url: {url} [streaming]")
+        self.last_fetch_complete = False
+        chunk_size = chunk_size or STREAMING_CHUNK_SIZE
+        max_body_size = max_body_size or MAX_BODY_SIZE
+
+        response = self.get_response(url, stream=True)
+        if response is None:
+            return
+
+        with response:
+            try:
+                decoder = codecs.getincrementaldecoder(response.encoding or "utf-8")(errors="replace")
+            except LookupError:
+                decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+
+            # Body is kept only if the response has validators (responses served from cache have none).
+            cache = self.cache
+            cacheable = cache is not None and bool(
+                response.headers.get("ETag") or response.headers.get("Last-Modified")
+            )
+            body_chunks = []
+
+            body_size = 0
+            try:
+                for chunk in response.iter_content(chunk_size):
+                    chunk = chunk[: max_body_size - body_size]
+                    body_size += len(chunk)
+                    self.downloaded_bytes += len(chunk)
+                    if cacheable:
+                        body_chunks.append(chunk)
+                    yield decoder.decode(chunk)
+
+                    if body_size >= max_body_size:
+                        self.logger.debug(f"Max body size ({max_body_size} bytes) reached, so stopping download: {url}")
+                        self.last_fetch_complete = True
+                        return
+                    if self.deadline is not None and time.monotonic() >= self.deadline:
+                        self.logger.debug(f"Deadline passed, so stopping download: {url}")
+                        return
+
+                self.last_fetch_complete = True
+                yield decoder.decode(b"", final=True)
+
+                # Reached only if caller consumed the whole body.
+                if cache is not None and cacheable:
+                    cache.store(url, response, b"".join(body_chunks))
+
+            except requests.RequestException as e:
+                self.__failure_outcome(url, e)
                 self.logger.error(
-                    f"Returning None, because something went wrong with request execution ({url}). "
-                    f"Returned status code: {response.status_code}"
+                    f"Something went wrong during streaming download of the given url: {url}. Details: {e}"
                 )
+
+    def get_content_type(self, url: str) -> Optional[str]:
+        """Requests only headers of the link (HEAD request), to learn its content type before download.
+
+        Args:
+            url: website url link
+
+        Returns:
+            Content-Type header value or None if it is unknown (e.g. request failed or is not allowed)
+        """
+        host_health = self.host_health
+        if host_health is not None and not host_health.allows(url):
+            return None
+        try:
+            politeness = self.politeness
+            if politeness is not None:
+                if not politeness.allows(url):
+                    return None
+                politeness.wait(url)
+            response = self.session.head(url, allow_redirects=True, timeout=self.__timeout(url))
+        except requests.RequestException as e:
+            self.logger.debug(f"HEAD request failed, so content type of the given url is unknown: {url}. Details: {e}")
+            return None
+
+        with response:
+            return response.headers.get("Content-Type") if response.ok else None
+
+    def get_response(self, url: str, stream: bool = False) -> Optional[requests.Response]:
+        """Executes http request (with backup http flow for SSL issues).
+
+        Args:
+            url: website url link
+            stream: whether response body should be downloaded lazily
+
+        Returns:
+            Response object or None in case of issues
+        """
+        with get_tracer().span("request", url=url) as span_attributes:
+            response = self.__get_response(url, stream)
+            # Time to response headers includes DNS lookup and connecting (requests does not measure them apart).
+            span_attributes["time_to_headers"] = response.elapsed.total_seconds() if response is not None else None
+        return response
+
+    def __get_response(self, url: str, stream: bool) -> Optional[requests.Response]:
+        """Executes http request, falling back to plain http for SSL issues.
+
+        Args:
+            url: website url link
+            stream: whether response body should be downloaded lazily
+
+        Returns:
+            Response object or None in case of issues
+        """
+        host_health = self.host_health
+        if host_health is not None and not host_health.allows(url):
+            self.logger.info(f"Returning None, because circuit breaker of the host is open: {url}.")
+            get_crawl_metrics().inc("finder_fetches_total", label="circuit_open")
+            return None
+        if self.deadline is not None and time.monotonic() >= self.deadline:
+            self.logger.info(f"Returning None, because deadline passed before fetching the given url: {url}.")
+            get_crawl_metrics().inc("finder_fetches_total", label="deadline")
+            return None
+
+        try:
+            politeness = self.politeness
+            if politeness is not None and not politeness.allows(url):
+                self.logger.info(f"Returning None, because robots.txt disallows fetching the given url: {url}.")
+                get_crawl_metrics().inc("finder_fetches_total", label="disallowed")
                 return None
 
+            return self.__request(url, stream)
+
         except requests.exceptions.SSLError:
+            get_crawl_metrics().inc("finder_fetches_total", label="ssl_error")
+            get_crawl_metrics().inc("finder_ssl_fallbacks_total")
             if url.startswith("https://"):
                 url = url.replace("https://", "http://")
             try:
-                response_backup = requests.get(url, allow_redirects=True, timeout=5)
-                if response_backup.ok:
-                    self.logger.debug(f"Successfully fetched the given url: {url} [backup http flow].")
-                    return response_backup.text
-                else:
-                    self.logger.error(
-                        f"Returning None, because something went wrong with request execution ({url}). "
-                        f"Returned status code: {response_backup.status_code} [backup http flow]."
-                    )
-                    return None
+                return self.__request(url, stream, flow_note=" [backup http flow]")
 
             except Exception as e:
+                get_crawl_metrics().inc("finder_fetches_total", label=self.__failure_outcome(url, e))
                 self.logger.error(
                     f"Returning None, because something went wrong with request execution ({url}). "
                     f"Details: {e!r} [backup http flow]"
@@ -79,33 +329,175 @@ class UrlFetcher:
                 return None
 
         except requests.RequestException as e:
+            get_crawl_metrics().inc("finder_fetches_total", label=self.__failure_outcome(url, e))
             self.logger.error(
                 f"Returning None, because something went wrong with request execution ({url}). Details: {e}"
             )
             return None
 
         except Exception as e:
+            get_crawl_metrics().inc("finder_fetches_total", label="error")
             self.logger.error(
                 f"Returning None, because something went wrong with request execution ({url}). Details: {e}"
             )
             return None
 
+    def __timeout(self, url: str) -> tuple[float, float]:
+        """Returns connect and read timeouts of request to the url (adapted to its host latency and deadline)."""
+        host_health = self.host_health
+        connect_timeout, read_timeout = host_health.timeouts(url) if host_health is not None else (5.0, 5.0)
+        self.__deadline_limited = False
+        if self.deadline is not None:
+            time_left = max(self.deadline - time.monotonic(), 0.001)
+            self.__deadline_limited = time_left < max(connect_timeout, read_timeout)
+            connect_timeout, read_timeout = min(connect_timeout, time_left), min(read_timeout, time_left)
+        return connect_timeout, read_timeout
+
+    def __failure_outcome(self, url: str, error: Exception) -> str:
+        """Returns outcome of the failed request to the url and records the failure in host health.
+
+        Request which failed because its timeout was shortened to the time left to the deadline
+        is counted as "deadline" and is not held against the host.
+        """
+        if self.__deadline_limited and self.deadline is not None and time.monotonic() >= self.deadline:
+            return "deadline"
+
+        outcome = self.error_outcome(error)
+        host_health = self.host_health
+        if host_health is not None:
+            host_health.record_failure(url, outcome)
+        return outcome
+
+    @staticmethod
+    def error_outcome(error: Exception) -> str:
+        """Returns outcome (crawler metrics label) of request which raised the given error.
+
+        Args:
+            error: error raised by request
+
+        Returns:
+            "ssl_error", "timeout", "connection_error" or "error".
+        """
+        if isinstance(error, requests.exceptions.SSLError):
+            return "ssl_error"
+        if isinstance(error, requests.Timeout):
+            return "timeout"
+        if isinstance(error, requests.ConnectionError):
+            return "connection_error"
+        return "error"
+
+    def __request(self, url: str, stream: bool, flow_note: str = "") -> Optional[requests.Response]:
+        """Executes single http request, revalidating cached response if there is one.
+
+        Args:
+            url: website url link
+            stream: whether response body should be downloaded lazily
+            flow_note: suffix added to log messages
+
+        Returns:
+            Response object (also served from cache) or None for not successful status code
+        """
+        cached_response = self.cache.get(url) if self.cache is not None else None
+        headers = cached_response.conditional_headers() if cached_response is not None else {}
+
+        if self.politeness is not None:
+            self.politeness.wait(url)
+
+        crawl_metrics = get_crawl_metrics()
+        started_at = time.perf_counter()
+        try:
+            response = self.session.get(
+                url, allow_redirects=True, timeout=self.__timeout(url), stream=stream, headers=headers
+            )
+        finally:
+            crawl_metrics.observe("finder_fetch_duration_seconds", time.perf_counter() - started_at)
+
+        host_health = self.host_health
+        if host_health is not None:
+            if response.status_code >= 500:
+                host_health.record_failure(url, f"status_{response.status_code}")
+            else:
+                host_health.record_success(url, response.elapsed.total_seconds())
+
+        if response.status_code == 304 and cached_response is not None:
+            response.close()
+            crawl_metrics.inc("finder_fetches_total", label="not_modified")
+            self.logger.debug(f"Not modified, so using cached content of the given url: {url}{flow_note}.")
+            return cached_response.to_response()
+
+        if response.ok:
+            crawl_metrics.inc("finder_fetches_total", label="ok")
+            self.logger.debug(f"Successfully fetched the given url: {url}{flow_note}.")
+            if self.cache is not None and not stream:
+                self.cache.store(url, response)
+            return response
+
+        response.close()
+        crawl_metrics.inc("finder_fetches_total", label="non_2xx")
+        self.logger.error(
+            f"Returning None, because something went wrong with request execution ({url}). "
+            f"Returned status code: {response.status_code}{flow_note}."
+        )
+        return None
+
+
+class AnchorHrefsCollector:
+    """Parser target collecting href attributes of a-tags (no document tree is built).
+
+    Usage:
+        hrefs = lxml_etree.fromstring(html_text, lxml_etree.HTMLParser(target=AnchorHrefsCollector()))
+    """
+
+    def __init__(self) -> None:
+        self.__hrefs: list[str] = []
+
+    def start(self, tag: str | bytes, attrib: dict[str | bytes, str | bytes]) -> None:
+        if tag == "a":
+            href = attrib.get("href")
+            if isinstance(href, str):
+                self.__hrefs.append(href)
+
+    def end(self, tag: str | bytes) -> None:
+        pass
+
+    def data(self, data: str | bytes) -> None:
+        pass
+
+    def comment(self, text: str | bytes) -> None:
+        pass
+
+    def close(self) -> list[str]:
+        hrefs, self.__hrefs = self.__hrefs, []
+        return hrefs
+
 
 class LinksExtractor:
     """Extracts a-tag links from fetched html website content.
 
+    Available backends:
+     - "lxml" - libxml2 based parser collecting only a-tags hrefs (fast, default),
+     - "bs4" - BeautifulSoup with html.parser (slow, but very tolerant).
+    BeautifulSoup is also used as a fallback when lxml is not installed or fails on malformed html.
+
     Usage:
         links = LinkExtractor().extract_links(url)
 
     Args:
         logger (LoggerT): logger object
+        backend: links extraction backend, "lxml" or "bs4" (LINKS_EXTRACTOR_BACKEND by default)
 
     Attributes:
         logger (LoggerT): logger object
+        backend (str): links extraction backend
     """
 
-    def __init__(self, logger: LoggerT) -> None:
+    BACKENDS = ("lxml", "bs4")
+
+    def __init__(self, logger: LoggerT, backend: Optional[str] = None) -> None:
         self.logger = logger
+        self.backend = backend or LINKS_EXTRACTOR_BACKEND
+        if self.backend not in self.BACKENDS:
+            raise ValueError(f"Unknown links extractor backend: {self.backend!r}. Available: {self.BACKENDS}.")
 
     def extract_links(self, baseurl: str, website_html_text: str) -> list[str]:
         """Extracts all a-tags links from html text.
@@ -118,25 +510,185 @@ class LinksExtractor:
             List with links.
         """
         self.logger.debug(f"Extracting links from the given url: {baseurl}")
+
+        with get_tracer().span("extract_links", backend=self.backend) as span_attributes:
+            hrefs = None
+            if self.backend == "lxml" and lxml_etree is not None:
+                hrefs = self.__extract_hrefs_with_lxml(baseurl, website_html_text)
+            if hrefs is None:
+                hrefs = self.__extract_hrefs_with_bs4(website_html_text)
+
+            links_results = [urljoin(baseurl, link) for link in hrefs]
+            span_attributes["links"] = len(links_results)
+        return links_results
+
+    def __extract_hrefs_with_lxml(self, baseurl: str, website_html_text: str) -> Optional[list[str]]:
+        """Extracts a-tags hrefs with lxml parser.
+
+        Args:
+            baseurl: base part of url
+            website_html_text: website html text
+
+        Returns:
+            List with hrefs or None if lxml failed to parse the html text.
+        """
+        try:
+            parser = lxml_etree.HTMLParser(target=AnchorHrefsCollector())
+            return cast(list[str], lxml_etree.fromstring(website_html_text, parser))
+        except (lxml_etree.LxmlError, ValueError) as e:
+            self.logger.debug(f"Lxml failed to parse the given url: {baseurl}, so using BeautifulSoup. Details: {e!r}")
+            return None
+
+    @staticmethod
+    def __extract_hrefs_with_bs4(website_html_text: str) -> list[str]:
+        """Extracts a-tags hrefs with BeautifulSoup.
+
+        Args:
+            website_html_text: website html text
+
+        Returns:
+            List with hrefs.
+        """
         soup = BeautifulSoup(website_html_text, "html.parser")
         links = soup.find_all("a")
         hrefs = [link.get("href") for link in links]
-        links_results = [urljoin(baseurl, link) for link in hrefs]
-        return links_results
+        return [href for href in hrefs if isinstance(href, str)]
+
+
+class CareerLinksFilter:
+    """Normalizes career links and drops the ones not worth a request, before any of them is fetched.
+
+    Links with not allowed schemes (mailto:, tel:, javascript:) or pointing to documents and images are skipped.
+    Links differing only in fragment, tracking query params or scheme and host letter case are fetched once.
+    Fragment is kept in the returned link (it is never sent to server), so it still points to the page anchor.
+    Every skipped link is counted by finder_links_skipped_total (requests avoided during the run).
+
+    Usage:
+        career_links = CareerLinksFilter().filter(links)
+
+    Args:
+        allowed_schemes: schemes of fetched links (LINKS_ALLOWED_SCHEMES by default)
+        tracking_params: query params removed from links, "*" wildcard allowed (LINKS_TRACKING_PARAMS by default)
+        skipped_extensions: extensions of skipped links paths (LINKS_SKIPPED_EXTENSIONS by default)
+
+    Attributes:
+        allowed_schemes (tuple): schemes of fetched links
+        tracking_params (tuple): query params removed from links
+        skipped_extensions (tuple): extensions of skipped links paths
+    """
+
+    HTML_CONTENT_TYPES = ("text/html", "application/xhtml+xml")
+
+    def __init__(
+        self,
+        allowed_schemes: Optional[tuple[str, ...]] = None,
+        tracking_params: Optional[tuple[str, ...]] = None,
+        skipped_extensions: Optional[tuple[str, ...]] = None,
+    ) -> None:
+        self.allowed_schemes = LINKS_ALLOWED_SCHEMES if allowed_schemes is None else allowed_schemes
+        self.tracking_params = LINKS_TRACKING_PARAMS if tracking_params is None else tracking_params
+        self.skipped_extensions = LINKS_SKIPPED_EXTENSIONS if skipped_extensions is None else skipped_extensions
+
+    def filter(self, links: list[str]) -> list[str]:
+        """Normalizes links and drops skipped and repeated ones, keeping page order.
+
+        Args:
+            links: absolute links
+
+        Returns:
+            List with normalized links to be fetched.
+        """
+        filtered_links: dict[str, str] = {}
+        skipped_links = {"scheme": 0, "extension": 0, "duplicate": 0}
+        for link in links:
+            skip_reason = self.skip_reason(link)
+            if skip_reason is not None:
+                skipped_links[skip_reason] += 1
+                continue
+            normalized_link = self.normalize(link)
+            link_key = normalized_link.split("#", 1)[0]
+            if link_key in filtered_links:
+                skipped_links["duplicate"] += 1
+                continue
+            filtered_links[link_key] = normalized_link
+
+        crawl_metrics = get_crawl_metrics()
+        for skip_reason, skipped_count in skipped_links.items():
+            if skipped_count:
+                crawl_metrics.inc("finder_links_skipped_total", skipped_count, label=skip_reason)
+        return list(filtered_links.values())
+
+    def skip_reason(self, link: str) -> Optional[str]:
+        """Checks if the link is not worth a request.
+
+        Args:
+            link: absolute link
+
+        Returns:
+            "scheme" or "extension" for skipped link, None for link to be fetched.
+        """
+        split_link = urlsplit(link.strip())
+        if split_link.scheme.lower() not in self.allowed_schemes or not split_link.netloc:
+            return "scheme"
+        if split_link.path.lower().endswith(self.skipped_extensions):
+            return "extension"
+        return None
+
+    def normalize(self, link: str) -> str:
+        """Lowercases scheme and host and removes tracking query params of the link.
+
+        Args:
+            link: absolute link
+
+        Returns:
+            Normalized link, e.g. "https://firma.pl/Kariera?id=1#oferty" for
+            "HTTPS://Firma.PL/Kariera?utm_source=fb&id=1#oferty".
+        """
+        split_link = urlsplit(link.strip())
+        query_params = parse_qsl(split_link.query, keep_blank_values=True)
+        kept_query_params = [
+            (name, value)
+            for name, value in query_params
+            if not any(fnmatchcase(name.lower(), tracking_param) for tracking_param in self.tracking_params)
+        ]
+        # Query without tracking params is left untouched, so its encoding does not change.
+        query = split_link.query if len(kept_query_params) == len(query_params) else urlencode(kept_query_params)
+        return urlunsplit(
+            (split_link.scheme.lower(), split_link.netloc.lower(), split_link.path, query, split_link.fragment)
+        )
+
+    @classmethod
+    def is_html_content_type(cls, content_type: Optional[str]) -> bool:
+        """Checks if the content type (of HEAD response) may be checked for jobs, unknown one included.
+
+        Args:
+            content_type: Content-Type header value
+
+        Returns:
+            False for known not html content types.
+        """
+        if not content_type:
+            return True
+        return content_type.split(";", 1)[0].strip().lower() in cls.HTML_CONTENT_TYPES
 
 
 class CareerLinksFetcher(LinksExtractor):
     """Extracts a-tag career related links from provided list of links.
 
+    With crawl state store, career links found during previous crawl are reused if homepage did not change.
+
     Usage:
         career_links = CareerLinksExtractor().get_career_links(url)
 
     Args:
         logger (LoggerT): logger object
+        crawl_state (CrawlStateStore): crawl state store (incremental crawl mode)
 
     Attributes:
         CAREER_KEYWORDS (list): list with career related keywords
         logger (LoggerT): logger object
+        url_fetcher (UrlFetcher): url fetcher object
+        crawl_state (CrawlStateStore): crawl state store (None if incremental crawl mode is disabled)
     """
 
     CAREER_KEYWORDS = [
@@ -210,8 +762,10 @@ class CareerLinksFetcher(LinksExtractor):
         "kariera-it",
     ]
 
-    def __init__(self, logger: LoggerT) -> None:
+    def __init__(self, logger: LoggerT, crawl_state: Optional[CrawlStateStore] = None) -> None:
         super().__init__(logger)
+        self.url_fetcher = UrlFetcher(logger)
+        self.crawl_state = crawl_state
 
     def get_career_links(self, baseurl: str) -> list[str]:
         """Filters for potential career related links from list of the links.
@@ -222,184 +776,932 @@ class CareerLinksFetcher(LinksExtractor):
         Returns:
             List with potential career related links.
         """
-        website_html_text = UrlFetcher(self.logger).fetch(baseurl)
+        website_html_text = self.url_fetcher.fetch(baseurl)
 
         if website_html_text is None:
             self.logger.debug(f"Http request failed, so returning empty list of career links [{baseurl}].")
             return []
 
+        if self.crawl_state is None:
+            return self.filter_career_links(baseurl, website_html_text)
+
+        page_hash = content_hash(website_html_text)
+        fingerprint = self.crawl_state_fingerprint()
+        page_state = self.crawl_state.get_page(baseurl, fingerprint)
+        if self.crawl_state.is_unchanged(page_state, page_hash):
+            if page_state is not None and page_state.career_links is not None:
+                self.logger.debug(f"Website did not change since last crawl, so reusing its career links [{baseurl}].")
+                return page_state.career_links
+
+        career_links = self.filter_career_links(baseurl, website_html_text)
+        self.crawl_state.save_page(baseurl, page_hash, career_links=career_links, fingerprint=fingerprint)
+        return career_links
+
+    def crawl_state_fingerprint(self) -> str:
+        """Returns fingerprint of settings which career links found on a page depend on.
+
+        Returns:
+            Hex digest of career keywords, links extraction backend, filter and ranker settings.
+        """
+        career_links_filter = CareerLinksFilter()
+        career_links_ranker = CareerLinksRanker()
+        return settings_fingerprint(
+            self.CAREER_KEYWORDS,
+            self.backend,
+            career_links_filter.allowed_schemes,
+            career_links_filter.tracking_params,
+            career_links_filter.skipped_extensions,
+            career_links_ranker.job_boards,
+            career_links_ranker.SPECIFIC_KEYWORDS,
+            career_links_ranker.GENERIC_KEYWORDS,
+        )
+
+    def filter_career_links(self, baseurl: str, website_html_text: str) -> list[str]:
+        """Extracts links from already fetched website content and keeps only potential career related ones.
+
+        Args:
+            baseurl: base part of url
+            website_html_text: website html text
+
+        Returns:
+            List with potential career related links, the most likely career page first.
+        """
         links = self.extract_links(baseurl, website_html_text)
         if not links:
             self.logger.debug(f"There was not links at all, so returning empty list of career links [{baseurl}].")
             return []
 
         self.logger.debug(f"Filtering links from the given url: {baseurl} to have only potential career links.")
-        potential_career_links = []
-        for link in links:
-            career_keyword_check = [career_keyword for career_keyword in self.CAREER_KEYWORDS if career_keyword in link]
-            if career_keyword_check:
-                potential_career_links.append(link)
+        with get_tracer().span("filter_career_links", links=len(links)):
+            career_keywords_matcher = self.career_keywords_matcher()
+            career_links = [link for link in links if career_keywords_matcher.search(link)]
+            return CareerLinksRanker().rank(baseurl, CareerLinksFilter().filter(career_links))
+
+    @classmethod
+    def career_keywords_matcher(cls) -> KeywordMatcher:
+        """Returns matcher compiled from (deduplicated) CAREER_KEYWORDS.
+
+        Returns:
+            KeywordMatcher object.
+        """
+        return get_keyword_matcher(tuple(cls.CAREER_KEYWORDS), case_sensitive=True)
+
+
+class CareerLinksRanker:
+    """Orders career links from the most to the least likely career page.
+
+    Link score rewards specific career keywords (e.g. "kariera", "oferty-pracy") over generic
+    ones (e.g. "team", "apply"), links to the company own domain (subdomains included) and to
+    known job boards over other external sites, and shallow paths over deep ones. Links to
+    documents and images never get here (CareerLinksFilter skips them). Only urls are scored
+    (extractors collect hrefs only).
+
+    Usage:
+        career_links = CareerLinksRanker().rank(baseurl, career_links)
 
-        return potential_career_links
+    Args:
+        job_boards: domains of job boards (CAREER_JOB_BOARDS by default)
+
+    Attributes:
+        SPECIFIC_KEYWORDS (frozenset): career keywords scored highest
+        GENERIC_KEYWORDS (frozenset): career keywords scored lowest (other keywords are scored in between)
+        job_boards (tuple): domains of job boards
+    """
+
+    SPECIFIC_KEYWORDS = frozenset(
+        {
+            "career",
+            "careers",
+            "jobs",
+            "kariera",
+            "praca",
+            "oferty-pracy",
+            "rekrutacja",
+            "vacancies",
+            "job-openings",
+            "job-listings",
+            "career-opportunities",
+            "employment-opportunities",
+            "engineering-jobs",
+            "praca-it",
+            "praca-w-it",
+            "kariera-it",
+            "oferty-zatrudnienia",
+            "rekrutacja-praca",
+            "zatrudnimy",
+        }
+    )
+    GENERIC_KEYWORDS = frozenset(
+        {
+            "team",
+            "apply",
+            "talent",
+            "opportunities",
+            "positions",
+            "poznaj-nas",
+            "nasz-zespół",
+            "praca-w-zespole",
+            "aplikuj",
+            "work-from-home",
+            "career-path",
+            "staz",
+            "praktyki",
+            "internships",
+        }
+    )
+
+    def __init__(self, job_boards: Optional[tuple[str, ...]] = None) -> None:
+        self.job_boards = job_boards or CAREER_JOB_BOARDS
+
+    def rank(self, baseurl: str, links: list[str]) -> list[str]:
+        """Orders links by score (links with equal score keep their page order), dropping repeated ones.
+
+        Args:
+            baseurl: company website
+            links: career links found on the website
+
+        Returns:
+            List with unique links, the most likely career page first.
+        """
+        unique_links = list(dict.fromkeys(links))
+        return sorted(unique_links, key=lambda link: self.score(baseurl, link), reverse=True)
+
+    def score(self, baseurl: str, link: str) -> float:
+        """Scores link as career page candidate.
+
+        Args:
+            baseurl: company website
+            link: career link
+
+        Returns:
+            Link score (greater for more likely career page).
+        """
+        split_link = urlsplit(link)
+        host = (split_link.hostname or "").removeprefix("www.")
+
+        matched_keywords = CareerLinksFetcher.career_keywords_matcher().find_all(link)
+        keyword_weights = [
+            3.0 if keyword in self.SPECIFIC_KEYWORDS else 1.0 if keyword in self.GENERIC_KEYWORDS else 2.0
+            for keyword in matched_keywords
+        ]
+        score = max(keyword_weights, default=0.0) + 0.5 * (len(keyword_weights) - 1 if keyword_weights else 0)
+
+        if not is_external_link(baseurl, link):
+            score += 2.0
+        elif any(host == job_board or host.endswith(f".{job_board}") for job_board in self.job_boards):
+            score += 1.5
+        else:
+            score -= 2.0
+
+        depth = len([segment for segment in split_link.path.split("/") if segment])
+        score -= 0.5 * max(depth - 1, 0)
+        return score
+
+
+class FetchBudget:
+    """Limits pages fetched, bytes downloaded and time spent on one company.
+
+    Usage:
+        budget = FetchBudget(downloaded_bytes=lambda: url_fetcher.downloaded_bytes)
+        for index, link in enumerate(career_links):
+            limit = budget.exhausted()
+            if limit is not None:
+                budget.abandon(logger, www, limit, len(career_links) - index)
+                break
+            budget.spend()
+            ...
+
+    Args:
+        max_fetches: max number of fetched pages (COMPANY_MAX_FETCHES by default, 0 for no limit)
+        max_bytes: max number of downloaded bytes (COMPANY_MAX_BYTES by default, 0 for no limit)
+        max_seconds: max number of seconds (COMPANY_MAX_SECONDS by default, 0 for no limit)
+        downloaded_bytes: returns number of bytes downloaded so far (bytes are not limited if None)
+
+    Attributes:
+        max_fetches (int): max number of fetched pages
+        max_bytes (int): max number of downloaded bytes
+        max_seconds (float): max number of seconds
+        fetches (int): number of pages fetched so far
+    """
+
+    def __init__(
+        self,
+        max_fetches: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        max_seconds: Optional[float] = None,
+        downloaded_bytes: Optional[Callable[[], int]] = None,
+    ) -> None:
+        self.max_fetches = COMPANY_MAX_FETCHES if max_fetches is None else max_fetches
+        self.max_bytes = COMPANY_MAX_BYTES if max_bytes is None else max_bytes
+        self.max_seconds = COMPANY_MAX_SECONDS if max_seconds is None else max_seconds
+        self.fetches = 0
+        self.__downloaded_bytes = downloaded_bytes
+        self.__initial_bytes = downloaded_bytes() if downloaded_bytes is not None else 0
+        self.__started_at = time.monotonic()
+
+    @property
+    def deadline(self) -> Optional[float]:
+        """Monotonic time after which no request of the company may last (None if time is not limited)."""
+        return self.__started_at + self.max_seconds if self.max_seconds else None
+
+    def spend(self, fetches: int = 1) -> None:
+        """Records fetched pages.
+
+        Args:
+            fetches: number of fetched pages
+
+        Returns:
+            None
+        """
+        self.fetches += fetches
+        get_crawl_metrics().inc("finder_company_fetches_total", fetches)
+
+    def exhausted(self) -> Optional[str]:
+        """Checks whether any limit is reached.
+
+        Returns:
+            Reached limit ("fetches", "bytes" or "seconds") or None if the company may be fetched further.
+        """
+        if self.max_fetches and self.fetches >= self.max_fetches:
+            return "fetches"
+        if self.max_bytes and self.__downloaded_bytes is not None:
+            if self.__downloaded_bytes() - self.__initial_bytes >= self.max_bytes:
+                return "bytes"
+        if self.max_seconds and time.monotonic() - self.__started_at >= self.max_seconds:
+            return "seconds"
+        return None
+
+    def abandon(self, logger: LoggerT, www: str, limit: str, skipped_links: int) -> None:
+        """Records company abandoned with career links left unchecked.
+
+        Args:
+            logger: logger object
+            www: company website
+            limit: reached limit
+            skipped_links: number of career links not fetched
+
+        Returns:
+            None
+        """
+        crawl_metrics = get_crawl_metrics()
+        crawl_metrics.inc("finder_budget_skipped_fetches_total", skipped_links)
+        crawl_metrics.inc("finder_companies_over_budget_total", label=limit)
+        logger.info(
+            f"Company budget of {limit} spent after {self.fetches} fetches, skipped {skipped_links} links: {www}"
+        )
 
 
 class JobsChecker:
     """Provides interface for checking if then given link contains searched jobs.
 
+    In streaming mode the page is checked chunk after chunk while it is downloaded
+    and the download stops as soon as any of the searched jobs is found.
+    With crawl state store (incremental crawl mode) the whole page is downloaded,
+    because verdict saved during previous crawl is reused if the page content did not change.
+    With verdict cache, verdicts of pages outside of company website (e.g. job boards) are shared
+    by all workers, so such a page is checked once per run.
+
+    With HEAD check, links with known not html content type are not downloaded at all.
+
     Usage:
-        has_needed_jobs = JobsChecker().may_company_have_the_needed_jobs(url)
+        has_needed_jobs = JobsChecker().may_company_have_the_needed_jobs(url, www)
 
     Args:
         logger (LoggerT): logger object
+        streaming: whether pages are checked while downloaded (JOBS_CHECKER_STREAMING by default)
+        crawl_state (CrawlStateStore): crawl state store (incremental crawl mode)
+        verdict_cache (JobsVerdictCache): cache of external pages verdicts shared by workers
+        head_check: whether content type is checked with HEAD request before download (LINKS_HEAD_CHECK by default)
 
     Attributes:
         logger (LoggerT): logger object
+        streaming (bool): whether pages are checked while downloaded
+        url_fetcher (UrlFetcher): url fetcher object
+        crawl_state (CrawlStateStore): crawl state store (None if incremental crawl mode is disabled)
+        verdict_cache (JobsVerdictCache): cache of external pages verdicts (None if disabled)
+        head_check (bool): whether content type is checked with HEAD request before download
     """
 
-    def __init__(self, logger: LoggerT) -> None:
+    def __init__(
+        self,
+        logger: LoggerT,
+        streaming: Optional[bool] = None,
+        crawl_state: Optional[CrawlStateStore] = None,
+        verdict_cache: Optional[JobsVerdictCache] = None,
+        head_check: Optional[bool] = None,
+    ) -> None:
         self.logger = logger
+        self.streaming = JOBS_CHECKER_STREAMING if streaming is None else streaming
+        self.url_fetcher = UrlFetcher(logger)
+        self.crawl_state = crawl_state
+        self.verdict_cache = verdict_cache
+        self.head_check = LINKS_HEAD_CHECK if head_check is None else head_check
 
-    def may_company_have_the_needed_jobs(self, url: str) -> bool:
+    def may_company_have_the_needed_jobs(self, url: str, www: Optional[str] = None) -> bool:
         """Checks if the given link www may contain jobs that are searched.
 
         Args:
             url: www link to be checked for jobs search
+            www: website of the company the link was found on (verdict cache is not used if None)
 
         Returns:
             Boolean value describing probability that link contains jobs that are searched.
         """
-        job_phrases = JOB_ROLES
-        self.logger.debug(f"Checking if the given link: {url} contains jobs that are searched ({job_phrases}).")
+        cached_verdict = self.cached_verdict(url, www)
+        if cached_verdict is not None:
+            return cached_verdict
+
+        self.logger.debug(f"Checking if the given link: {url} contains jobs that are searched ({JOB_ROLES}).")
+
+        started_at = time.perf_counter()
+        verdict = self.__check_needed_jobs(url)
+        has_needed_jobs = verdict is True
+        crawl_metrics = get_crawl_metrics()
+        crawl_metrics.observe("finder_jobs_check_duration_seconds", time.perf_counter() - started_at)
+        crawl_metrics.inc("finder_jobs_checks_total", label="found" if has_needed_jobs else "not_found")
+        if verdict is not None:
+            self.save_verdict(url, www, verdict)
+        return has_needed_jobs
+
+    def cached_verdict(self, url: str, www: Optional[str]) -> Optional[bool]:
+        """Returns verdict of the external link checked during the current run by any worker.
+
+        Args:
+            url: www link to be checked for jobs search
+            www: website of the company the link was found on
+
+        Returns:
+            Cached verdict or None if the link has to be checked.
+        """
+        verdict_cache = self.__shared_verdict_cache(url, www)
+        if verdict_cache is None:
+            return None
+
+        cached_verdict = verdict_cache.get(url)
+        get_crawl_metrics().inc("finder_verdict_cache_lookups_total", label="miss" if cached_verdict is None else "hit")
+        if cached_verdict is not None:
+            self.logger.debug(f"Reusing jobs check verdict of the external link: {url}.")
+        return cached_verdict
+
+    def save_verdict(self, url: str, www: Optional[str], has_needed_jobs: bool) -> None:
+        """Shares verdict of the external link with other workers (only verdicts of fully checked pages are saved).
+
+        Args:
+            url: checked link
+            www: website of the company the link was found on
+            has_needed_jobs: jobs check verdict
+
+        Returns:
+            None
+        """
+        verdict_cache = self.__shared_verdict_cache(url, www)
+        if verdict_cache is not None:
+            verdict_cache.save(url, has_needed_jobs)
 
-        website_text = UrlFetcher(self.logger).fetch(url)
+    def __shared_verdict_cache(self, url: str, www: Optional[str]) -> Optional[JobsVerdictCache]:
+        """Returns verdict cache if verdict of the link is shared (links outside of company website only)."""
+        if self.verdict_cache is None or www is None or not is_external_link(www, url):
+            return None
+        return self.verdict_cache
+
+    def __check_needed_jobs(self, url: str) -> Optional[bool]:
+        """Checks website content with the mode selected for the checker.
+
+        Args:
+            url: www link to be checked for jobs search
+
+        Returns:
+            Boolean value describing probability that link contains jobs that are searched
+            or None if the page was not checked to its end (e.g. request failed or was cut by the deadline).
+        """
+        if self.head_check and not CareerLinksFilter.is_html_content_type(self.url_fetcher.get_content_type(url)):
+            self.logger.debug(f"Not downloading the given link, because it is not a html page: {url}.")
+            get_crawl_metrics().inc("finder_links_skipped_total", label="content_type")
+            return None
+
+        if self.crawl_state is not None:
+            return self.__check_needed_jobs_incrementally(url, self.crawl_state)
+
+        if self.streaming:
+            return self.__stream_needed_jobs(url)
+
+        website_text = self.url_fetcher.fetch(url)
 
         if website_text is None:
-            return False
-        else:
-            website_text = website_text.lower()
+            return None
 
-        for job_role in job_phrases:
-            job_role = job_role.lower()
-            if job_role in website_text:
-                return True
+        return self.has_needed_jobs(website_text)
 
-        return False
+    def __check_needed_jobs_incrementally(self, url: str, crawl_state: CrawlStateStore) -> Optional[bool]:
+        """Checks website content, reusing verdict saved during previous crawl if the content did not change.
 
+        Args:
+            url: www link to be checked for jobs search
+            crawl_state: crawl state store
 
-class JobsFileSaver:
-    """Saves to file company data.
+        Returns:
+            Boolean value describing probability that link contains jobs that are searched
+            or None if the page was not fetched.
+        """
+        website_text = self.url_fetcher.fetch(url)
 
-    Usage:
-        CompanyDataFileSaver.save()
+        if website_text is None:
+            return None
 
-    Args:
-        logger (LoggerT): logger object
+        page_hash = content_hash(website_text)
+        fingerprint = settings_fingerprint(JOB_ROLES)
+        page_state = crawl_state.get_page(url, fingerprint)
+        if crawl_state.is_unchanged(page_state, page_hash):
+            if page_state is not None and page_state.has_needed_jobs is not None:
+                self.logger.debug(f"Page did not change since last crawl, so reusing jobs check verdict [{url}].")
+                return page_state.has_needed_jobs
 
-    Attributes:
-        logger (LoggerT): logger object
-    """
+        has_needed_jobs = self.has_needed_jobs(website_text)
+        crawl_state.save_page(url, page_hash, has_needed_jobs=has_needed_jobs, fingerprint=fingerprint)
+        return has_needed_jobs
 
-    def __init__(self, logger: LoggerT) -> None:
-        self.logger = logger
-        self.__filepath = CRAWLED_JOBS_OUTPUT_FILE
+    def __stream_needed_jobs(self, url: str) -> Optional[bool]:
+        """Checks website content chunk after chunk, stopping download when any of the searched jobs is found.
 
-    def save(self, company_data: list[str], link: str) -> None:
-        """Runs www check for the needed job search.
+        Args:
+            url: www link to be checked for jobs search
+
+        Returns:
+            Boolean value describing probability that link contains jobs that are searched
+            or None if no job was found before the download failed or was cut by the deadline.
+        """
+        # Tail of the previous chunk is kept, so phrases split between two chunks are found too.
+        overlap_size = max(self.job_roles_matcher().max_keyword_length - 1, 0)
+        previous_tail = ""
+
+        with closing(self.url_fetcher.iter_text(url)) as text_chunks:
+            for text_chunk in text_chunks:
+                website_text = previous_tail + text_chunk
+                if self.has_needed_jobs(website_text):
+                    return True
+                previous_tail = website_text[-overlap_size:] if overlap_size else ""
+
+        return False if self.url_fetcher.last_fetch_complete else None
+
+    def has_needed_jobs(self, website_text: str) -> bool:
+        """Checks if already fetched website content mentions any of the searched jobs.
 
         Args:
-            company_data: list of strings with company data
-            link: url link for which searched job was found
+            website_text: website content
 
         Returns:
-            None
+            Boolean value describing probability that content contains jobs that are searched.
         """
-        line_number, company_name, krs_number, main_pkd, other_pkd, email, www, voivodeship, address = company_data
+        with get_tracer().span("jobs_scan", characters=len(website_text)):
+            job_role = self.job_roles_matcher().search(website_text)
+        if job_role is None:
+            return False
 
-        with open(CRAWLED_JOBS_OUTPUT_FILE, "a+") as jobs_file:
-            jobs_file.write(f"{company_name};{krs_number};{email};{www};{voivodeship};{address};{link}\n")
-            self.logger.info(f"Found potential job, so breaking loop iteration [{company_name}, {link}].")
+        self.logger.debug(f"Found searched job role: {job_role!r}.")
+        return True
+
+    @staticmethod
+    def job_roles_matcher() -> KeywordMatcher:
+        """Returns matcher compiled from (deduplicated, lowercased) JOB_ROLES.
+
+        Returns:
+            KeywordMatcher object.
+        """
+        return get_keyword_matcher(tuple(JOB_ROLES))
 
 
 class JobScanner:
     """Class scanning company websites for dedicated job roles.
 
+    Company rows are streamed from the DB file through a bounded work queue
+    to a pool of long-lived worker processes, so every worker stays busy
+    until the whole file is processed. With the "async" engine every worker
+    additionally checks many companies concurrently (processes x coroutines).
+
+    Workers pass found jobs and finished rows to a dedicated results writer
+    process, which appends them to the output file in batches. Finished rows
+    come back from the writer once their output is written, so progress is
+    checkpointed and a crashed run is resumed from the unfinished rows.
+
+    Rows are sent to workers through a per-host politeness scheduler, which
+    limits concurrency and paces rows of every host (grouped by resolved IP).
+
+    Rows sharing website with an already crawled row (WEBSITE_DEDUP_ENABLED) are not
+    sent to workers, the results writer finishes them with the verdict of the crawled row.
+    Verdicts of external pages linked by many companies (VERDICT_CACHE_ENABLED) are shared
+    by all workers, so every such page is fetched and checked once per run.
+
+    With TRACING_ENABLED timings of every stage of company row processing are
+    written to the trace file (sync engine only), see tracing.py for the report.
+
+    Log lines and saved results of all processes are published as live events,
+    streamed by the monitoring API, which also exposes crawler metrics updated
+    by all processes (rows throughput, workers utilization, requests outcomes).
+
     Usage:
         jobs_scanner = JobScanner()
         jobs_scanner.run()
 
+    Args:
+        workers_count: number of worker processes (WORKERS_COUNT by default)
+        work_queue_size: max number of rows waiting for a worker (WORK_QUEUE_SIZE by default)
+        engine: crawl engine used by workers, "sync" or "async" (CRAWL_ENGINE by default)
+        incremental: whether pages unchanged since the last run are not re-evaluated (INCREMENTAL_CRAWL by default)
+        result_store: store of found jobs (store selected by RESULT_STORE_BACKEND by default)
+        db_filepath: DB file with company rows (DB_FILEPATH by default)
+        dedup_websites: whether every website is crawled once per run (WEBSITE_DEDUP_ENABLED by default)
+        checkpoint_filepath: checkpoint filepath (CHECKPOINT_FILEPATH by default)
+        share_verdicts: whether workers share verdicts of external pages (VERDICT_CACHE_ENABLED by default)
+
     Attributes:
         logger (LoggerT): logger object
+        workers_count (int): number of worker processes
+        work_queue_size (int): max number of rows waiting for a worker
+        engine (str): crawl engine used by workers
+        crawl_state (CrawlStateStore): crawl state store (None if incremental crawl mode is disabled)
+        verdict_cache (JobsVerdictCache): verdicts of external pages shared by workers (None if disabled)
+        result_store (ResultStore): store of found jobs
+        db_filepath (str): DB file with company rows (None for DB_FILEPATH)
+        dedup_websites (bool): whether every website is crawled once per run
+        checkpoint_filepath (str): checkpoint filepath (None for CHECKPOINT_FILEPATH)
+        live_events (LiveEvents): live events buffer streamed by the monitoring API
+        crawl_metrics (CrawlMetrics): crawler metrics exposed by the monitoring API
         __career_links_fetcher (CareerLinksFetcher): career links fetcher object
         __jobs_checker (JobsChecker): jobs checker object
-        __jobs_file_saver (JobsFileSaver): jobs file saver object
     """
 
-    def __init__(self) -> None:
+    ENGINES = ("sync", "async")
+
+    def __init__(
+        self,
+        workers_count: Optional[int] = None,
+        work_queue_size: Optional[int] = None,
+        engine: Optional[str] = None,
+        incremental: Optional[bool] = None,
+        result_store: Optional[ResultStore] = None,
+        db_filepath: Optional[str] = None,
+        dedup_websites: Optional[bool] = None,
+        checkpoint_filepath: Optional[str] = None,
+        share_verdicts: Optional[bool] = None,
+    ) -> None:
         self.logger = configure_logger("JobScanner")
-        self.__career_links_fetcher = CareerLinksFetcher(self.logger)
-        self.__jobs_checker = JobsChecker(self.logger)
-        self.__jobs_file_saver = JobsFileSaver(self.logger)
-
-    def run(self, start_line_number: int = 0) -> None:
+        self.workers_count = workers_count or WORKERS_COUNT
+        self.work_queue_size = work_queue_size or WORK_QUEUE_SIZE
+        self.engine = engine or CRAWL_ENGINE
+        if self.engine not in self.ENGINES:
+            raise ValueError(f"Unknown crawl engine: {self.engine!r}. Available engines: {self.ENGINES}.")
+        incremental = INCREMENTAL_CRAWL if incremental is None else incremental
+        self.crawl_state = CrawlStateStore() if incremental else None
+        self.__career_links_fetcher = CareerLinksFetcher(self.logger, crawl_state=self.crawl_state)
+        share_verdicts = VERDICT_CACHE_ENABLED if share_verdicts is None else share_verdicts
+        self.verdict_cache = JobsVerdictCache() if share_verdicts else None
+        self.__jobs_checker = JobsChecker(self.logger, crawl_state=self.crawl_state, verdict_cache=self.verdict_cache)
+        self.result_store = result_store or get_result_store(self.logger)
+        self.db_filepath = db_filepath
+        self.dedup_websites = WEBSITE_DEDUP_ENABLED if dedup_websites is None else dedup_websites
+        self.checkpoint_filepath = checkpoint_filepath
+        self.live_events = get_live_events()
+        self.crawl_metrics = get_crawl_metrics()
+        if not any(isinstance(handler, LiveEventsHandler) for handler in self.logger.handlers):
+            self.logger.addHandler(LiveEventsHandler())
+
+    def run(
+        self,
+        start_line_number: int = 0,
+        resume: Optional[bool] = None,
+        rows: Optional[range] = None,
+        new_run: bool = True,
+    ) -> None:
         """Runs job search.
 
         Args:
             start_line_number: number of line in file db to start processing
+            resume: whether unfinished previous run is resumed from its checkpoint (CHECKPOINT_RESUME by default)
+            rows: range of processed DB file row positions, e.g. shard of the file (the whole file by default)
+            new_run: whether state shared during one run is cleared first (False for next shards of the same run,
+                see clear_run_state)
 
         Returns:
             None, but save job/company data directly to output file
         """
-        running_processes = []
-        lock = multiprocessing.Lock()
+        # Matchers are compiled before workers are forked, so every worker inherits them.
+        CareerLinksFetcher.career_keywords_matcher()
+        JobsChecker.job_roles_matcher()
+
+        checkpoint = CrawlCheckpoint(self.checkpoint_filepath)
+        resume = CHECKPOINT_RESUME if resume is None else resume
+        if resume and checkpoint.load():
+            self.logger.info(
+                f"Resuming unfinished run [finished rows: up to {checkpoint.low_water_mark} "
+                f"and {len(checkpoint.finished_rows)} above]."
+            )
+            self.result_store.prepare_resume(checkpoint.output_position)
+        else:
+            # Companies saved before this run are not treated as duplicates if the run is resumed.
+            checkpoint.output_position = self.result_store.end_position()
+            if new_run and get_tracer().enabled:
+                get_tracer().clear()  # Resumed run and next shards of the same run append spans to its trace.
+
+        work_queue: multiprocessing.Queue[Optional[CrawlTask]] = multiprocessing.Queue(maxsize=self.work_queue_size)
+        done_queue: multiprocessing.Queue[Optional[FinishedRow]] = multiprocessing.Queue()
+        results_writer = ResultsWriter(
+            self.logger, self.result_store, done_queue, live_events=self.live_events, db_filepath=self.db_filepath
+        )
+        scheduler = HostScheduler() if POLITENESS_ENABLED else None
+        if new_run:
+            self.clear_run_state()
+
+        results_writer.start()
+        workers = [
+            multiprocessing.Process(target=self.__run_worker, args=(work_queue, results_writer), daemon=True)
+            for _ in range(self.workers_count)
+        ]
+        for worker in workers:
+            worker.start()
+        self.crawl_metrics.set("finder_workers", self.workers_count)
+
+        rows_tracker = threading.Thread(target=self.__track_finished_rows, args=(done_queue, checkpoint, scheduler))
+        rows_tracker.start()
+
+        self.logger.info(
+            f"Started {self.workers_count} {self.engine} workers [work queue size: {self.work_queue_size}]."
+        )
+
+        crawled_websites: Optional[set[str]] = set() if self.dedup_websites else None
+        all_rows_sent = False
+        try:
+            with CompanyDbFile(self.db_filepath) as company_db:
+                # Rows before the start line and rows up to the checkpoint low-water mark are never read.
+                first_row = company_db.find_row(max(start_line_number, checkpoint.low_water_mark + 1))
+                if rows is not None:
+                    first_row = max(first_row, rows.start)
+                for row in company_db.iterate_rows(first_row, None if rows is None else rows.stop):
+                    line_number = row.line_number
+                    if checkpoint.is_finished(line_number) or row.www == "brak_www":
+                        continue
+
+                    crawl_task = row.crawl_task()
+                    checkpoint.start_row(line_number)
+                    if crawled_websites is not None:
+                        website = website_key(crawl_task.www)
+                        if website in crawled_websites:
+                            results_writer.share_verdict(crawl_task, website)
+                            self.crawl_metrics.inc("finder_rows_deduplicated_total")
+                            continue
+                        crawled_websites.add(website)
+
+                    if scheduler is None:
+                        # Blocks while the queue is full, so the DB file is never read far ahead of the workers.
+                        work_queue.put(crawl_task)
+                        continue
+
+                    scheduler.add(crawl_task)
+                    self.__send_scheduled_rows(scheduler, work_queue, scheduler.lookahead - 1, results_writer, workers)
+
+            if scheduler is not None:
+                self.__send_scheduled_rows(scheduler, work_queue, 0, results_writer, workers)
+            all_rows_sent = True
+        finally:
+            # Dead workers do not drain the queue, so it could stay full for their sentinels.
+            for _ in range(sum(worker.is_alive() for worker in workers)):
+                work_queue.put(None)
+            for worker in workers:
+                worker.join()
+            self.crawl_metrics.set("finder_workers", 0)
+
+            # Writer writes buffered lines and passes all finished rows before exiting,
+            # so the sentinel is the last item in the done queue.
+            results_writer.stop()
+            done_queue.put(None)
+            rows_tracker.join()
+            if scheduler is not None:
+                scheduler.close()
+
+            # Rows of records the failed writer did not save stay unfinished, so the checkpoint is kept.
+            if all_rows_sent and results_writer.exitcode == 0 and all(worker.exitcode == 0 for worker in workers):
+                checkpoint.clear()
+            else:
+                checkpoint.save()
 
-        for company_data in iterate_over_csv_db_file():
-            line_number, company_name, krs_number, main_pkd, other_pkd, email, www, voivodeship, address = company_data
+        self.logger.info("All workers finished, the whole DB file was processed.")
 
-            if start_line_number and start_line_number > int(line_number):
-                continue
+    def clear_run_state(self) -> None:
+        """Clears state shared by all workers during one run (stores in the configuration directory).
+
+        Returns:
+            None
+        """
+        if POLITENESS_ENABLED:
+            RobotsTxtStore().clear()  # robots.txt files are fetched once per run.
+        if self.verdict_cache is not None:
+            self.verdict_cache.clear()  # External pages are checked once per run.
+        if HOST_HEALTH_ENABLED:
+            TrippedHostsStore().clear()  # Hosts tripped during the previous run get a new chance.
+
+    @staticmethod
+    def __send_scheduled_rows(
+        scheduler: HostScheduler,
+        work_queue: multiprocessing.Queue[Optional[CrawlTask]],
+        buffered_rows_left: int,
+        results_writer: ResultsWriter,
+        workers: list[multiprocessing.Process],
+    ) -> None:
+        """Sends rows ready to be processed to workers, until only the given number of rows stays buffered.
+
+        Host of a row is released only when the writer passes the row as finished, so rows of the host
+        of a row lost by a dead worker or writer would never get ready. The run fails instead of waiting.
 
-            if www == "brak_www":
+        Args:
+            scheduler: politeness scheduler
+            work_queue: queue with company data rows
+            buffered_rows_left: number of rows left in scheduler buffer
+            results_writer: writer passing finished rows to the scheduler
+            workers: worker processes
+
+        Returns:
+            None
+        """
+        while len(scheduler) > buffered_rows_left:
+            crawl_task = scheduler.next_row(timeout=WORKERS_LIVENESS_INTERVAL)
+            if crawl_task is None:
+                JobScanner.__check_processes_alive(results_writer, workers)
                 continue
+            while True:
+                try:
+                    # Blocks while the queue is full, so the DB file is never read far ahead of the workers.
+                    work_queue.put(crawl_task, timeout=WORKERS_LIVENESS_INTERVAL)
+                    break
+                except queue.Full:
+                    JobScanner.__check_processes_alive(results_writer, workers)
+
+    @staticmethod
+    def __check_processes_alive(results_writer: ResultsWriter, workers: list[multiprocessing.Process]) -> None:
+        """Checks that results writer and all workers are running (they stop only after all rows were sent).
 
-            process = multiprocessing.Process(
-                target=self.__run_www_check_for_the_needed_jobs, args=(www, company_data, lock)
-            )
+        Args:
+            results_writer: writer passing finished rows to the scheduler
+            workers: worker processes
 
-            process.start()
-            running_processes.append(process)
+        Returns:
+            None
+
+        Raises:
+            RuntimeError: if the results writer or any worker process died
+        """
+        if not results_writer.is_alive() or not all(worker.is_alive() for worker in workers):
+            raise RuntimeError("Results writer or worker process died, so buffered rows would never get ready.")
+
+    @staticmethod
+    def __track_finished_rows(
+        done_queue: multiprocessing.Queue[Optional[FinishedRow]],
+        checkpoint: CrawlCheckpoint,
+        scheduler: Optional[HostScheduler],
+    ) -> None:
+        """Records rows reported as finished until the None sentinel is received.
 
-            if not int(line_number) % 12:
-                for p in running_processes:
-                    p.join()
-                else:
-                    self.logger.info(f"Finished all 12-processes-based tasks iteration [line:{line_number}].")
-                    running_processes.clear()
+        Args:
+            done_queue: queue with finished rows
+            checkpoint: checkpoint object
+            scheduler: politeness scheduler (None if politeness is disabled)
 
-    def __run_www_check_for_the_needed_jobs(
-        self, www: str, company_data: list[str], lock: multiprocessing.synchronize.Lock
+        Returns:
+            None
+        """
+        while True:
+            finished_row = done_queue.get()
+            if finished_row is None:
+                break
+            checkpoint.finish_row(finished_row.line_number)
+            if scheduler is not None:
+                scheduler.finish(finished_row.line_number, finished_row.crawl_delay)
+
+    def __run_worker(
+        self,
+        work_queue: multiprocessing.Queue[Optional[CrawlTask]],
+        results_writer: ResultsWriter,
     ) -> None:
-        """Runs www check for the needed job search.
+        """Processes company rows from the work queue until the None sentinel is received.
 
         Args:
-            www: url to be checked for the searched jobs
-            company_data: list of strings with company data
-            lock: lock object for writing to file
+            work_queue: queue with company data rows
+            results_writer: writer to which found jobs and finished rows are passed
 
         Returns:
-            None, but save job/company data directly to output file
+            None
         """
-        line_number, company_name, krs_number, main_pkd, other_pkd, email, www, voivodeship, address = company_data
-        self.logger.info(f"Processing line number: {line_number}, {company_name}")
+        if self.engine == "async":
+            # Imported here, because async_jobs module reuses classes defined in this module.
+            from async_jobs import AsyncCrawlEngine
+
+            def finish_row(crawl_task: CrawlTask, verdict_link: Optional[str]) -> None:
+                self.crawl_metrics.inc("finder_rows_processed_total")
+                results_writer.finish_row(self.__finished_row(crawl_task, None, verdict_link))
 
-        career_links = list(set(self.__career_links_fetcher.get_career_links(www)))
-        career_links_unique = list(set(career_links))
+            AsyncCrawlEngine(self.logger, verdict_cache=self.verdict_cache).run(
+                work_queue, results_writer.save_found_job, finish_row
+            )
+            return
 
-        for link in career_links_unique:
-            if self.__jobs_checker.may_company_have_the_needed_jobs(link):
-                with lock:
-                    self.__jobs_file_saver.save(company_data, link)
+        while True:
+            crawl_task = work_queue.get()
+            if crawl_task is None:
                 break
 
+            crawl_delay, verdict_link = None, None
+            self.crawl_metrics.inc("finder_workers_busy")
+            started_at = time.perf_counter()
+            try:
+                verdict_link = self.__run_www_check_for_the_needed_jobs(crawl_task, results_writer)
+                politeness = get_politeness_policy()
+                if politeness is not None:
+                    crawl_delay = politeness.get_crawl_delay(crawl_task.www)
+            except Exception as e:
+                self.logger.error(
+                    f"Unexpected error during processing line number: {crawl_task.line_number}. Details: {e!r}"
+                )
+            finally:
+                row_duration = time.perf_counter() - started_at
+                self.crawl_metrics.inc("finder_worker_busy_seconds_total", row_duration)
+                self.crawl_metrics.observe("finder_row_duration_seconds", row_duration)
+                self.crawl_metrics.inc("finder_workers_busy", -1)
+
+            self.crawl_metrics.inc("finder_rows_processed_total")
+            results_writer.finish_row(self.__finished_row(crawl_task, crawl_delay, verdict_link))
+
+        self.logger.info(f"Worker finished, http connections usage: {CONNECTION_STATS}.")
+        if self.crawl_state is not None:
+            self.logger.info(
+                f"Worker finished, pages unchanged since last crawl: {self.crawl_state.unchanged_pages}, "
+                f"new or changed pages: {self.crawl_state.changed_pages}."
+            )
+
+    def __finished_row(
+        self, crawl_task: CrawlTask, crawl_delay: Optional[float], verdict_link: Optional[str]
+    ) -> FinishedRow:
+        """Describes row processed by the worker.
+
+        Args:
+            crawl_task: processed row
+            crawl_delay: delay required by the row host (default crawl delay if None)
+            verdict_link: link for which searched job was found (None if not found)
+
+        Returns:
+            FinishedRow object, with verdict of the website if it is reused for rows of the same website.
+        """
+        if not self.dedup_websites:
+            return FinishedRow(crawl_task.line_number, crawl_delay)
+        return FinishedRow(crawl_task.line_number, crawl_delay, website_key(crawl_task.www), verdict_link)
+
+    def __downloaded_bytes(self) -> int:
+        """Number of bytes downloaded by the worker fetchers."""
+        return (
+            self.__career_links_fetcher.url_fetcher.downloaded_bytes + self.__jobs_checker.url_fetcher.downloaded_bytes
+        )
+
+    def __run_www_check_for_the_needed_jobs(
+        self, crawl_task: CrawlTask, results_writer: ResultsWriter
+    ) -> Optional[str]:
+        """Runs www check for the needed job search.
+
+        Args:
+            crawl_task: company row with url to be checked for the searched jobs
+            results_writer: writer to which found job is passed
+
+        Returns:
+            Link for which searched job was found (None if not found), found job is passed to results writer
+        """
+        line_number, www = crawl_task.line_number, crawl_task.www
+        self.logger.info(f"Processing line number: {line_number}, {www}")
+
+        tracer = get_tracer()
+        budget = FetchBudget(downloaded_bytes=self.__downloaded_bytes)
+        # Requests are cut at the company deadline, so one slow host cannot hold the worker much longer.
+        self.__career_links_fetcher.url_fetcher.deadline = budget.deadline
+        self.__jobs_checker.url_fetcher.deadline = budget.deadline
+        with tracer.trace_row(line_number, www):
+            with tracer.span("career_links") as span_attributes:
+                # Links are ranked, so the most likely career page is checked first.
+                career_links = self.__career_links_fetcher.get_career_links(www)
+                span_attributes["career_links"] = len(career_links)
+            budget.spend()
+            verdict_link = None
+
+            for index, link in enumerate(career_links):
+                limit = budget.exhausted()
+                if limit is not None:
+                    budget.abandon(self.logger, www, limit, len(career_links) - index)
+                    break
+                budget.spend()
+                with tracer.span("jobs_check", url=link) as span_attributes:
+                    has_needed_jobs = self.__jobs_checker.may_company_have_the_needed_jobs(link, www)
+                    span_attributes["found"] = has_needed_jobs
+                if has_needed_jobs:
+                    results_writer.save_found_job(crawl_task, link)
+                    verdict_link = link
+                    break
+
+        return verdict_link
+
 
 @run_flask_monitoring_api
 def run_job_scanner() -> None:
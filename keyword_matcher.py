@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import Iterable
+from typing import Optional
+
+
+class KeywordMatcher:
+    """Matches many keywords against a text in a single pass.
+
+    Keywords are deduplicated and compiled once into an Aho-Corasick automaton,
+    which finds all of them (also overlapping ones, like "job" and "jobs") in one pass.
+
+    For a few keywords and long texts CPython's substring search (`in`) is still faster
+    than a pure Python automaton, so search() picks the cheaper strategy for every text
+    (see benchmarks/bench_keyword_matcher.py).
+
+    Usage:
+        matcher = KeywordMatcher(["python developer", "programista python"])
+        if matcher.search(website_text):
+            print(matcher.find_all(website_text))
+
+    Args:
+        keywords: keywords to be matched
+        case_sensitive: whether matching is case-sensitive (by default keywords and text are lowercased)
+
+    Attributes:
+        keywords (tuple): deduplicated keywords
+        case_sensitive (bool): whether matching is case-sensitive
+        max_keyword_length (int): length of the longest keyword
+    """
+
+    # Cost of one automaton step and of one `in` call, both relative to cost of `in` scanning one character.
+    AUTOMATON_CHAR_COST = 140
+    SUBSTRING_CALL_COST = 100
+
+    def __init__(self, keywords: Iterable[str], case_sensitive: bool = False) -> None:
+        self.case_sensitive = case_sensitive
+        normalized_keywords = (keyword if case_sensitive else keyword.lower() for keyword in keywords)
+        self.keywords = tuple(dict.fromkeys(keyword for keyword in normalized_keywords if keyword))
+        self.max_keyword_length = max((len(keyword) for keyword in self.keywords), default=0)
+
+        self.__transitions: list[dict[str, int]] = []
+        self.__outputs: list[tuple[str, ...]] = []
+        self.__build_automaton()
+
+    def __build_automaton(self) -> None:
+        """Builds Aho-Corasick automaton with fail links resolved into plain transitions."""
+        transitions: list[dict[str, int]] = [{}]
+        outputs: list[list[str]] = [[]]
+
+        for keyword in self.keywords:
+            state = 0
+            for char in keyword:
+                if char not in transitions[state]:
+                    transitions.append({})
+                    outputs.append([])
+                    transitions[state][char] = len(transitions) - 1
+                state = transitions[state][char]
+            outputs[state].append(keyword)
+
+        # Breadth-first walk: every state inherits transitions and outputs of its fail state,
+        # so matching never has to follow fail links (one dict lookup per character).
+        fail = [0] * len(transitions)
+        resolved = [dict(transition) for transition in transitions]
+        queue = list(transitions[0].values())
+
+        for state in queue:
+            for char, next_state in transitions[state].items():
+                fail_state = fail[state]
+                while fail_state and char not in transitions[fail_state]:
+                    fail_state = fail[fail_state]
+                fail[next_state] = transitions[fail_state].get(char, 0)
+                outputs[next_state].extend(outputs[fail[next_state]])
+                queue.append(next_state)
+
+            for char, next_state in resolved[fail[state]].items():
+                resolved[state].setdefault(char, next_state)
+
+        self.__transitions = resolved
+        self.__outputs = [tuple(output) for output in outputs]
+
+    def search(self, text: str) -> Optional[str]:
+        """Finds a keyword occurring in the text.
+
+        Args:
+            text: text to be searched
+
+        Returns:
+            Matched keyword or None.
+        """
+        if not self.case_sensitive:
+            text = text.lower()
+
+        substring_scan_cost = len(self.keywords) * (self.SUBSTRING_CALL_COST + len(text))
+        if substring_scan_cost <= self.AUTOMATON_CHAR_COST * len(text):
+            for keyword in self.keywords:
+                if keyword in text:
+                    return keyword
+            return None
+
+        transitions = self.__transitions
+        outputs = self.__outputs
+        state = 0
+
+        for char in text:
+            state = transitions[state].get(char, 0)
+            if outputs[state]:
+                return outputs[state][0]
+
+        return None
+
+    def find_all(self, text: str) -> set[str]:
+        """Finds all keywords occurring in the text.
+
+        Args:
+            text: text to be searched
+
+        Returns:
+            Set with matched keywords.
+        """
+        if not self.case_sensitive:
+            text = text.lower()
+
+        transitions = self.__transitions
+        outputs = self.__outputs
+        matched: set[str] = set()
+        state = 0
+
+        for char in text:
+            state = transitions[state].get(char, 0)
+            if outputs[state]:
+                matched.update(outputs[state])
+
+        return matched
+
+
+@lru_cache(maxsize=16)
+def get_keyword_matcher(keywords: tuple[str, ...], case_sensitive: bool = False) -> KeywordMatcher:
+    """Returns matcher for the given keywords, compiled only once per process.
+
+    Args:
+        keywords: keywords to be matched
+        case_sensitive: whether matching is case-sensitive
+
+    Returns:
+        KeywordMatcher object.
+    """
+    return KeywordMatcher(keywords, case_sensitive)
@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+import logging
+import multiprocessing
+import os
+import threading
+from collections import deque
+from itertools import islice
+from typing import Any
+from typing import NamedTuple
+from typing import Optional
+
+from configuration.config import LIVE_EVENTS_BUFFER_SIZE
+from configuration.config import LIVE_EVENTS_LOG_LEVEL
+
+
+class LiveEvent(NamedTuple):
+    """Crawl event streamed by the monitoring API ("log" line or found jobs "result")."""
+
+    id: int
+    kind: str
+    data: Any
+
+
+class LiveEvents:
+    """In-memory ring buffer of the latest crawl events, streamed by the monitoring API.
+
+    Events are kept by the process which created the object (JobScanner process, where
+    the monitoring API runs). Processes forked from it (workers, results writer) publish
+    events through a multiprocessing queue, which is drained into the buffer by a listener
+    thread, so streamed log lines and results are never re-read from files.
+
+    Usage:
+        live_events = get_live_events()
+        live_events.publish("log", line)
+        events = live_events.wait(last_event_id, timeout)
+
+    Args:
+        capacity: max number of buffered events (LIVE_EVENTS_BUFFER_SIZE by default)
+
+    Attributes:
+        capacity (int): max number of buffered events
+    """
+
+    def __init__(self, capacity: Optional[int] = None) -> None:
+        self.capacity = capacity or LIVE_EVENTS_BUFFER_SIZE
+        self.__owner_pid = os.getpid()
+        self.__events: deque[LiveEvent] = deque(maxlen=self.capacity)
+        self.__last_event_id = 0
+        self.__condition = threading.Condition()
+        self.__events_queue: multiprocessing.Queue[tuple[str, Any]] = multiprocessing.Queue()
+        threading.Thread(target=self.__listen, daemon=True).start()
+
+    def publish(self, kind: str, data: Any) -> None:
+        """Adds event to the buffer (events of forked processes are queued to the owner process).
+
+        Args:
+            kind: event kind
+            data: JSON serializable event data
+
+        Returns:
+            None
+        """
+        if os.getpid() != self.__owner_pid:
+            self.__events_queue.put((kind, data))
+            return
+        self.__append(kind, data)
+
+    def wait(self, last_event_id: int, timeout: Optional[float] = None) -> list[LiveEvent]:
+        """Waits for events newer than the given one.
+
+        Args:
+            last_event_id: id of the last event already received (0 if none)
+            timeout: max number of seconds to wait
+
+        Returns:
+            Buffered events newer than the given one (oldest ones may be already dropped from the buffer),
+            empty list if none arrived before timeout.
+        """
+        with self.__condition:
+            if last_event_id > self.__last_event_id:
+                # Id received from the stream of the previous run.
+                last_event_id = 0
+            self.__condition.wait_for(lambda: self.__last_event_id > last_event_id, timeout)
+            if not self.__events:
+                return []
+            start = max(0, last_event_id - self.__events[0].id + 1)
+            return list(islice(self.__events, start, None))
+
+    def __append(self, kind: str, data: Any) -> None:
+        with self.__condition:
+            self.__last_event_id += 1
+            self.__events.append(LiveEvent(self.__last_event_id, kind, data))
+            self.__condition.notify_all()
+
+    def __listen(self) -> None:
+        while True:
+            kind, data = self.__events_queue.get()
+            self.__append(kind, data)
+
+
+class LiveEventsHandler(logging.Handler):
+    """Logging handler publishing formatted log lines as "log" live events.
+
+    Lines below the handler level are dropped before they reach the queue of forked processes,
+    so workers logging at DEBUG level do not push every line to the JobScanner process.
+
+    Args:
+        level: min level of published lines (LIVE_EVENTS_LOG_LEVEL by default)
+    """
+
+    def __init__(self, level: Optional[str] = None) -> None:
+        super().__init__(level or LIVE_EVENTS_LOG_LEVEL)
+        self.setFormatter(logging.Formatter("%(asctime)s - %(levelname)s - %(message)s"))
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            get_live_events().publish("log", self.format(record))
+        except Exception:
+            self.handleError(record)
+
+
+_live_events: Optional[LiveEvents] = None
+
+
+def get_live_events() -> LiveEvents:
+    """Returns live events buffer (processes forked after the first call share the buffer of their parent).
+
+    Returns:
+        LiveEvents object.
+    """
+    global _live_events
+    if _live_events is None:
+        _live_events = LiveEvents()
+    return _live_events
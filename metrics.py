@@ -0,0 +1,258 @@
+from __future__ import annotations
+
+import multiprocessing
+from bisect import bisect_left
+from typing import NamedTuple
+from typing import Optional
+
+from configuration.config import METRICS_DURATION_BUCKETS
+
+
+FETCH_OUTCOMES = (
+    "ok",
+    "not_modified",
+    "non_2xx",
+    "disallowed",
+    "circuit_open",
+    "deadline",
+    "timeout",
+    "ssl_error",
+    "connection_error",
+    "error",
+)
+
+
+class MetricDefinition(NamedTuple):
+    """Crawler metric ("counter", "gauge" or "histogram"), optionally with one label."""
+
+    name: str
+    kind: str
+    documentation: str
+    label_name: Optional[str] = None
+    label_values: tuple[str, ...] = ("",)
+
+
+METRICS = (
+    MetricDefinition("finder_rows_processed_total", "counter", "Company rows processed by workers."),
+    MetricDefinition(
+        "finder_rows_deduplicated_total", "counter", "Company rows not crawled, verdict of the same website reused."
+    ),
+    MetricDefinition("finder_workers", "gauge", "Number of worker processes."),
+    MetricDefinition("finder_workers_busy", "gauge", "Number of workers processing a company row."),
+    MetricDefinition(
+        "finder_worker_busy_seconds_total", "counter", "Time spent by workers on processing company rows."
+    ),
+    MetricDefinition("finder_row_duration_seconds", "histogram", "Duration of company row processing."),
+    MetricDefinition("finder_company_fetches_total", "counter", "Pages fetched for companies, homepages included."),
+    MetricDefinition(
+        "finder_budget_skipped_fetches_total", "counter", "Career links not fetched, because company budget was spent."
+    ),
+    MetricDefinition(
+        "finder_companies_over_budget_total",
+        "counter",
+        "Companies abandoned by exhausted budget limit.",
+        "limit",
+        ("fetches", "bytes", "seconds"),
+    ),
+    MetricDefinition(
+        "finder_links_skipped_total",
+        "counter",
+        "Career links not fetched, because they were filtered out before fetch.",
+        "reason",
+        ("scheme", "extension", "duplicate", "content_type"),
+    ),
+    MetricDefinition("finder_fetches_total", "counter", "Http requests by outcome.", "outcome", FETCH_OUTCOMES),
+    MetricDefinition("finder_ssl_fallbacks_total", "counter", "Urls requested again over http after SSL error."),
+    MetricDefinition(
+        "finder_host_breaker_trips_total", "counter", "Circuit breaker trips of hosts failing repeatedly."
+    ),
+    MetricDefinition("finder_fetch_duration_seconds", "histogram", "Http request duration."),
+    MetricDefinition(
+        "finder_jobs_checks_total",
+        "counter",
+        "Links checked for searched jobs by verdict.",
+        "verdict",
+        ("found", "not_found"),
+    ),
+    MetricDefinition("finder_jobs_check_duration_seconds", "histogram", "Duration of link check for searched jobs."),
+    MetricDefinition(
+        "finder_verdict_cache_lookups_total",
+        "counter",
+        "Lookups of external links verdicts shared by workers.",
+        "result",
+        ("hit", "miss"),
+    ),
+)
+
+
+class CrawlMetrics:
+    """Crawler counters, gauges and histograms aggregated across processes, rendered in Prometheus text format.
+
+    Values live in one shared memory array allocated by the process which created the object,
+    so processes forked from it (workers, results writer) update the same values. Every update
+    is a few additions under the array lock, cheap compared to the instrumented http requests.
+    Histograms keep per-bucket counts, so latency percentiles are computed by Prometheus.
+
+    Usage:
+        crawl_metrics = get_crawl_metrics()
+        crawl_metrics.inc("finder_fetches_total", label="ok")
+        crawl_metrics.observe("finder_fetch_duration_seconds", duration)
+        text = crawl_metrics.render()
+
+    Args:
+        buckets: upper bounds of histogram buckets in seconds (METRICS_DURATION_BUCKETS by default)
+
+    Attributes:
+        buckets (tuple): upper bounds of histogram buckets in seconds
+    """
+
+    def __init__(self, buckets: Optional[tuple[float, ...]] = None) -> None:
+        self.buckets = buckets or METRICS_DURATION_BUCKETS
+        self.__definitions = {definition.name: definition for definition in METRICS}
+        self.__offsets: dict[tuple[str, str], int] = {}
+        size = 0
+        for definition in METRICS:
+            # Histogram keeps count of every bucket, count of the +Inf bucket and sum of observed values.
+            slots = len(self.buckets) + 2 if definition.kind == "histogram" else 1
+            for label_value in definition.label_values:
+                self.__offsets[(definition.name, label_value)] = size
+                size += slots
+        self.__values = multiprocessing.Array("d", size)
+
+    def inc(self, name: str, value: float = 1.0, label: str = "") -> None:
+        """Increases counter or gauge.
+
+        Args:
+            name: metric name
+            value: added value (negative value decreases gauge)
+            label: label value (empty for metrics without label)
+
+        Returns:
+            None
+        """
+        offset = self.__offsets[(name, label)]
+        with self.__values.get_lock():
+            self.__values[offset] += value
+
+    def set(self, name: str, value: float, label: str = "") -> None:
+        """Sets gauge value.
+
+        Args:
+            name: metric name
+            value: new value
+            label: label value (empty for metrics without label)
+
+        Returns:
+            None
+        """
+        offset = self.__offsets[(name, label)]
+        with self.__values.get_lock():
+            self.__values[offset] = value
+
+    def observe(self, name: str, value: float, label: str = "") -> None:
+        """Records value in histogram.
+
+        Args:
+            name: metric name
+            value: observed value
+            label: label value (empty for metrics without label)
+
+        Returns:
+            None
+        """
+        offset = self.__offsets[(name, label)]
+        bucket_offset = offset + bisect_left(self.buckets, value)
+        with self.__values.get_lock():
+            self.__values[bucket_offset] += 1
+            self.__values[offset + len(self.buckets) + 1] += value
+
+    def value(self, name: str, label: str = "") -> float:
+        """Returns value of counter or gauge (number of observations for histogram).
+
+        Args:
+            name: metric name
+            label: label value (empty for metrics without label)
+
+        Returns:
+            Current value.
+        """
+        offset = self.__offsets[(name, label)]
+        with self.__values.get_lock():
+            if self.__definitions[name].kind == "histogram":
+                end = offset + len(self.buckets) + 1
+                return float(sum(self.__values[offset:end]))
+            return float(self.__values[offset])
+
+    def quantile(self, name: str, fraction: float, label: str = "") -> Optional[float]:
+        """Estimates quantile of histogram values (linear interpolation within bucket, as Prometheus does).
+
+        Args:
+            name: histogram name
+            fraction: quantile as a fraction (e.g. 0.95)
+            label: label value (empty for metrics without label)
+
+        Returns:
+            Estimated quantile (the greatest bucket bound if it falls into +Inf bucket) or None without observations.
+        """
+        offset = self.__offsets[(name, label)]
+        with self.__values.get_lock():
+            end = offset + len(self.buckets) + 1
+            counts: list[float] = self.__values[offset:end]
+
+        rank = fraction * sum(counts)
+        if not rank:
+            return None
+        cumulative_count = 0.0
+        for bucket_index, upper_bound in enumerate(self.buckets):
+            if cumulative_count + counts[bucket_index] >= rank:
+                lower_bound = self.buckets[bucket_index - 1] if bucket_index else 0.0
+                position = (rank - cumulative_count) / counts[bucket_index]
+                return lower_bound + (upper_bound - lower_bound) * position
+            cumulative_count += counts[bucket_index]
+        return self.buckets[-1]
+
+    def render(self) -> str:
+        """Renders all metrics in Prometheus text exposition format.
+
+        Returns:
+            Text with all metrics.
+        """
+        with self.__values.get_lock():
+            values = self.__values[:]
+
+        lines = []
+        for definition in METRICS:
+            lines.append(f"# HELP {definition.name} {definition.documentation}")
+            lines.append(f"# TYPE {definition.name} {definition.kind}")
+            for label_value in definition.label_values:
+                offset = self.__offsets[(definition.name, label_value)]
+                label = f'{definition.label_name}="{label_value}"' if definition.label_name else ""
+                labels = f"{{{label}}}" if label else ""
+                if definition.kind != "histogram":
+                    lines.append(f"{definition.name}{labels} {values[offset]}")
+                    continue
+
+                # Prometheus buckets are cumulative (every bucket counts values up to its upper bound).
+                cumulative_count = 0.0
+                for bucket_index, upper_bound in enumerate((*self.buckets, "+Inf")):
+                    cumulative_count += values[offset + bucket_index]
+                    bucket_labels = f'{{{label + "," if label else ""}le="{upper_bound}"}}'
+                    lines.append(f"{definition.name}_bucket{bucket_labels} {cumulative_count}")
+                lines.append(f"{definition.name}_sum{labels} {values[offset + len(self.buckets) + 1]}")
+                lines.append(f"{definition.name}_count{labels} {cumulative_count}")
+        return "\n".join(lines) + "\n"
+
+
+_crawl_metrics: Optional[CrawlMetrics] = None
+
+
+def get_crawl_metrics() -> CrawlMetrics:
+    """Returns crawler metrics (processes forked after the first call update metrics of their parent).
+
+    Returns:
+        CrawlMetrics object.
+    """
+    global _crawl_metrics
+    if _crawl_metrics is None:
+        _crawl_metrics = CrawlMetrics()
+    return _crawl_metrics
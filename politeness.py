@@ -0,0 +1,473 @@
+from __future__ import annotations
+
+import os
+import socket
+import sqlite3
+import threading
+import time
+from collections import deque
+from collections import OrderedDict
+from concurrent.futures import Future
+from concurrent.futures import ThreadPoolExecutor
+from typing import cast
+from typing import Optional
+from urllib.parse import urlsplit
+from urllib.robotparser import RobotFileParser
+
+import requests
+
+from configuration.config import POLITENESS_CRAWL_DELAY
+from configuration.config import POLITENESS_ENABLED
+from configuration.config import POLITENESS_GROUP_BY_IP
+from configuration.config import POLITENESS_LOOKAHEAD
+from configuration.config import POLITENESS_MAX_CONCURRENCY_PER_HOST
+from configuration.config import POLITENESS_MAX_CRAWL_DELAY
+from configuration.config import POLITENESS_RESOLVER_THREADS
+from configuration.config import ROBOTS_TXT_FILEPATH
+from helpers import CrawlTask
+from http_session import get_session
+
+
+def host_of(url: str) -> str:
+    """Returns lowercased host of the given url (company www may lack the scheme).
+
+    Args:
+        url: website url link
+
+    Returns:
+        Host name.
+    """
+    split_url = urlsplit(url if "://" in url else "http://" + url)
+    return (split_url.hostname or url).lower()
+
+
+def robots_txt_origin(url: str) -> str:
+    """Returns scheme and host part of the given url, robots.txt files are fetched and stored per origin.
+
+    Args:
+        url: website url link
+
+    Returns:
+        Lowercased origin, e.g. "https://firma.pl" for "https://Firma.pl/kariera".
+    """
+    split_url = urlsplit(url if "://" in url else "http://" + url)
+    return f"{split_url.scheme}://{split_url.netloc}".lower()
+
+
+class RobotsTxtStore:
+    """SQLite store of robots.txt files fetched during the current run, shared by all worker processes.
+
+    Usage:
+        robots_txt_store = RobotsTxtStore()
+        robots_txt = robots_txt_store.get(origin)
+
+    Args:
+        filepath: SQLite database filepath (ROBOTS_TXT_FILEPATH by default)
+
+    Attributes:
+        filepath (str): SQLite database filepath
+    """
+
+    def __init__(self, filepath: Optional[str] = None) -> None:
+        self.filepath = filepath or ROBOTS_TXT_FILEPATH
+        # Connection of a finished thread is closed with its thread-local data.
+        self.__local = threading.local()
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        """Connection of the current process and thread (async engine uses the store from executor threads)."""
+        pid = os.getpid()
+        # Thread-local data of the forking thread is inherited, so the pid tells whether it belongs to this process.
+        if getattr(self.__local, "pid", None) != pid:
+            connection = sqlite3.connect(self.filepath, timeout=30)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            with connection:
+                connection.execute(
+                    "CREATE TABLE IF NOT EXISTS robots_txt ("
+                    " origin TEXT PRIMARY KEY, status_code INTEGER NOT NULL, body TEXT NOT NULL,"
+                    " fetched_at REAL NOT NULL)"
+                )
+            self.__local.pid, self.__local.connection = pid, connection
+        return cast(sqlite3.Connection, self.__local.connection)
+
+    def get(self, origin: str) -> Optional[tuple[int, str]]:
+        """Returns robots.txt fetched for the given origin.
+
+        Args:
+            origin: scheme and host part of url
+
+        Returns:
+            Tuple with status code and body or None if robots.txt was not fetched yet.
+        """
+        row = self.connection.execute("SELECT status_code, body FROM robots_txt WHERE origin = ?", (origin,)).fetchone()
+        return None if row is None else (row[0], row[1])
+
+    def save(self, origin: str, status_code: int, body: str) -> None:
+        """Saves robots.txt fetched for the given origin.
+
+        Args:
+            origin: scheme and host part of url
+            status_code: response status code (0 if request failed)
+            body: response body
+
+        Returns:
+            None
+        """
+        with self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO robots_txt (origin, status_code, body, fetched_at) VALUES (?, ?, ?, ?)",
+                (origin, status_code, body, time.time()),
+            )
+
+    def clear(self) -> None:
+        """Removes all robots.txt files (every run fetches them again)."""
+        with self.connection:
+            self.connection.execute("DELETE FROM robots_txt")
+
+
+class PolitenessPolicy:
+    """Respects robots.txt rules and paces requests to the same host within the current process.
+
+    robots.txt of every host is fetched once per run (RobotsTxtStore is shared by all workers).
+    Pacing between processes is ensured by HostScheduler, which gives every host to a limited
+    number of workers at once. The policy may be used by many threads of one process (async engine
+    checks robots.txt rules in executor threads).
+
+    Usage:
+        politeness = PolitenessPolicy()
+        if politeness.allows(url):
+            politeness.wait(url)
+            ...
+
+    Args:
+        robots_txt_store: robots.txt store (RobotsTxtStore with default filepath by default)
+        session: session used for robots.txt requests (pooled session of the current process by default)
+        crawl_delay: default delay between requests to one host (POLITENESS_CRAWL_DELAY by default)
+
+    Attributes:
+        robots_txt_store (RobotsTxtStore): robots.txt store
+        crawl_delay (float): default delay between requests to one host
+    """
+
+    ROBOTS_TXT_MAX_SIZE = 512 * 1024
+    HOSTS_CACHE_SIZE = 1024
+
+    def __init__(
+        self,
+        robots_txt_store: Optional[RobotsTxtStore] = None,
+        session: Optional[requests.Session] = None,
+        crawl_delay: Optional[float] = None,
+    ) -> None:
+        self.robots_txt_store = robots_txt_store or RobotsTxtStore()
+        self.crawl_delay = POLITENESS_CRAWL_DELAY if crawl_delay is None else crawl_delay
+        self.__session = session
+        self.__robots_txt_parsers: OrderedDict[str, RobotFileParser] = OrderedDict()
+        self.__last_requests: OrderedDict[str, float] = OrderedDict()
+        self.__lock = threading.RLock()
+
+    @property
+    def session(self) -> requests.Session:
+        """Session used for robots.txt requests."""
+        return self.__session or get_session()
+
+    @property
+    def user_agent(self) -> str:
+        """User agent matched against robots.txt rules."""
+        return str(self.session.headers.get("User-Agent", "*"))
+
+    def allows(self, url: str) -> bool:
+        """Checks if robots.txt of the url host allows fetching it.
+
+        Args:
+            url: website url link
+
+        Returns:
+            True if url may be fetched.
+        """
+        return self.__robots_txt_parser(url).can_fetch(self.user_agent, url)
+
+    def get_crawl_delay(self, url: str) -> float:
+        """Returns delay between requests to the url host (robots.txt Crawl-delay or the default one).
+
+        Args:
+            url: website url link
+
+        Returns:
+            Delay in seconds.
+        """
+        crawl_delay = self.__robots_txt_parser(url).crawl_delay(self.user_agent)
+        if crawl_delay is None:
+            return self.crawl_delay
+        return min(float(crawl_delay), POLITENESS_MAX_CRAWL_DELAY)
+
+    def wait(self, url: str) -> None:
+        """Sleeps until the crawl delay since the previous request to the url host passes.
+
+        Args:
+            url: website url link
+
+        Returns:
+            None
+        """
+        delay = self.reserve(url)
+        if delay > 0:
+            time.sleep(delay)
+
+    def reserve(self, url: str) -> float:
+        """Reserves time of the next request to the url host without sleeping (for asynchronous callers).
+
+        Args:
+            url: website url link
+
+        Returns:
+            Number of seconds the caller has to wait before sending the request.
+        """
+        host = host_of(url)
+        with self.__lock:
+            now = time.monotonic()
+            last_request = self.__last_requests.pop(host, None)
+            delay = 0.0 if last_request is None else max(last_request + self.get_crawl_delay(url) - now, 0.0)
+
+            self.__last_requests[host] = now + delay
+            if len(self.__last_requests) > self.HOSTS_CACHE_SIZE:
+                self.__last_requests.popitem(last=False)
+        return delay
+
+    def has_robots_txt(self, url: str) -> bool:
+        """Checks if robots.txt of the url host was already fetched during the current run.
+
+        Args:
+            url: website url link
+
+        Returns:
+            True if allows() needs no robots.txt request.
+        """
+        origin = robots_txt_origin(url)
+        return origin in self.__robots_txt_parsers or self.robots_txt_store.get(origin) is not None
+
+    def __robots_txt_parser(self, url: str) -> RobotFileParser:
+        origin = robots_txt_origin(url)
+
+        with self.__lock:
+            if origin in self.__robots_txt_parsers:
+                self.__robots_txt_parsers.move_to_end(origin)
+                return self.__robots_txt_parsers[origin]
+
+        robots_txt = self.robots_txt_store.get(origin)
+        if robots_txt is None:
+            robots_txt = self.__fetch_robots_txt(origin)
+            self.robots_txt_store.save(origin, *robots_txt)
+
+        # Same rules as in RobotFileParser.read(): 401/403 disallow everything, other errors allow everything.
+        status_code, body = robots_txt
+        robots_txt_parser = RobotFileParser(origin + "/robots.txt")
+        if status_code in (401, 403):
+            robots_txt_parser.disallow_all = True  # type: ignore[attr-defined]
+        elif not 200 <= status_code < 400:
+            robots_txt_parser.allow_all = True  # type: ignore[attr-defined]
+        else:
+            robots_txt_parser.parse(body.splitlines())
+
+        with self.__lock:
+            self.__robots_txt_parsers[origin] = robots_txt_parser
+            if len(self.__robots_txt_parsers) > self.HOSTS_CACHE_SIZE:
+                self.__robots_txt_parsers.popitem(last=False)
+        return robots_txt_parser
+
+    def __fetch_robots_txt(self, origin: str) -> tuple[int, str]:
+        try:
+            response = self.session.get(origin + "/robots.txt", allow_redirects=True, timeout=5)
+        except Exception:
+            return 0, ""
+        return response.status_code, response.text[: self.ROBOTS_TXT_MAX_SIZE]
+
+
+_policies: dict[int, Optional[PolitenessPolicy]] = {}
+
+
+def get_politeness_policy() -> Optional[PolitenessPolicy]:
+    """Returns politeness policy of the current process.
+
+    Returns:
+        PolitenessPolicy object or None if politeness is disabled (POLITENESS_ENABLED).
+    """
+    pid = os.getpid()
+    if pid not in _policies:
+        _policies.clear()
+        _policies[pid] = PolitenessPolicy() if POLITENESS_ENABLED else None
+    return _policies[pid]
+
+
+class HostQueue:
+    """Company rows waiting for one host (or for all hosts sharing one IP).
+
+    Attributes:
+        rows (deque): company rows waiting for the host
+        in_flight (int): number of rows of the host processed by workers
+        ready_at (float): monotonic time after which the next row of the host may be processed
+    """
+
+    def __init__(self) -> None:
+        self.rows: deque[CrawlTask] = deque()
+        self.in_flight = 0
+        self.ready_at = 0.0
+
+
+class HostScheduler:
+    """Reorders company rows, so that every host is crawled politely and busy hosts do not starve workers.
+
+    Rows are buffered (up to `lookahead` rows) and grouped by host, or by host IP if hosts
+    are resolved (shared hosting serves many companies from one IP). The next row is
+    always taken from a host which has a free slot (max concurrency per host) and whose
+    crawl delay since the last finished row passed, so rows of slow or rate limited hosts
+    wait in the buffer while workers process rows of other hosts.
+
+    Usage:
+        scheduler = HostScheduler()
+        scheduler.add(crawl_task)
+        crawl_task = scheduler.next_row()
+        scheduler.finish(crawl_task.line_number, crawl_delay)
+
+    Args:
+        max_concurrency_per_host: max number of rows of one host processed at once
+            (POLITENESS_MAX_CONCURRENCY_PER_HOST by default)
+        crawl_delay: default delay between rows of one host (POLITENESS_CRAWL_DELAY by default)
+        lookahead: number of buffered rows (POLITENESS_LOOKAHEAD by default)
+        group_by_ip: whether hosts are grouped by resolved IP (POLITENESS_GROUP_BY_IP by default)
+
+    Attributes:
+        max_concurrency_per_host (int): max number of rows of one host processed at once
+        crawl_delay (float): default delay between rows of one host
+        lookahead (int): number of buffered rows
+        group_by_ip (bool): whether hosts are grouped by resolved IP
+    """
+
+    def __init__(
+        self,
+        max_concurrency_per_host: Optional[int] = None,
+        crawl_delay: Optional[float] = None,
+        lookahead: Optional[int] = None,
+        group_by_ip: Optional[bool] = None,
+    ) -> None:
+        self.max_concurrency_per_host = max_concurrency_per_host or POLITENESS_MAX_CONCURRENCY_PER_HOST
+        self.crawl_delay = POLITENESS_CRAWL_DELAY if crawl_delay is None else crawl_delay
+        self.lookahead = lookahead or POLITENESS_LOOKAHEAD
+        self.group_by_ip = POLITENESS_GROUP_BY_IP if group_by_ip is None else group_by_ip
+
+        self.__condition = threading.Condition()
+        self.__host_queues: OrderedDict[str, HostQueue] = OrderedDict()
+        self.__host_keys: dict[str, str] = {}
+        self.__unresolved_rows: dict[str, list[CrawlTask]] = {}
+        self.__in_flight_rows: dict[int, str] = {}
+        self.__buffered_rows = 0
+        self.__resolver = ThreadPoolExecutor(POLITENESS_RESOLVER_THREADS) if self.group_by_ip else None
+
+    def __len__(self) -> int:
+        """Number of buffered rows."""
+        return self.__buffered_rows
+
+    def add(self, crawl_task: CrawlTask) -> None:
+        """Buffers company row.
+
+        Args:
+            crawl_task: company row to be crawled
+
+        Returns:
+            None
+        """
+        host = host_of(crawl_task.www)
+        with self.__condition:
+            self.__buffered_rows += 1
+            if host in self.__host_keys:
+                self.__enqueue(self.__host_keys[host], crawl_task)
+            elif host in self.__unresolved_rows:
+                self.__unresolved_rows[host].append(crawl_task)
+            elif self.__resolver is None:
+                self.__host_keys[host] = host
+                self.__enqueue(host, crawl_task)
+            else:
+                self.__unresolved_rows[host] = [crawl_task]
+                self.__resolver.submit(socket.gethostbyname, host).add_done_callback(
+                    lambda future: self.__on_host_resolved(host, future)
+                )
+
+    def next_row(self, timeout: Optional[float] = None) -> Optional[CrawlTask]:
+        """Takes the next row which may be processed now, waiting until any is ready.
+
+        Args:
+            timeout: max number of seconds to wait (no limit if None)
+
+        Returns:
+            Company row or None if no row is buffered or no row got ready before the timeout.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self.__condition:
+            while self.__buffered_rows:
+                now = time.monotonic()
+                if deadline is not None and now >= deadline:
+                    return None
+                earliest_ready_at = None
+                for host_key, host_queue in list(self.__host_queues.items()):
+                    if not host_queue.rows:
+                        if not host_queue.in_flight and host_queue.ready_at <= now:
+                            del self.__host_queues[host_key]
+                        continue
+                    if host_queue.in_flight >= self.max_concurrency_per_host:
+                        continue
+                    if host_queue.ready_at <= now:
+                        crawl_task = host_queue.rows.popleft()
+                        host_queue.in_flight += 1
+                        self.__in_flight_rows[crawl_task.line_number] = host_key
+                        self.__buffered_rows -= 1
+                        # Host goes to the end, so hosts with many rows do not block the others.
+                        self.__host_queues.move_to_end(host_key)
+                        return crawl_task
+                    if earliest_ready_at is None or host_queue.ready_at < earliest_ready_at:
+                        earliest_ready_at = host_queue.ready_at
+
+                wait_until = min((at for at in (earliest_ready_at, deadline) if at is not None), default=None)
+                self.__condition.wait(None if wait_until is None else wait_until - now)
+        return None
+
+    def finish(self, line_number: int, crawl_delay: Optional[float] = None) -> None:
+        """Marks row as processed, the next row of its host waits for the crawl delay.
+
+        Args:
+            line_number: row line number
+            crawl_delay: delay required by the host (default crawl delay if None)
+
+        Returns:
+            None
+        """
+        with self.__condition:
+            host_key = self.__in_flight_rows.pop(line_number, None)
+            if host_key is None:
+                return
+            host_queue = self.__host_queues[host_key]
+            host_queue.in_flight -= 1
+            delay = self.crawl_delay if crawl_delay is None else crawl_delay
+            host_queue.ready_at = max(host_queue.ready_at, time.monotonic() + delay)
+            self.__condition.notify_all()
+
+    def close(self) -> None:
+        """Stops hosts resolving threads."""
+        if self.__resolver is not None:
+            self.__resolver.shutdown(wait=True, cancel_futures=True)
+
+    def __enqueue(self, host_key: str, crawl_task: CrawlTask) -> None:
+        if host_key not in self.__host_queues:
+            self.__host_queues[host_key] = HostQueue()
+        self.__host_queues[host_key].rows.append(crawl_task)
+        self.__condition.notify_all()
+
+    def __on_host_resolved(self, host: str, future: Future[str]) -> None:
+        try:
+            host_key = future.result()
+        except Exception:
+            host_key = host  # Unresolvable hosts are scheduled on their own (fetch fails fast anyway).
+
+        with self.__condition:
+            self.__host_keys[host] = host_key
+            for crawl_task in self.__unresolved_rows.pop(host, []):
+                self.__enqueue(host_key, crawl_task)
@@ -0,0 +1,256 @@
+from __future__ import annotations
+
+import multiprocessing
+import queue
+import signal
+import time
+from collections import defaultdict
+from typing import NamedTuple
+from typing import Optional
+from typing import Union
+
+from configuration.config import RESULTS_WRITER_BATCH_SIZE
+from configuration.config import RESULTS_WRITER_FLUSH_INTERVAL
+from configuration.config import RESULTS_WRITER_FSYNC
+from helpers import CompanyDbFile
+from helpers import CrawlTask
+from helpers import LoggerT
+from live_events import LiveEvents
+from storage import ResultRecord
+from storage import ResultStore
+
+
+class FinishedRow(NamedTuple):
+    """Company row processed by a worker (with verdict of its website, if the website is deduplicated)."""
+
+    line_number: int
+    crawl_delay: Optional[float]
+    website: Optional[str] = None
+    verdict_link: Optional[str] = None
+
+
+class FoundJob(NamedTuple):
+    """Link for which searched job was found for the company at given DB file row position."""
+
+    row_position: int
+    link: str
+
+
+class DuplicateRow(NamedTuple):
+    """Company row not crawled, because its website is crawled for another row."""
+
+    crawl_task: CrawlTask
+    website: str
+
+
+class ResultsWriter:
+    """Dedicated process saving found jobs to the result store in batches.
+
+    Workers only put messages into an unbounded queue, so they never wait for file I/O
+    nor for each other. Records are buffered and saved (and optionally fsynced) when
+    the batch is full or the oldest buffered record waits longer than flush interval.
+    Only the writer touches the store, so output lines never interleave.
+    Workers pass only DB file row positions of found companies, the writer joins
+    them back with full company records read from the memory-mapped DB file.
+
+    Rows sharing website with a crawled row are not crawled, the writer finishes them
+    with the verdict of the crawled row (its found job is saved for every such row).
+
+    Finished rows are passed to the done queue only after records found for them are saved,
+    so checkpointed rows never miss their output. On stop every buffered record is saved
+    before the process exits (the writer ignores SIGINT and waits for the stop sentinel).
+    Saved records are published as "result" live events.
+
+    Usage:
+        results_writer = ResultsWriter(logger, result_store, done_queue)
+        results_writer.start()
+        results_writer.save_found_job(crawl_task, link)
+        results_writer.finish_row(FinishedRow(line_number, crawl_delay))
+        results_writer.share_verdict(duplicate_crawl_task, website)
+        results_writer.stop()
+
+    Args:
+        logger (LoggerT): logger object
+        result_store (ResultStore): store of found jobs
+        done_queue: queue to which finished rows are passed (finished rows are dropped if None)
+        batch_size: max number of buffered records (RESULTS_WRITER_BATCH_SIZE by default)
+        flush_interval: max number of seconds a record stays buffered (RESULTS_WRITER_FLUSH_INTERVAL by default)
+        fsync: whether written batches are fsynced (RESULTS_WRITER_FSYNC by default)
+        live_events: live events buffer to which saved records are published (not published if None)
+        db_filepath: DB file with company rows (DB_FILEPATH by default)
+
+    Attributes:
+        logger (LoggerT): logger object
+        batch_size (int): max number of buffered records
+        flush_interval (float): max number of seconds a record stays buffered
+        fsync (bool): whether written batches are fsynced
+        db_filepath (str): DB file with company rows (None for DB_FILEPATH)
+        exitcode (int): exit code of the stopped writer process (None until stopped, non-zero if the writer failed)
+    """
+
+    def __init__(
+        self,
+        logger: LoggerT,
+        result_store: ResultStore,
+        done_queue: Optional[multiprocessing.Queue[Optional[FinishedRow]]] = None,
+        batch_size: Optional[int] = None,
+        flush_interval: Optional[float] = None,
+        fsync: Optional[bool] = None,
+        live_events: Optional[LiveEvents] = None,
+        db_filepath: Optional[str] = None,
+    ) -> None:
+        self.logger = logger
+        self.batch_size = batch_size or RESULTS_WRITER_BATCH_SIZE
+        self.flush_interval = flush_interval or RESULTS_WRITER_FLUSH_INTERVAL
+        self.fsync = RESULTS_WRITER_FSYNC if fsync is None else fsync
+        self.db_filepath = db_filepath
+        self.exitcode: Optional[int] = None
+        self.__result_store = result_store
+        self.__done_queue = done_queue
+        self.__live_events = live_events
+        self.__results_queue: multiprocessing.Queue[
+            Union[FoundJob, FinishedRow, DuplicateRow, None]
+        ] = multiprocessing.Queue()
+        self.__process: Optional[multiprocessing.Process] = None
+        # State of the writer process.
+        self.__buffered_records: list[ResultRecord] = []
+        self.__held_rows: list[FinishedRow] = []
+        self.__first_buffered_at = 0.0
+        self.__company_db: Optional[CompanyDbFile] = None  # DB file is mapped only once the first job is found.
+        self.__website_verdicts: dict[str, Optional[str]] = {}
+        self.__duplicate_rows: defaultdict[str, list[CrawlTask]] = defaultdict(list)
+
+    def start(self) -> None:
+        """Starts writer process."""
+        self.__process = multiprocessing.Process(target=self.__run, daemon=True)
+        self.__process.start()
+
+    def is_alive(self) -> bool:
+        """Checks if writer process is running."""
+        return self.__process is not None and self.__process.is_alive()
+
+    def stop(self) -> None:
+        """Saves all buffered records and waits for writer process end."""
+        if self.__process is None:
+            return
+        self.__results_queue.put(None)
+        self.__process.join()
+        self.exitcode = self.__process.exitcode
+        self.__process = None
+
+    def save_found_job(self, crawl_task: CrawlTask, link: str) -> None:
+        """Queues company for which searched job was found (never blocks).
+
+        Args:
+            crawl_task: company row for which searched job was found
+            link: url link for which searched job was found
+
+        Returns:
+            None
+        """
+        self.__results_queue.put(FoundJob(crawl_task.row_position, link))
+
+    def finish_row(self, finished_row: FinishedRow) -> None:
+        """Queues processed row, it is passed to the done queue once its found job (if any) is written.
+
+        Args:
+            finished_row: processed row
+
+        Returns:
+            None
+        """
+        self.__results_queue.put(finished_row)
+
+    def share_verdict(self, crawl_task: CrawlTask, website: str) -> None:
+        """Queues row not crawled, it is finished with the verdict of the crawled row of the same website.
+
+        Args:
+            crawl_task: row sharing website with a crawled row
+            website: website key (website of the crawled row is passed in its FinishedRow)
+
+        Returns:
+            None
+        """
+        self.__results_queue.put(DuplicateRow(crawl_task, website))
+
+    def __run(self) -> None:
+        # Ctrl+C is sent to the whole process group, the writer stops only on the sentinel from JobScanner.run.
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+        while True:
+            timeout = None
+            if self.__buffered_records:
+                timeout = max(0.0, self.__first_buffered_at + self.flush_interval - time.monotonic())
+
+            try:
+                message = self.__results_queue.get(timeout=timeout)
+            except queue.Empty:
+                # The oldest buffered record waited for flush interval.
+                self.__write()
+                continue
+
+            if message is None:
+                break
+
+            if isinstance(message, FinishedRow):
+                self.__finish_row(message)
+            elif isinstance(message, DuplicateRow):
+                if message.website in self.__website_verdicts:
+                    self.__finish_duplicate_row(message.crawl_task, self.__website_verdicts[message.website])
+                else:
+                    self.__duplicate_rows[message.website].append(message.crawl_task)
+            else:
+                self.__buffer_record(message.row_position, message.link)
+
+            if self.__buffered_records and (
+                len(self.__buffered_records) >= self.batch_size
+                or time.monotonic() - self.__first_buffered_at >= self.flush_interval
+            ):
+                self.__write()
+
+        self.__write()
+        if self.__company_db is not None:
+            self.__company_db.close()
+
+    def __buffer_record(self, row_position: int, link: str) -> None:
+        if self.__company_db is None:
+            self.__company_db = CompanyDbFile(self.db_filepath)
+            self.__company_db.open()
+        record = ResultRecord.from_company_record(self.__company_db.row(row_position).record(), link)
+        self.logger.info(f"Found potential job, so breaking loop iteration [{record.company_name}, {record.link}].")
+        if not self.__buffered_records:
+            self.__first_buffered_at = time.monotonic()
+        self.__buffered_records.append(record)
+
+    def __finish_row(self, finished_row: FinishedRow) -> None:
+        if finished_row.website is not None:
+            self.__website_verdicts[finished_row.website] = finished_row.verdict_link
+            for crawl_task in self.__duplicate_rows.pop(finished_row.website, []):
+                self.__finish_duplicate_row(crawl_task, finished_row.verdict_link)
+
+        if self.__buffered_records:
+            self.__held_rows.append(finished_row)
+        else:
+            self.__pass_finished_rows([finished_row])
+
+    def __finish_duplicate_row(self, crawl_task: CrawlTask, verdict_link: Optional[str]) -> None:
+        if verdict_link is not None:
+            self.__buffer_record(crawl_task.row_position, verdict_link)
+        self.__finish_row(FinishedRow(crawl_task.line_number, None))
+
+    def __write(self) -> None:
+        if self.__buffered_records:
+            saved_records = self.__result_store.save(self.__buffered_records, self.fsync)
+            self.logger.debug(f"Results writer saved {len(saved_records)} records.")
+            if self.__live_events is not None:
+                for record in saved_records:
+                    self.__live_events.publish("result", record._asdict())
+            self.__buffered_records.clear()
+        self.__pass_finished_rows(self.__held_rows)
+        self.__held_rows.clear()
+
+    def __pass_finished_rows(self, finished_rows: list[FinishedRow]) -> None:
+        if self.__done_queue is None:
+            return
+        for finished_row in finished_rows:
+            self.__done_queue.put(finished_row)
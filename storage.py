@@ -0,0 +1,548 @@
+from __future__ import annotations
+
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC
+from abc import abstractmethod
+from array import array
+from bisect import bisect_right
+from typing import Any
+from typing import BinaryIO
+from typing import cast
+from typing import NamedTuple
+from typing import Optional
+from typing import Sequence
+
+try:
+    import psycopg2
+except ImportError:  # pragma: no cover
+    psycopg2 = None  # type: ignore[assignment]
+
+from configuration.config import CRAWLED_JOBS_OUTPUT_FILE
+from configuration.config import RESULT_STORE_BACKEND
+from configuration.config import RESULT_STORE_POSTGRESQL_DSN
+from configuration.config import RESULT_STORE_SQLITE_FILEPATH
+from helpers import CompanyRecord
+from helpers import LoggerT
+
+
+class ResultRecord(NamedTuple):
+    """Company for which searched job was found (crawled_at is None if the store does not keep it)."""
+
+    company_name: str
+    krs_number: str
+    email: str
+    www: str
+    voivodeship: str
+    address: str
+    link: str
+    crawled_at: Optional[float]
+
+    @classmethod
+    def from_company_record(
+        cls, company_record: CompanyRecord, link: str, crawled_at: Optional[float] = None
+    ) -> ResultRecord:
+        """Creates record from company record of DB file.
+
+        Args:
+            company_record: company record
+            link: url link for which searched job was found
+            crawled_at: timestamp of the crawl (now by default)
+
+        Returns:
+            ResultRecord object.
+        """
+        return cls(
+            company_record.company_name,
+            company_record.krs_number,
+            company_record.email,
+            company_record.www,
+            company_record.voivodeship,
+            company_record.address,
+            link,
+            time.time() if crawled_at is None else crawled_at,
+        )
+
+
+class ResultsPage(NamedTuple):
+    """Page of saved records (with their ids) and number of all records matching the query filters."""
+
+    records: list[tuple[int, ResultRecord]]
+    total: int
+
+
+class ResultStore(ABC):
+    """Base class of found jobs stores.
+
+    Usage:
+        result_store = get_result_store(logger)
+        result_store.save([ResultRecord.from_company_record(company_record, link)])
+
+    Args:
+        logger (LoggerT): logger object
+
+    Attributes:
+        logger (LoggerT): logger object
+    """
+
+    def __init__(self, logger: LoggerT) -> None:
+        self.logger = logger
+        self.__saved_krs_numbers: set[str] = set()
+
+    def prepare_resume(self, since: int = 0) -> None:
+        """Remembers companies saved by the unfinished run, so rows processed again on resume are not saved twice.
+
+        Args:
+            since: end position of the store when the unfinished run started (see end_position)
+
+        Returns:
+            None
+        """
+        self.__saved_krs_numbers = self.read_saved_krs_numbers(since)
+
+    def save(self, records: list[ResultRecord], fsync: bool = False) -> list[ResultRecord]:
+        """Saves batch of records (companies saved before resume are skipped).
+
+        Args:
+            records: records to be saved
+            fsync: whether saved records have to be flushed to disk
+
+        Returns:
+            Saved records.
+        """
+        new_records = []
+        for record in records:
+            if record.krs_number in self.__saved_krs_numbers:
+                self.logger.info(
+                    "Found potential job already saved before resume, so skipping "
+                    f"[{record.company_name}, {record.link}]."
+                )
+                continue
+            new_records.append(record)
+
+        if new_records:
+            self.write(new_records, fsync)
+        return new_records
+
+    @abstractmethod
+    def write(self, records: list[ResultRecord], fsync: bool) -> None:
+        """Writes batch of records.
+
+        Args:
+            records: records to be written
+            fsync: whether written records have to be flushed to disk
+
+        Returns:
+            None
+        """
+
+    @abstractmethod
+    def read_saved_krs_numbers(self, since: int = 0) -> set[str]:
+        """Returns KRS numbers of companies saved after the given position (all saved companies by default)."""
+
+    @abstractmethod
+    def end_position(self) -> int:
+        """Returns position after the last saved record (file size or the last record id)."""
+
+    @abstractmethod
+    def query(
+        self,
+        offset: int = 0,
+        limit: int = 100,
+        after: int = 0,
+        voivodeship: Optional[str] = None,
+        krs_number: Optional[str] = None,
+    ) -> ResultsPage:
+        """Returns page of saved records, in saving order.
+
+        Args:
+            offset: number of matching records skipped (counted from the cursor)
+            limit: max number of returned records
+            after: cursor, only records with id greater than it are returned
+            voivodeship: only records of companies from the given voivodeship are returned
+            krs_number: only records of company with the given KRS number are returned
+
+        Returns:
+            ResultsPage object.
+        """
+
+    @abstractmethod
+    def version(self) -> str:
+        """Returns version of the stored records, it changes whenever a record is saved."""
+
+
+class CsvResultStore(ResultStore):
+    """Store appending found jobs to semicolon separated output file.
+
+    Queries are served from an in-memory index of line offsets (also grouped by voivodeship
+    and KRS number), which is updated only with lines appended since the previous query,
+    so every page is read with one seek per record instead of scanning the whole file.
+    Record id is the number of the record in the file.
+
+    Args:
+        logger (LoggerT): logger object
+        filepath: output filepath (CRAWLED_JOBS_OUTPUT_FILE by default)
+
+    Attributes:
+        logger (LoggerT): logger object
+        filepath (str): output filepath
+    """
+
+    def __init__(self, logger: LoggerT, filepath: Optional[str] = None) -> None:
+        super().__init__(logger)
+        self.filepath = filepath or CRAWLED_JOBS_OUTPUT_FILE
+        self.__index_lock = threading.Lock()
+        self.__indexed_size = 0
+        self.__line_offsets: array[int] = array("q")
+        self.__voivodeship_ids: dict[str, list[int]] = {}
+        self.__krs_number_ids: dict[str, list[int]] = {}
+
+    TAIL_BLOCK_SIZE = 64 * 1024
+
+    def prepare_resume(self, since: int = 0) -> None:
+        """Removes line partially written before the crash and remembers companies saved by the unfinished run."""
+        try:
+            with open(self.filepath, "rb+") as jobs_file:
+                file_size = jobs_file.seek(0, os.SEEK_END)
+                if file_size:
+                    jobs_file.seek(-1, os.SEEK_END)
+                    if jobs_file.read(1) != b"\n":
+                        jobs_file.truncate(self.__last_line_end(jobs_file, file_size))
+        except FileNotFoundError:
+            pass
+        super().prepare_resume(since)
+
+    def write(self, records: list[ResultRecord], fsync: bool) -> None:
+        lines = [
+            f"{record.company_name};{record.krs_number};{record.email};{record.www};"
+            f"{record.voivodeship};{record.address};{record.link}\n"
+            for record in records
+        ]
+        with open(self.filepath, "a+") as jobs_file:
+            jobs_file.write("".join(lines))
+            if fsync:
+                jobs_file.flush()
+                os.fsync(jobs_file.fileno())
+
+    def read_saved_krs_numbers(self, since: int = 0) -> set[str]:
+        try:
+            with open(self.filepath, "rb") as jobs_file:
+                jobs_file.seek(since)
+                return {line.decode(errors="replace").split(";")[1] for line in jobs_file if b";" in line}
+        except FileNotFoundError:
+            return set()
+
+    def end_position(self) -> int:
+        try:
+            return os.path.getsize(self.filepath)
+        except FileNotFoundError:
+            return 0
+
+    def query(
+        self,
+        offset: int = 0,
+        limit: int = 100,
+        after: int = 0,
+        voivodeship: Optional[str] = None,
+        krs_number: Optional[str] = None,
+    ) -> ResultsPage:
+        with self.__index_lock:
+            self.__update_index()
+
+            record_ids: Sequence[int] = range(1, len(self.__line_offsets) + 1)
+            if krs_number is not None:
+                record_ids = self.__krs_number_ids.get(krs_number, [])
+                if voivodeship is not None:
+                    voivodeship_ids = set(self.__voivodeship_ids.get(voivodeship, []))
+                    record_ids = [record_id for record_id in record_ids if record_id in voivodeship_ids]
+            elif voivodeship is not None:
+                record_ids = self.__voivodeship_ids.get(voivodeship, [])
+
+            start = bisect_right(record_ids, after) + offset
+            end = start + limit
+            page_ids = record_ids[start:end]
+            line_offsets = [self.__line_offsets[record_id - 1] for record_id in page_ids]
+
+        records = []
+        if page_ids:
+            with open(self.filepath, "rb") as jobs_file:
+                for record_id, line_offset in zip(page_ids, line_offsets):
+                    jobs_file.seek(line_offset)
+                    record = self.__parse_line(jobs_file.readline())
+                    if record is not None:
+                        records.append((record_id, record))
+        return ResultsPage(records, len(record_ids))
+
+    def version(self) -> str:
+        try:
+            file_stat = os.stat(self.filepath)
+        except FileNotFoundError:
+            return "0"
+        return f"{file_stat.st_size}-{file_stat.st_mtime_ns}"
+
+    def __update_index(self) -> None:
+        """Indexes lines appended since the previous update (whole file if it was truncated)."""
+        try:
+            file_size = os.path.getsize(self.filepath)
+        except FileNotFoundError:
+            file_size = 0
+
+        if file_size < self.__indexed_size:
+            self.__indexed_size = 0
+            self.__line_offsets = array("q")
+            self.__voivodeship_ids = {}
+            self.__krs_number_ids = {}
+        if file_size == self.__indexed_size:
+            return
+
+        with open(self.filepath, "rb") as jobs_file:
+            jobs_file.seek(self.__indexed_size)
+            line_offset = self.__indexed_size
+            for line in jobs_file:
+                if not line.endswith(b"\n"):
+                    break  # Line is still being written.
+                record = self.__parse_line(line)
+                if record is not None:
+                    self.__line_offsets.append(line_offset)
+                    record_id = len(self.__line_offsets)
+                    self.__voivodeship_ids.setdefault(record.voivodeship, []).append(record_id)
+                    self.__krs_number_ids.setdefault(record.krs_number, []).append(record_id)
+                line_offset += len(line)
+        self.__indexed_size = line_offset
+
+    def __last_line_end(self, jobs_file: BinaryIO, file_size: int) -> int:
+        """Returns offset just after the last newline of the file (0 if there is none), reading it from the end."""
+        block_end = file_size
+        while block_end > 0:
+            block_start = max(block_end - self.TAIL_BLOCK_SIZE, 0)
+            jobs_file.seek(block_start)
+            newline_index = jobs_file.read(block_end - block_start).rfind(b"\n")
+            if newline_index != -1:
+                return block_start + newline_index + 1
+            block_end = block_start
+        return 0
+
+    @staticmethod
+    def __parse_line(line: bytes) -> Optional[ResultRecord]:
+        # Fields are taken from the end, because only company name may contain a semicolon.
+        fields = line.decode(errors="replace").rstrip("\n").split(";")
+        if len(fields) < 7:
+            return None
+        krs_number, email, www, voivodeship, address, link = fields[-6:]
+        return ResultRecord(";".join(fields[:-6]), krs_number, email, www, voivodeship, address, link, None)
+
+
+class SqliteResultStore(ResultStore):
+    """SQLite store of found jobs (WAL mode, batched inserts, indexed by KRS number, voivodeship and crawl time).
+
+    Every process and thread opens its own connection (SQLite connections cannot be shared by threads,
+    e.g. the ones serving monitoring API requests), so the store can be created once and used everywhere.
+
+    Args:
+        logger (LoggerT): logger object
+        filepath: SQLite database filepath (RESULT_STORE_SQLITE_FILEPATH by default)
+
+    Attributes:
+        logger (LoggerT): logger object
+        filepath (str): SQLite database filepath
+    """
+
+    def __init__(self, logger: LoggerT, filepath: Optional[str] = None) -> None:
+        super().__init__(logger)
+        self.filepath = filepath or RESULT_STORE_SQLITE_FILEPATH
+        # Connection of a finished thread is closed with its thread-local data.
+        self.__local = threading.local()
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        """Connection of the current process and thread."""
+        pid = os.getpid()
+        # Thread-local data of the forking thread is inherited, so the pid tells whether it belongs to this process.
+        if getattr(self.__local, "pid", None) != pid:
+            connection = sqlite3.connect(self.filepath, timeout=30)
+            connection.execute("PRAGMA journal_mode=WAL")
+            with connection:
+                connection.execute(
+                    "CREATE TABLE IF NOT EXISTS results ("
+                    " id INTEGER PRIMARY KEY AUTOINCREMENT, company_name TEXT NOT NULL, krs_number TEXT NOT NULL,"
+                    " email TEXT NOT NULL, www TEXT NOT NULL, voivodeship TEXT NOT NULL, address TEXT NOT NULL,"
+                    " link TEXT NOT NULL, crawled_at REAL NOT NULL)"
+                )
+                connection.execute("CREATE INDEX IF NOT EXISTS results_krs_number ON results (krs_number)")
+                connection.execute("CREATE INDEX IF NOT EXISTS results_voivodeship ON results (voivodeship)")
+                connection.execute("CREATE INDEX IF NOT EXISTS results_crawled_at ON results (crawled_at)")
+            self.__local.pid, self.__local.connection = pid, connection
+        return cast(sqlite3.Connection, self.__local.connection)
+
+    def write(self, records: list[ResultRecord], fsync: bool) -> None:
+        # WAL with synchronous=NORMAL does not sync on every commit, FULL does.
+        self.connection.execute(f"PRAGMA synchronous={'FULL' if fsync else 'NORMAL'}")
+        with self.connection:
+            self.connection.executemany(
+                "INSERT INTO results (company_name, krs_number, email, www, voivodeship, address, link, crawled_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                records,
+            )
+
+    def read_saved_krs_numbers(self, since: int = 0) -> set[str]:
+        rows = self.connection.execute("SELECT DISTINCT krs_number FROM results WHERE id > ?", (since,))
+        return {row[0] for row in rows}
+
+    def end_position(self) -> int:
+        (last_id,) = self.connection.execute("SELECT coalesce(max(id), 0) FROM results").fetchone()
+        return int(last_id)
+
+    def query(
+        self,
+        offset: int = 0,
+        limit: int = 100,
+        after: int = 0,
+        voivodeship: Optional[str] = None,
+        krs_number: Optional[str] = None,
+    ) -> ResultsPage:
+        conditions, parameters = _query_conditions(after, voivodeship, krs_number, "?")
+        count_conditions, count_parameters = _query_conditions(0, voivodeship, krs_number, "?")
+        rows = self.connection.execute(
+            f"SELECT {_RESULT_COLUMNS} FROM results WHERE {conditions} ORDER BY id LIMIT ? OFFSET ?",
+            (*parameters, limit, offset),
+        ).fetchall()
+        (total,) = self.connection.execute(
+            f"SELECT count(*) FROM results WHERE {count_conditions}", count_parameters
+        ).fetchone()
+        return ResultsPage([(row[0], ResultRecord(*row[1:])) for row in rows], total)
+
+    def version(self) -> str:
+        (last_id,) = self.connection.execute("SELECT coalesce(max(id), 0) FROM results").fetchone()
+        return str(last_id)
+
+
+class PostgresResultStore(ResultStore):
+    """PostgreSQL store of found jobs (batched inserts, indexed by KRS number, voivodeship and crawl time).
+
+    Requires psycopg2 package (pip install psycopg2-binary).
+
+    Args:
+        logger (LoggerT): logger object
+        dsn: PostgreSQL connection string (RESULT_STORE_POSTGRESQL_DSN by default)
+
+    Attributes:
+        logger (LoggerT): logger object
+        dsn (str): PostgreSQL connection string
+    """
+
+    def __init__(self, logger: LoggerT, dsn: Optional[str] = None) -> None:
+        if psycopg2 is None:
+            raise ImportError("PostgreSQL result store requires psycopg2 package (pip install psycopg2-binary).")
+        super().__init__(logger)
+        self.dsn = dsn or RESULT_STORE_POSTGRESQL_DSN
+        # Connection of a finished thread is closed with its thread-local data.
+        self.__local = threading.local()
+
+    @property
+    def connection(self) -> Any:
+        """Connection of the current process and thread (transactions of threads must not interleave)."""
+        pid = os.getpid()
+        # Thread-local data of the forking thread is inherited, so the pid tells whether it belongs to this process.
+        if getattr(self.__local, "pid", None) != pid:
+            connection = psycopg2.connect(self.dsn)
+            with connection, connection.cursor() as cursor:
+                cursor.execute(
+                    "CREATE TABLE IF NOT EXISTS results ("
+                    " id BIGSERIAL PRIMARY KEY, company_name TEXT NOT NULL, krs_number TEXT NOT NULL,"
+                    " email TEXT NOT NULL, www TEXT NOT NULL, voivodeship TEXT NOT NULL, address TEXT NOT NULL,"
+                    " link TEXT NOT NULL, crawled_at DOUBLE PRECISION NOT NULL)"
+                )
+                cursor.execute("CREATE INDEX IF NOT EXISTS results_krs_number ON results (krs_number)")
+                cursor.execute("CREATE INDEX IF NOT EXISTS results_voivodeship ON results (voivodeship)")
+                cursor.execute("CREATE INDEX IF NOT EXISTS results_crawled_at ON results (crawled_at)")
+            self.__local.pid, self.__local.connection = pid, connection
+        return self.__local.connection
+
+    def write(self, records: list[ResultRecord], fsync: bool) -> None:
+        # Commits are durable with default synchronous_commit, so fsync needs no extra work.
+        with self.connection, self.connection.cursor() as cursor:
+            cursor.executemany(
+                "INSERT INTO results (company_name, krs_number, email, www, voivodeship, address, link, crawled_at)"
+                " VALUES (%s, %s, %s, %s, %s, %s, %s, %s)",
+                records,
+            )
+
+    def read_saved_krs_numbers(self, since: int = 0) -> set[str]:
+        with self.connection, self.connection.cursor() as cursor:
+            cursor.execute("SELECT DISTINCT krs_number FROM results WHERE id > %s", (since,))
+            return {row[0] for row in cursor.fetchall()}
+
+    def end_position(self) -> int:
+        with self.connection, self.connection.cursor() as cursor:
+            cursor.execute("SELECT coalesce(max(id), 0) FROM results")
+            (last_id,) = cursor.fetchone()
+        return int(last_id)
+
+    def query(
+        self,
+        offset: int = 0,
+        limit: int = 100,
+        after: int = 0,
+        voivodeship: Optional[str] = None,
+        krs_number: Optional[str] = None,
+    ) -> ResultsPage:
+        conditions, parameters = _query_conditions(after, voivodeship, krs_number, "%s")
+        count_conditions, count_parameters = _query_conditions(0, voivodeship, krs_number, "%s")
+        with self.connection, self.connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT {_RESULT_COLUMNS} FROM results WHERE {conditions} ORDER BY id LIMIT %s OFFSET %s",
+                (*parameters, limit, offset),
+            )
+            rows = cursor.fetchall()
+            cursor.execute(f"SELECT count(*) FROM results WHERE {count_conditions}", count_parameters)
+            (total,) = cursor.fetchone()
+        return ResultsPage([(row[0], ResultRecord(*row[1:])) for row in rows], total)
+
+    def version(self) -> str:
+        with self.connection, self.connection.cursor() as cursor:
+            cursor.execute("SELECT coalesce(max(id), 0) FROM results")
+            (last_id,) = cursor.fetchone()
+        return str(last_id)
+
+
+_RESULT_COLUMNS = "id, company_name, krs_number, email, www, voivodeship, address, link, crawled_at"
+
+
+def _query_conditions(
+    after: int, voivodeship: Optional[str], krs_number: Optional[str], placeholder: str
+) -> tuple[str, tuple[Any, ...]]:
+    """Returns WHERE clause (and its parameters) of SQL results query."""
+    conditions = [f"id > {placeholder}"]
+    parameters: list[Any] = [after]
+    if voivodeship is not None:
+        conditions.append(f"voivodeship = {placeholder}")
+        parameters.append(voivodeship)
+    if krs_number is not None:
+        conditions.append(f"krs_number = {placeholder}")
+        parameters.append(krs_number)
+    return " AND ".join(conditions), tuple(parameters)
+
+
+RESULT_STORE_BACKENDS = ("csv", "sqlite", "postgresql")
+
+
+def get_result_store(logger: LoggerT, backend: Optional[str] = None) -> ResultStore:
+    """Creates found jobs store.
+
+    Args:
+        logger: logger object
+        backend: "csv", "sqlite" or "postgresql" (RESULT_STORE_BACKEND by default)
+
+    Returns:
+        ResultStore object.
+    """
+    backend = backend or RESULT_STORE_BACKEND
+    if backend == "csv":
+        return CsvResultStore(logger)
+    if backend == "sqlite":
+        return SqliteResultStore(logger)
+    if backend == "postgresql":
+        return PostgresResultStore(logger)
+    raise ValueError(f"Unknown result store backend: {backend!r}. Available backends: {RESULT_STORE_BACKENDS}.")
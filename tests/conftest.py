@@ -6,6 +6,7 @@ import threading
 from datetime import datetime
 from http.server import BaseHTTPRequestHandler
 from http.server import HTTPServer
+from http.server import ThreadingHTTPServer
 from os.path import abspath
 from os.path import dirname
 from pathlib import Path
@@ -38,6 +39,49 @@ def timestamp():
     return year + month + day + "_" + time
 
 
+@pytest.fixture(autouse=True)
+def checkpoint_filepath(monkeypatch, tmp_path):
+    """Keeps JobScanner.run checkpoint of every test in its own temporary directory"""
+    checkpoint_filepath = str(tmp_path / "CHECKPOINT.json")
+    monkeypatch.setattr("checkpoint.CHECKPOINT_FILEPATH", checkpoint_filepath)
+    return checkpoint_filepath
+
+
+@pytest.fixture(autouse=True)
+def robots_txt_filepath(monkeypatch, tmp_path):
+    """Keeps robots.txt files fetched by every test in its own temporary store"""
+    robots_txt_filepath = str(tmp_path / "ROBOTS_TXT.sqlite3")
+    monkeypatch.setattr("politeness.ROBOTS_TXT_FILEPATH", robots_txt_filepath)
+    monkeypatch.setattr("politeness._policies", {})
+    return robots_txt_filepath
+
+
+@pytest.fixture(autouse=True)
+def verdict_cache_filepath(monkeypatch, tmp_path):
+    """Keeps jobs verdicts shared by workers of every test in its own temporary store"""
+    verdict_cache_filepath = str(tmp_path / "VERDICT_CACHE.sqlite3")
+    monkeypatch.setattr("verdict_cache.VERDICT_CACHE_FILEPATH", verdict_cache_filepath)
+    return verdict_cache_filepath
+
+
+@pytest.fixture(autouse=True)
+def host_health_filepath(monkeypatch, tmp_path):
+    """Keeps hosts health of every test in its own temporary store"""
+    host_health_filepath = str(tmp_path / "HOST_HEALTH.sqlite3")
+    monkeypatch.setattr("host_health.HOST_HEALTH_FILEPATH", host_health_filepath)
+    monkeypatch.setattr("host_health._host_healths", {})
+    return host_health_filepath
+
+
+@pytest.fixture(autouse=True)
+def trace_filepath(monkeypatch, tmp_path):
+    """Keeps trace of every test in its own temporary directory"""
+    trace_filepath = str(tmp_path / "TRACE.jsonl")
+    monkeypatch.setattr("tracing.TRACE_FILEPATH", trace_filepath)
+    monkeypatch.setattr("tracing._tracers", {})
+    return trace_filepath
+
+
 # @pytest.fixture(autouse=True)
 # def removes_log_files():
 #     """Removes all log files"""
@@ -131,6 +175,78 @@ def setup_www_page(mock_company_html):
     stop_server(server)
 
 
+@pytest.fixture()
+def setup_keep_alive_www_page(mock_company_html):
+    """Maintains simple HTTP/1.1 www server keeping connections alive"""
+
+    class KeepAliveRequestHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            content = mock_company_html.encode()
+            self.send_response(200)
+            self.send_header("Content-type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(content)))
+            self.end_headers()
+            self.wfile.write(content)
+
+        def log_message(self, format, *args):
+            pass
+
+    server_object = ThreadingHTTPServer(("127.0.0.1", 9998), KeepAliveRequestHandler)
+    server_thread_object = threading.Thread(target=server_object.serve_forever, daemon=True)
+    server_thread_object.start()
+
+    yield "http://127.0.0.1:9998/"
+
+    server_object.shutdown()
+    server_object.server_close()
+
+
+@pytest.fixture()
+def setup_cacheable_www_page(mock_company_html):
+    """Maintains HTTP/1.1 www server sending ETag and answering conditional requests with 304"""
+
+    received_requests = []
+    etag = '"mock-company-website-v1"'
+
+    class CacheableRequestHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            if self.path == "/robots.txt":
+                self.send_error(404)
+                return
+
+            if self.headers.get("If-None-Match") == etag:
+                received_requests.append(304)
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.end_headers()
+                return
+
+            received_requests.append(200)
+            content = mock_company_html.encode()
+            self.send_response(200)
+            self.send_header("Content-type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(content)))
+            self.send_header("ETag", etag)
+            self.end_headers()
+            self.wfile.write(content)
+
+        def log_message(self, format, *args):
+            pass
+
+    server_object = ThreadingHTTPServer(("127.0.0.1", 9997), CacheableRequestHandler)
+    server_thread_object = threading.Thread(target=server_object.serve_forever, daemon=True)
+    server_thread_object.start()
+
+    yield "http://127.0.0.1:9997/", received_requests
+
+    server_object.shutdown()
+    server_object.server_close()
+
+
 @pytest.fixture(scope="session")
 def setup_flask_api():
     """Setups flask api fixture"""
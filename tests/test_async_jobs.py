@@ -0,0 +1,184 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+from os.path import dirname
+
+import aiohttp
+import pytest
+
+from async_jobs import AsyncCareerLinksFetcher
+from async_jobs import AsyncJobsChecker
+from async_jobs import AsyncUrlFetcher
+from helpers import configure_logger
+from jobs import JobScanner
+from metrics import CrawlMetrics
+from politeness import PolitenessPolicy
+from politeness import RobotsTxtStore
+from verdict_cache import JobsVerdictCache
+
+
+async def fetch_with_async_url_fetcher(url):
+    async with aiohttp.ClientSession() as session:
+        return await AsyncUrlFetcher(configure_logger("TestLogger"), session).fetch(url)
+
+
+async def get_career_links_asynchronously(url):
+    async with aiohttp.ClientSession() as session:
+        url_fetcher = AsyncUrlFetcher(configure_logger("TestLogger"), session)
+        return await AsyncCareerLinksFetcher(configure_logger("TestLogger"), url_fetcher).get_career_links(url)
+
+
+async def check_jobs_asynchronously(url):
+    async with aiohttp.ClientSession() as session:
+        url_fetcher = AsyncUrlFetcher(configure_logger("TestLogger"), session)
+        return await AsyncJobsChecker(configure_logger("TestLogger"), url_fetcher).may_company_have_the_needed_jobs(url)
+
+
+def test_async_url_fetcher_fetch(setup_www_page):
+    www_response_text = asyncio.run(fetch_with_async_url_fetcher("http://127.0.0.1:9999/"))
+
+    assert isinstance(www_response_text, str)
+    assert "Firma XYZ to lider w dostarczaniu innowacyjnych" in www_response_text
+
+
+def test_async_url_fetcher_fetch_non_existing_www():
+    assert asyncio.run(fetch_with_async_url_fetcher("http://127.0.0.1:9999/")) is None
+
+
+def test_async_url_fetcher_fetch_limits_concurrency_per_host(monkeypatch, setup_www_page):
+    in_flight = {"current": 0, "max": 0}
+
+    async def counting_get(self, url, flow_note=""):
+        in_flight["current"] += 1
+        in_flight["max"] = max(in_flight["max"], in_flight["current"])
+        await asyncio.sleep(0.01)
+        in_flight["current"] -= 1
+        return "content"
+
+    monkeypatch.setattr("async_jobs.AsyncUrlFetcher._AsyncUrlFetcher__get", counting_get)
+    monkeypatch.setattr("async_jobs.get_politeness_policy", lambda: None)
+
+    async def fetch_many():
+        async with aiohttp.ClientSession() as session:
+            url_fetcher = AsyncUrlFetcher(configure_logger("TestLogger"), session, 10, 2)
+            return await asyncio.gather(*[url_fetcher.fetch("http://127.0.0.1:9999/") for _ in range(8)])
+
+    assert asyncio.run(fetch_many()) == ["content"] * 8
+    assert in_flight["max"] == 2
+
+
+def test_async_url_fetcher_drops_semaphores_of_idle_hosts(monkeypatch):
+    async def get(self, url, flow_note=""):
+        await asyncio.sleep(0.01)
+        return "content"
+
+    monkeypatch.setattr("async_jobs.AsyncUrlFetcher._AsyncUrlFetcher__get", get)
+    monkeypatch.setattr("async_jobs.get_politeness_policy", lambda: None)
+
+    async def fetch_many_hosts():
+        async with aiohttp.ClientSession() as session:
+            url_fetcher = AsyncUrlFetcher(configure_logger("TestLogger"), session, 10, 1)
+            await asyncio.gather(*[url_fetcher.fetch(f"http://firma{index % 3}.pl/") for index in range(9)])
+            return url_fetcher._AsyncUrlFetcher__host_semaphores
+
+    assert asyncio.run(fetch_many_hosts()) == {}
+
+
+def test_async_url_fetcher_does_not_fetch_url_disallowed_by_robots_txt(monkeypatch, setup_www_page):
+    crawl_metrics = CrawlMetrics()
+    monkeypatch.setattr("metrics._crawl_metrics", crawl_metrics)
+    RobotsTxtStore().save("http://127.0.0.1:9999", 200, "User-agent: *\nDisallow: /")
+
+    assert asyncio.run(fetch_with_async_url_fetcher("http://127.0.0.1:9999/")) is None
+    assert crawl_metrics.value("finder_fetches_total", "disallowed") == 1
+    assert crawl_metrics.value("finder_fetches_total", "ok") == 0
+
+
+def test_async_url_fetcher_saves_fetched_robots_txt(setup_www_page):
+    async def fetch_twice():
+        async with aiohttp.ClientSession() as session:
+            politeness = PolitenessPolicy(crawl_delay=0)
+            url_fetcher = AsyncUrlFetcher(configure_logger("TestLogger"), session, politeness=politeness)
+            return [await url_fetcher.fetch("http://127.0.0.1:9999/") for _ in range(2)]
+
+    assert all(asyncio.run(fetch_twice()))
+    assert RobotsTxtStore().get("http://127.0.0.1:9999") is not None
+
+
+def test_async_url_fetcher_fetch_limits_body_size(setup_www_page):
+    async def fetch_limited():
+        async with aiohttp.ClientSession() as session:
+            url_fetcher = AsyncUrlFetcher(configure_logger("TestLogger"), session, max_body_size=100)
+            return await url_fetcher.fetch("http://127.0.0.1:9999/")
+
+    www_response_text = asyncio.run(fetch_limited())
+
+    assert www_response_text is not None
+    assert 0 < len(www_response_text.encode()) <= 100
+
+
+def test_async_career_links_fetcher_get_career_links(setup_www_page):
+    links = asyncio.run(get_career_links_asynchronously("http://127.0.0.1:9999/"))
+
+    assert links == ["http://127.0.0.1:9999/#careers"]
+
+
+def test_async_jobs_checker_may_company_have_the_needed_jobs(monkeypatch, setup_www_page):
+    monkeypatch.setattr("jobs.JOB_ROLES", ["Software developer (python)"])
+
+    assert asyncio.run(check_jobs_asynchronously("http://127.0.0.1:9999/"))
+
+
+def test_async_jobs_checker_may_company_have_the_needed_jobs_not_have(monkeypatch, setup_www_page):
+    monkeypatch.setattr("jobs.JOB_ROLES", ["devops"])
+
+    assert not asyncio.run(check_jobs_asynchronously("http://127.0.0.1:9999/"))
+
+
+def test_async_jobs_checker_uses_verdict_cache_outside_of_event_loop(monkeypatch, tmp_path, setup_www_page):
+    monkeypatch.setattr("jobs.JOB_ROLES", ["Software developer (python)"])
+    verdict_cache = JobsVerdictCache(str(tmp_path / "VERDICT_CACHE.sqlite3"))
+    verdict_cache_threads = set()
+    for method_name in ("get", "save"):
+        method = getattr(verdict_cache, method_name)
+
+        def recording_method(*args, method=method):
+            verdict_cache_threads.add(threading.get_ident())
+            return method(*args)
+
+        monkeypatch.setattr(verdict_cache, method_name, recording_method)
+
+    async def check_jobs_twice():
+        async with aiohttp.ClientSession() as session:
+            url_fetcher = AsyncUrlFetcher(configure_logger("TestLogger"), session)
+            jobs_checker = AsyncJobsChecker(configure_logger("TestLogger"), url_fetcher, verdict_cache)
+            url = "http://127.0.0.1:9999/#careers"
+            return [await jobs_checker.may_company_have_the_needed_jobs(url, "http://firma.pl/") for _ in range(2)]
+
+    assert asyncio.run(check_jobs_twice()) == [True, True]
+    assert len(verdict_cache) == 1
+    assert verdict_cache_threads and threading.get_ident() not in verdict_cache_threads
+
+
+def test_job_scanner_unknown_engine():
+    with pytest.raises(ValueError):
+        JobScanner(engine="unknown")
+
+
+def test_job_scanner_run_async_engine(monkeypatch, mock_db_filepath, setup_www_page, removes_result_test_files):
+    monkeypatch.setattr("helpers.DB_FILEPATH", mock_db_filepath)
+    monkeypatch.setattr("jobs.JOB_ROLES", ["Software developer (python)"])
+    monkeypatch.setattr("storage.CRAWLED_JOBS_OUTPUT_FILE", "tests/TEST_RESULT_CRAWLED_JOBS_OUTPUT_FILE.csv")
+
+    assert JobScanner(workers_count=2, engine="async").run() is None
+
+    result_file = dirname(__file__) + "/TEST_RESULT_CRAWLED_JOBS_OUTPUT_FILE.csv"
+
+    with open(result_file, "r") as file_result:
+        result_content = file_result.read()
+        assert result_content == (
+            '"FIRMA 1" SPÓŁKA Z OGRANICZONĄ ODPOWIEDZIALNOŚCIĄ;101;brak_email;'
+            "http://127.0.0.1:9999/;małopolskie;Borsucza,16,Kraków,30-40-408,Kraków,Polska;"
+            "http://127.0.0.1:9999/#careers\n"
+        )
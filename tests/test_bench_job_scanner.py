@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import requests
+
+from benchmarks.bench_job_scanner import company_has_job
+from benchmarks.bench_job_scanner import company_profile
+from benchmarks.bench_job_scanner import compare_results
+from benchmarks.bench_job_scanner import FakeWebFarm
+from benchmarks.bench_job_scanner import FakeWebFarmSettings
+from benchmarks.bench_job_scanner import generate_companies_csv
+from benchmarks.bench_job_scanner import run_benchmark
+from benchmarks.bench_job_scanner import save_result
+from configuration.config import JOB_ROLES
+
+
+def test_company_profile_is_reproducible():
+    settings = FakeWebFarmSettings(error_rate=0.1, timeout_rate=0.1, ssl_error_rate=0.1, seed=7)
+
+    profiles = [company_profile(settings, company_number) for company_number in range(1, 1001)]
+
+    assert profiles == [company_profile(settings, company_number) for company_number in range(1, 1001)]
+    for profile in ("error", "timeout", "ssl_error"):
+        assert 50 < profiles.count(profile) < 150
+
+
+def test_fake_web_farm_serves_company_websites(tmp_path):
+    settings = FakeWebFarmSettings(hosts_count=3, latency=0, page_size=5000, links_count=10, job_rate=0.5)
+    with FakeWebFarm(settings) as web_farm:
+        generate_companies_csv(str(tmp_path / "COMPANIES.csv"), 20, web_farm)
+        companies = [line.split(";") for line in (tmp_path / "COMPANIES.csv").read_text().splitlines()]
+        assert len(companies) == 20
+        assert all(len(company_data) == 9 for company_data in companies)
+
+        company_number = next(
+            number
+            for number in range(1, 21)
+            if company_profile(settings, number) == "ok" and company_has_job(settings, number)
+        )
+        www = companies[company_number - 1][6]
+        assert www == web_farm.company_www(company_number)
+        assert www.startswith(f"http://127.0.{1 + company_number % 3 // 254}.{1 + company_number % 3}:")
+
+        homepage = requests.get(www, timeout=5)
+        assert homepage.status_code == 200
+        assert len(homepage.text) >= 5000
+        assert homepage.text.count("<a href=") == 10
+        assert f'<a href="/c{company_number}/kariera">' in homepage.text
+        assert JOB_ROLES[0] in requests.get(www + "kariera", timeout=5).text
+        assert requests.get(www.split("/c")[0] + "/robots.txt", timeout=5).status_code == 404
+
+
+def test_run_benchmark(monkeypatch, tmp_path):
+    # Settings overridden by run_benchmark are restored after the test.
+    for setting in ("politeness.POLITENESS_CRAWL_DELAY", "http_cache.HTTP_CACHE_DIRECTORY", "metrics._crawl_metrics"):
+        module_name, name = setting.split(".")
+        monkeypatch.setattr(setting, getattr(__import__(module_name), name))
+    settings = FakeWebFarmSettings(hosts_count=4, latency=0, timeout_rate=0, page_size=2000)
+    with FakeWebFarm(settings) as web_farm:
+        result = run_benchmark("sync", 2, 20, web_farm, str(tmp_path))
+
+    assert result["engine"] == "sync"
+    assert result["workers_count"] == 2
+    assert result["rows_per_second"] > 0
+    assert result["cpu_seconds"] > 0
+    assert result["row_duration_seconds"]["p50"] > 0
+    assert sum(result["fetches"].values()) >= 20
+    assert result["web_farm"] == settings._asdict()
+
+    results_filepath = str(tmp_path / "BENCHMARK_RESULTS.jsonl")
+    save_result(result, results_filepath)
+    save_result({**result, "version": "previous", "timestamp": 0}, results_filepath)
+    report_lines = compare_results(results_filepath).splitlines()
+    assert [line.split()[:4] for line in report_lines[1:]] == [
+        ["previous", "sync", "2", "20"],
+        [result["version"], "sync", "2", "20"],
+    ]
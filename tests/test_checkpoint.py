@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import json
+import os
+
+from checkpoint import CrawlCheckpoint
+
+
+def test_crawl_checkpoint_low_water_mark_with_rows_finished_out_of_order(checkpoint_filepath):
+    checkpoint = CrawlCheckpoint()
+    for line_number in (1, 2, 4, 5):
+        checkpoint.start_row(line_number)
+
+    checkpoint.finish_row(2)
+    checkpoint.finish_row(5)
+    checkpoint.save()
+
+    assert checkpoint.low_water_mark == 0
+    assert checkpoint.finished_rows == {2, 5}
+
+    checkpoint.finish_row(1)
+    checkpoint.save()
+
+    assert checkpoint.low_water_mark == 3
+    assert checkpoint.finished_rows == {5}
+
+    checkpoint.finish_row(4)
+    checkpoint.save()
+
+    assert checkpoint.low_water_mark == 5
+    assert checkpoint.finished_rows == set()
+
+
+def test_crawl_checkpoint_load_saved_progress(checkpoint_filepath):
+    checkpoint = CrawlCheckpoint()
+    for line_number in (1, 2, 3):
+        checkpoint.start_row(line_number)
+    checkpoint.finish_row(1)
+    checkpoint.finish_row(3)
+    checkpoint.save()
+
+    loaded_checkpoint = CrawlCheckpoint()
+
+    assert loaded_checkpoint.load()
+    assert [loaded_checkpoint.is_finished(line_number) for line_number in (1, 2, 3, 4)] == [True, False, True, False]
+
+
+def test_crawl_checkpoint_load_output_position(checkpoint_filepath):
+    checkpoint = CrawlCheckpoint()
+    checkpoint.output_position = 128
+    checkpoint.save()
+
+    loaded_checkpoint = CrawlCheckpoint()
+
+    assert loaded_checkpoint.load()
+    assert loaded_checkpoint.output_position == 128
+
+
+def test_crawl_checkpoint_load_without_checkpoint_file(checkpoint_filepath):
+    checkpoint = CrawlCheckpoint()
+
+    assert not checkpoint.load()
+    assert not checkpoint.is_finished(1)
+
+
+def test_crawl_checkpoint_saved_every_interval(checkpoint_filepath):
+    checkpoint = CrawlCheckpoint(interval=2)
+    for line_number in (1, 2, 3):
+        checkpoint.start_row(line_number)
+
+    checkpoint.finish_row(1)
+    assert not os.path.exists(checkpoint_filepath)
+
+    checkpoint.finish_row(3)
+    with open(checkpoint_filepath, "r") as checkpoint_file:
+        assert json.load(checkpoint_file) == {"low_water_mark": 1, "finished_rows": [3], "output_position": 0}
+
+
+def test_crawl_checkpoint_clear(checkpoint_filepath):
+    checkpoint = CrawlCheckpoint()
+    checkpoint.save()
+
+    checkpoint.clear()
+
+    assert not os.path.exists(checkpoint_filepath)
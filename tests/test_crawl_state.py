@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+from crawl_state import content_hash
+from crawl_state import CrawlStateStore
+from crawl_state import settings_fingerprint
+from helpers import configure_logger
+from jobs import CareerLinksFetcher
+from jobs import JobScanner
+from jobs import JobsChecker
+
+
+def test_crawl_state_store_save_and_get_page(tmp_path):
+    crawl_state = CrawlStateStore(str(tmp_path / "state.sqlite3"))
+
+    assert crawl_state.get_page("https://xyz.com/") is None
+
+    crawl_state.save_page("https://xyz.com/", "hash-1", career_links=["https://xyz.com/kariera"])
+    crawl_state.save_page("https://xyz.com/", "hash-1", has_needed_jobs=True)
+    page_state = crawl_state.get_page("https://xyz.com/")
+
+    assert page_state.content_hash == "hash-1"
+    assert page_state.career_links == ["https://xyz.com/kariera"]
+    assert page_state.has_needed_jobs is True
+
+
+def test_crawl_state_store_changed_page_forgets_previous_results(tmp_path):
+    crawl_state = CrawlStateStore(str(tmp_path / "state.sqlite3"))
+    crawl_state.save_page("https://xyz.com/", "hash-1", has_needed_jobs=True, career_links=[])
+
+    crawl_state.save_page("https://xyz.com/", "hash-2", has_needed_jobs=False)
+    page_state = crawl_state.get_page("https://xyz.com/")
+
+    assert page_state.content_hash == "hash-2"
+    assert page_state.has_needed_jobs is False
+    assert page_state.career_links is None
+
+
+def test_crawl_state_store_is_unchanged_counts_pages(tmp_path):
+    crawl_state = CrawlStateStore(str(tmp_path / "state.sqlite3"))
+    crawl_state.save_page("https://xyz.com/", content_hash("<html></html>"))
+    page_state = crawl_state.get_page("https://xyz.com/")
+
+    assert crawl_state.is_unchanged(page_state, content_hash("<html></html>"))
+    assert not crawl_state.is_unchanged(page_state, content_hash("<html>changed</html>"))
+    assert not crawl_state.is_unchanged(None, content_hash("<html></html>"))
+    assert (crawl_state.unchanged_pages, crawl_state.changed_pages) == (1, 2)
+
+
+def test_crawl_state_store_does_not_return_results_saved_with_other_fingerprint(tmp_path):
+    crawl_state = CrawlStateStore(str(tmp_path / "state.sqlite3"))
+    crawl_state.save_page("https://xyz.com/", "hash-1", career_links=["https://xyz.com/kariera"], fingerprint="links")
+    crawl_state.save_page("https://xyz.com/", "hash-1", has_needed_jobs=True, fingerprint="jobs")
+
+    assert crawl_state.get_page("https://xyz.com/", "links").career_links == ["https://xyz.com/kariera"]
+    assert crawl_state.get_page("https://xyz.com/", "links").has_needed_jobs is None
+    assert crawl_state.get_page("https://xyz.com/", "jobs").has_needed_jobs is True
+    assert crawl_state.get_page("https://xyz.com/", "jobs").career_links is None
+
+
+def test_career_links_fetcher_reuses_career_links_of_unchanged_website(monkeypatch, tmp_path, setup_www_page):
+    crawl_state = CrawlStateStore(str(tmp_path / "state.sqlite3"))
+    career_links_fetcher = CareerLinksFetcher(configure_logger("TestLogger"), crawl_state=crawl_state)
+
+    assert career_links_fetcher.get_career_links("http://127.0.0.1:9999/") == ["http://127.0.0.1:9999/#careers"]
+
+    def filter_career_links_not_expected(baseurl, website_html_text):
+        raise AssertionError("Career links of unchanged website should be reused.")
+
+    monkeypatch.setattr(career_links_fetcher, "filter_career_links", filter_career_links_not_expected)
+
+    assert career_links_fetcher.get_career_links("http://127.0.0.1:9999/") == ["http://127.0.0.1:9999/#careers"]
+    assert crawl_state.unchanged_pages == 1
+
+
+def test_jobs_checker_reuses_verdict_of_unchanged_page(monkeypatch, tmp_path, setup_www_page):
+    monkeypatch.setattr("jobs.JOB_ROLES", ["Software developer (python)"])
+    crawl_state = CrawlStateStore(str(tmp_path / "state.sqlite3"))
+    jobs_checker = JobsChecker(configure_logger("TestLogger"), crawl_state=crawl_state)
+
+    assert jobs_checker.may_company_have_the_needed_jobs("http://127.0.0.1:9999/#careers")
+
+    def has_needed_jobs_not_expected(website_text):
+        raise AssertionError("Verdict of unchanged page should be reused.")
+
+    monkeypatch.setattr(jobs_checker, "has_needed_jobs", has_needed_jobs_not_expected)
+
+    assert jobs_checker.may_company_have_the_needed_jobs("http://127.0.0.1:9999/#careers")
+    assert (crawl_state.unchanged_pages, crawl_state.changed_pages) == (1, 1)
+
+
+def test_jobs_checker_does_not_reuse_verdict_of_other_job_roles(monkeypatch, tmp_path, setup_www_page):
+    monkeypatch.setattr("jobs.JOB_ROLES", ["Software developer (python)"])
+    crawl_state = CrawlStateStore(str(tmp_path / "state.sqlite3"))
+    jobs_checker = JobsChecker(configure_logger("TestLogger"), crawl_state=crawl_state)
+
+    assert jobs_checker.may_company_have_the_needed_jobs("http://127.0.0.1:9999/#careers")
+
+    monkeypatch.setattr("jobs.JOB_ROLES", ["Accountant"])
+
+    assert not jobs_checker.may_company_have_the_needed_jobs("http://127.0.0.1:9999/#careers")
+
+
+def test_career_links_fetcher_does_not_reuse_career_links_of_other_keywords(monkeypatch, tmp_path, setup_www_page):
+    crawl_state = CrawlStateStore(str(tmp_path / "state.sqlite3"))
+    career_links_fetcher = CareerLinksFetcher(configure_logger("TestLogger"), crawl_state=crawl_state)
+
+    assert career_links_fetcher.get_career_links("http://127.0.0.1:9999/") == ["http://127.0.0.1:9999/#careers"]
+
+    monkeypatch.setattr(CareerLinksFetcher, "CAREER_KEYWORDS", ["kariera"])
+
+    assert career_links_fetcher.get_career_links("http://127.0.0.1:9999/") == []
+
+
+def test_job_scanner_run_incremental_saves_page_state(
+    monkeypatch, tmp_path, mock_db_filepath, setup_www_page, removes_result_test_files
+):
+    crawl_state_filepath = str(tmp_path / "state.sqlite3")
+    monkeypatch.setattr("helpers.DB_FILEPATH", mock_db_filepath)
+    monkeypatch.setattr("jobs.JOB_ROLES", ["Software developer (python)"])
+    monkeypatch.setattr("storage.CRAWLED_JOBS_OUTPUT_FILE", "tests/TEST_RESULT_CRAWLED_JOBS_OUTPUT_FILE.csv")
+    monkeypatch.setattr("crawl_state.CRAWL_STATE_FILEPATH", crawl_state_filepath)
+
+    assert JobScanner(workers_count=1, incremental=True).run() is None
+
+    fingerprint = settings_fingerprint(["Software developer (python)"])
+    assert CrawlStateStore(crawl_state_filepath).get_page("http://127.0.0.1:9999/#careers", fingerprint).has_needed_jobs
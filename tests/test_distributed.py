@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+import multiprocessing
+import time
+from multiprocessing.connection import Client
+
+import pytest
+
+from distributed import CrawlCoordinator
+from distributed import CrawlNode
+from helpers import configure_logger
+from storage import CsvResultStore
+from storage import ResultRecord
+
+
+AUTHKEY = b"test-authkey"
+
+
+def result_record(krs_number):
+    return ResultRecord(f"FIRMA {krs_number}", krs_number, "brak_email", "www", "pl", "adres", "http://firma.pl", 1.0)
+
+
+@pytest.fixture
+def db_filepath(mock_db_filepath, tmp_path):
+    """Provides DB file with 4 company rows with the website of the www page fixture"""
+    with open(mock_db_filepath, "r") as mock_db_file:
+        company_line = mock_db_file.readline().rstrip("\n")
+    db_filepath = tmp_path / "DB.csv"
+    db_filepath.write_text(
+        "".join(
+            company_line.replace("1;", f"{line_number};", 1).replace(";101;", f";10{line_number};") + "\n"
+            for line_number in range(1, 5)
+        )
+    )
+    return str(db_filepath)
+
+
+@pytest.fixture
+def coordinator(db_filepath, tmp_path):
+    coordinator = CrawlCoordinator(
+        address=("127.0.0.1", 0),
+        authkey=AUTHKEY,
+        range_size=2,
+        lease_timeout=0.5,
+        poll_interval=0.05,
+        result_store=CsvResultStore(configure_logger("TestLogger"), str(tmp_path / "RESULT.csv")),
+        db_filepath=db_filepath,
+    )
+    coordinator.start()
+    yield coordinator
+    coordinator.wait(timeout=0)
+
+
+def request(connection, *message):
+    connection.send(message)
+    return connection.recv()
+
+
+def saved_krs_numbers(tmp_path):
+    return sorted(line.split(";")[1] for line in (tmp_path / "RESULT.csv").read_text().splitlines())
+
+
+def test_coordinator_reassigns_expired_lease_and_merges_every_range_once(coordinator, tmp_path):
+    with Client(coordinator.address, authkey=AUTHKEY) as first_node, Client(
+        coordinator.address, authkey=AUTHKEY
+    ) as second_node:
+        assert request(first_node, "lease", "first") == ("range", 1, 0, 2, 0.5)
+        assert request(first_node, "lease", "first") == ("range", 2, 2, 4, 0.5)
+        assert request(second_node, "lease", "second") == ("wait", 0.05)
+        assert request(first_node, "complete", 1, 0, [result_record("101")]) == ("ok",)
+        assert request(first_node, "renew", 2) == ("ok",)
+
+        time.sleep(0.6)
+        assert request(first_node, "renew", 2) == ("lost",)
+        assert request(second_node, "lease", "second") == ("range", 3, 2, 4, 0.5)
+        assert request(second_node, "complete", 3, 2, [result_record("103")]) == ("ok",)
+        # Late completion of the reassigned range is dropped.
+        assert request(first_node, "complete", 2, 2, [result_record("103")]) == ("ok",)
+        assert request(first_node, "lease", "first") == ("done",)
+
+    assert coordinator.wait(timeout=5)
+    assert coordinator.completed_ranges_count == 2
+    assert saved_krs_numbers(tmp_path) == ["101", "103"]
+
+
+def test_coordinator_releases_lease_of_disconnected_node(coordinator):
+    with Client(coordinator.address, authkey=AUTHKEY) as node:
+        assert request(node, "lease", "first")[:4] == ("range", 1, 0, 2)
+    time.sleep(0.1)
+
+    with Client(coordinator.address, authkey=AUTHKEY) as node:
+        assert request(node, "lease", "second")[:4] == ("range", 2, 0, 2)
+
+
+def run_node(address, directory, db_filepath):
+    CrawlNode(address, AUTHKEY, directory, workers_count=1, db_filepath=db_filepath).run()
+
+
+def test_crawl_nodes_crawl_all_ranges(monkeypatch, coordinator, db_filepath, tmp_path, setup_www_page):
+    monkeypatch.setattr("jobs.JOB_ROLES", ["Software developer (python)"])
+    nodes = [
+        multiprocessing.Process(
+            target=run_node, args=(coordinator.address, str(tmp_path / f"node{index}"), db_filepath)
+        )
+        for index in range(2)
+    ]
+    for node in nodes:
+        node.start()
+
+    assert coordinator.wait(timeout=120)
+    for node in nodes:
+        node.join(timeout=30)
+        assert node.exitcode == 0
+    assert saved_krs_numbers(tmp_path) == ["101", "102", "103", "104"]
+
+
+def test_crawl_node_clears_run_state_once_per_session(monkeypatch, coordinator, db_filepath, tmp_path):
+    runs, clears = [], []
+    monkeypatch.setattr("distributed.JobScanner.run", lambda self, **kwargs: runs.append(kwargs))
+    monkeypatch.setattr("distributed.JobScanner.clear_run_state", lambda self: clears.append(self))
+
+    node = CrawlNode(address=coordinator.address, authkey=AUTHKEY, directory=str(tmp_path / "node"))
+    node.run()
+
+    assert node.completed_ranges_count == 2
+    assert len(clears) == 1
+    assert [(run["rows"], run["new_run"]) for run in runs] == [(range(0, 2), False), (range(2, 4), False)]
+
+
+def test_crawl_node_reads_authkey_from_environment(monkeypatch, tmp_path):
+    monkeypatch.setenv("FINDER_DISTRIBUTED_AUTHKEY", "environment-authkey")
+
+    assert CrawlNode(directory=str(tmp_path / "node")).authkey == b"environment-authkey"
+
+
+def test_crawl_coordinator_without_authkey_is_refused(monkeypatch, db_filepath, tmp_path):
+    monkeypatch.delenv("FINDER_DISTRIBUTED_AUTHKEY", raising=False)
+
+    with pytest.raises(ValueError, match="FINDER_DISTRIBUTED_AUTHKEY"):
+        CrawlCoordinator(
+            result_store=CsvResultStore(configure_logger("TestLogger"), str(tmp_path / "RESULT.csv")),
+            db_filepath=db_filepath,
+        )
@@ -1,7 +1,16 @@
 from __future__ import annotations
 
+import pytest
 import requests
 
+import flask_api
+from helpers import configure_logger
+from host_health import HostHealth
+from live_events import LiveEvents
+from metrics import CrawlMetrics
+from storage import CsvResultStore
+from storage import ResultRecord
+
 
 def test_flask_api_endpoints_home(setup_flask_api):
     flask_api_www = setup_flask_api
@@ -35,13 +44,134 @@ def test_flask_api_endpoints_home_content(setup_flask_api):
         </head>
         <body>
             <h1>Hello!</h1>
-            <p>This simple Web app allow you to use following two endpoints:</>
+            <p>This simple Web app allow you to use following endpoints:</>
             <ul>
                 <li><a href="/logs">/logs</a> - displaying latest logs</li>
-                <li><a href="/results">/results</a> - displaying all results collected till now</li>
+                <li><a href="/results">/results</a> - JSON page of results collected till now
+                    (query parameters: limit, offset, cursor, voivodeship, krs_number)</li>
+                <li><a href="/stream">/stream</a> - server-sent events with new logs and results
+                    (query parameter: events, e.g. events=result)</li>
+                <li><a href="/metrics">/metrics</a> - crawler metrics in Prometheus text format</li>
+                <li><a href="/tripped_hosts">/tripped_hosts</a> - hosts with circuit breaker tripped during the run</li>
                 <li><a href="/jobs_definition">/jobs_definition</a> - displaying job keywords used for Job Search</li>
             </ul>
         </body>
     </html>
     """
     )
+
+
+@pytest.fixture
+def api_result_store(monkeypatch, tmp_path):
+    result_store = CsvResultStore(configure_logger("TestLogger"), str(tmp_path / "RESULT.csv"))
+    result_store.save(
+        [
+            ResultRecord(f"FIRMA {krs}", krs, "brak_email", "www", voivodeship, "adres", "http://firma.pl/kariera", 1.0)
+            for krs, voivodeship in [("101", "małopolskie"), ("102", "mazowieckie"), ("103", "małopolskie")]
+        ]
+    )
+    monkeypatch.setattr(flask_api, "api_result_store", lambda: result_store)
+    return result_store
+
+
+def test_flask_api_results_pagination(api_result_store):
+    client = flask_api.app.test_client()
+
+    response = client.get("/results?limit=2")
+    assert response.status_code == 200
+    assert [result["krs_number"] for result in response.json["results"]] == ["101", "102"]
+    assert response.json["results"][0] == {
+        "id": 1,
+        "company_name": "FIRMA 101",
+        "krs_number": "101",
+        "email": "brak_email",
+        "www": "www",
+        "voivodeship": "małopolskie",
+        "address": "adres",
+        "link": "http://firma.pl/kariera",
+        "crawled_at": None,
+    }
+    assert response.json["total"] == 3
+    assert response.json["next_cursor"] == 2
+
+    response = client.get("/results?limit=2&cursor=2")
+    assert [result["krs_number"] for result in response.json["results"]] == ["103"]
+    assert response.json["next_cursor"] is None
+
+    response = client.get("/results?offset=1&voivodeship=małopolskie")
+    assert [result["krs_number"] for result in response.json["results"]] == ["103"]
+    assert response.json["total"] == 2
+
+    response = client.get("/results?krs_number=102")
+    assert [result["id"] for result in response.json["results"]] == [2]
+
+
+@pytest.mark.parametrize("query_string", ["limit=0", "limit=1001", "offset=-1", "cursor=abc"])
+def test_flask_api_results_invalid_parameters(api_result_store, query_string):
+    assert flask_api.app.test_client().get(f"/results?{query_string}").status_code == 400
+
+
+def test_flask_api_results_etag(api_result_store):
+    client = flask_api.app.test_client()
+
+    etag = client.get("/results").headers["ETag"]
+    response = client.get("/results", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.data == b""
+
+    api_result_store.save([ResultRecord("FIRMA 104", "104", "", "www", "śląskie", "adres", "http://firma.pl", 1.0)])
+    response = client.get("/results", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json["total"] == 4
+
+
+def test_flask_api_results_etag_of_query(api_result_store):
+    client = flask_api.app.test_client()
+
+    etag = client.get("/results?voivodeship=małopolskie&limit=2").headers["ETag"]
+
+    assert client.get("/results?limit=2&voivodeship=małopolskie&offset=0").headers["ETag"] == etag
+    response = client.get("/results?voivodeship=śląskie&limit=2", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+
+def test_flask_api_stream(monkeypatch):
+    live_events = LiveEvents(capacity=10)
+    monkeypatch.setattr("live_events._live_events", live_events)
+    live_events.publish("log", "line 1")
+    live_events.publish("result", {"krs_number": "101"})
+    live_events.publish("log", "line 2")
+
+    response = flask_api.app.test_client().get("/stream?events=log", headers={"Last-Event-ID": "1"}, buffered=False)
+    assert response.status_code == 200
+    assert response.mimetype == "text/event-stream"
+    chunks = iter(response.response)
+    assert next(chunks) == b'id: 3\nevent: log\ndata: "line 2"\n\n'
+
+    live_events.publish("result", {"krs_number": "102"})
+    live_events.publish("log", "line 3")
+    assert next(chunks) == b'id: 5\nevent: log\ndata: "line 3"\n\n'
+    response.close()
+
+
+def test_flask_api_metrics(monkeypatch):
+    crawl_metrics = CrawlMetrics()
+    monkeypatch.setattr("metrics._crawl_metrics", crawl_metrics)
+    crawl_metrics.inc("finder_rows_processed_total", 3)
+
+    response = flask_api.app.test_client().get("/metrics")
+    assert response.status_code == 200
+    assert response.content_type.startswith("text/plain; version=0.0.4")
+    assert "finder_rows_processed_total 3.0" in response.text.splitlines()
+
+
+def test_flask_api_tripped_hosts():
+    HostHealth(breaker_failures=1, cooldown=60.0).record_failure("https://firma.pl/", "timeout")
+
+    response = flask_api.app.test_client().get("/tripped_hosts")
+    assert response.status_code == 200
+    assert response.json["open"] == 1
+    assert [(host["host"], host["last_error"], host["open"]) for host in response.json["hosts"]] == [
+        ("firma.pl", "timeout", True)
+    ]
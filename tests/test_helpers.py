@@ -4,8 +4,12 @@ import os.path
 
 import pytest
 
+from helpers import CompanyDbFile
+from helpers import CompanyRecord
 from helpers import configure_logger
+from helpers import CrawlTask
 from helpers import iterate_over_csv_db_file
+from helpers import website_key
 
 
 def test_configure_logger_check_logger_name(timestamp):
@@ -54,3 +58,108 @@ def test_iterate_over_csv_db_file_not_exists_db(mock_db_filepath):
     with pytest.raises(FileNotFoundError):
         for company_data in iterate_over_csv_db_file(f"{mock_db_filepath}-not-exists"):
             line_number, company_name, krs_number, main_pkd, other_pkd, email, www, voivodeship, address = company_data
+
+
+@pytest.fixture
+def company_db_filepath(tmp_path):
+    """Provides DB file with 10 company rows (line numbers from 1 to 10, every third one without website)"""
+    db_filepath = tmp_path / "DB.csv"
+    rows = [
+        f"{line_number};FIRMA {line_number};{100 + line_number};[];[];brak_email;"
+        f"{'brak_www' if line_number % 3 == 0 else f'http://firma{line_number}.pl/'};mazowieckie;Adres {line_number}"
+        for line_number in range(1, 11)
+    ]
+    db_filepath.write_text("\n".join(rows) + "\n", encoding="utf-8")
+    return str(db_filepath)
+
+
+def test_company_db_file_rows_match_iterate_over_csv_db_file(company_db_filepath, mock_db_filepath):
+    for db_filepath in (company_db_filepath, mock_db_filepath):
+        with CompanyDbFile(db_filepath) as company_db:
+            rows = list(company_db.iterate_rows())
+            assert [row.fields() for row in rows] == list(iterate_over_csv_db_file(db_filepath))
+            assert [(row.line_number, row.www) for row in rows] == [
+                (int(company_data[0]), company_data[6]) for company_data in iterate_over_csv_db_file(db_filepath)
+            ]
+        if db_filepath == mock_db_filepath:
+            os.remove(f"{db_filepath}.index")
+
+
+def test_company_db_file_lazy_fields(company_db_filepath):
+    with CompanyDbFile(company_db_filepath) as company_db:
+        row = company_db.row(1)
+        assert row[1] == "FIRMA 2"
+        assert row[8] == "Adres 2"
+        with pytest.raises(IndexError):
+            row[9]
+        with pytest.raises(IndexError):
+            company_db.row(10)
+
+
+def test_company_db_file_slices_rows(company_db_filepath):
+    with CompanyDbFile(company_db_filepath) as company_db:
+        assert len(company_db) == 10
+        assert company_db.find_row(0) == 0
+        assert company_db.find_row(4) == 3
+        assert company_db.find_row(11) == 10
+        assert [row.line_number for row in company_db.iterate_rows(3, 5)] == [4, 5]
+        shards = [company_db.shard(shard_index, 3) for shard_index in range(3)]
+        assert [list(shard) for shard in shards] == [[0, 1, 2], [3, 4, 5], [6, 7, 8, 9]]
+        with pytest.raises(ValueError):
+            company_db.shard(3, 3)
+
+
+def test_company_db_file_caches_index(company_db_filepath):
+    with CompanyDbFile(company_db_filepath) as company_db:
+        assert len(company_db) == 10
+    assert os.path.exists(f"{company_db_filepath}.index")
+
+    index_stat = os.stat(f"{company_db_filepath}.index")
+    with CompanyDbFile(company_db_filepath) as company_db:
+        assert company_db.row(1).fields()[1] == "FIRMA 2"
+    # Cached index of unchanged DB file is reused, not rebuilt.
+    assert os.stat(f"{company_db_filepath}.index").st_ino == index_stat.st_ino
+
+    with open(company_db_filepath, "a") as db_file:
+        db_file.write("11;FIRMA 11;111;[];[];brak_email;http://firma11.pl/;mazowieckie;Adres 11")
+    with CompanyDbFile(company_db_filepath) as company_db:
+        assert len(company_db) == 11
+        assert company_db.row(1).fields()[1] == "FIRMA 2"
+        assert company_db.row(10).fields()[8] == "Adres 11"
+
+
+def test_company_db_file_empty_file(t_file):
+    with CompanyDbFile(t_file) as company_db:
+        assert len(company_db) == 0
+        assert list(company_db.iterate_rows()) == []
+        assert company_db.find_row(1) == 0
+
+
+def test_company_record_from_fields(mock_db_filepath):
+    (company_data,) = iterate_over_csv_db_file(mock_db_filepath)
+    company_record = CompanyRecord.from_fields(company_data)
+
+    assert company_record.line_number == 1
+    assert company_record.krs_number == "101"
+    assert company_record.www == "http://127.0.0.1:9999/"
+    assert company_record.address == "Borsucza,16,Kraków,30-40-408,Kraków,Polska"
+    with pytest.raises(ValueError):
+        CompanyRecord.from_fields(company_data[:8])
+    with pytest.raises(ValueError):
+        CompanyRecord.from_fields(["x", *company_data[1:]])
+
+
+def test_company_row_crawl_task(company_db_filepath):
+    with CompanyDbFile(company_db_filepath) as company_db:
+        row = company_db.row(3)
+        assert row.crawl_task() == CrawlTask(3, 4, "104", "http://firma4.pl/")
+        assert row.record() == CompanyRecord(
+            4, "FIRMA 4", "104", "brak_email", "http://firma4.pl/", "mazowieckie", "Adres 4"
+        )
+
+
+def test_website_key():
+    assert website_key("HTTPS://www.Firma.pl/") == "firma.pl"
+    assert website_key("http://firma.pl") == "firma.pl"
+    assert website_key(" www.firma.pl/kariera/ ") == "firma.pl/kariera"
+    assert website_key("http://sklep.firma.pl/") != website_key("http://firma.pl/")
@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import socket
+import time
+
+from helpers import configure_logger
+from host_health import host_key
+from host_health import HostHealth
+from host_health import TrippedHostsStore
+from jobs import UrlFetcher
+from metrics import CrawlMetrics
+
+
+def test_host_key():
+    assert host_key("https://Firma.pl:443/kariera") == "firma.pl"
+    assert host_key("http://firma.pl/") == host_key("https://firma.pl/praca")
+
+
+def test_host_health_adapts_timeouts_to_host_latency():
+    host_health = HostHealth(connect_timeout=3.0, read_timeout=5.0, min_timeout=0.5)
+
+    assert host_health.timeouts("https://firma.pl/") == (3.0, 5.0)
+
+    for _ in range(20):
+        host_health.record_success("https://firma.pl/kariera", 0.1)
+    assert host_health.timeouts("https://firma.pl/praca") == (0.5, 0.5)
+
+    for latency in [1.0, 2.0] * 10:
+        host_health.record_success("https://wolna-firma.pl/", latency)
+    connect_timeout, read_timeout = host_health.timeouts("https://wolna-firma.pl/")
+    assert connect_timeout == 3.0
+    assert 3.0 < read_timeout < 5.0
+
+
+def test_host_health_tracks_only_recently_requested_hosts(monkeypatch):
+    monkeypatch.setattr(HostHealth, "HOSTS_CACHE_SIZE", 2)
+    host_health = HostHealth(connect_timeout=3.0, read_timeout=5.0, min_timeout=0.5)
+    for url in ("https://a.pl/", "https://b.pl/", "https://a.pl/", "https://c.pl/"):
+        host_health.record_success(url, 0.1)
+
+    assert host_health.timeouts("https://a.pl/") == (0.5, 0.5)
+    assert host_health.timeouts("https://b.pl/") == (3.0, 5.0)  # Least recently requested host is forgotten.
+    assert host_health.timeouts("https://c.pl/") == (0.5, 0.5)
+
+
+def test_host_health_circuit_breaker():
+    host_health = HostHealth(breaker_failures=3, cooldown=60.0)
+    host_health.record_failure("https://firma.pl/", "timeout")
+    host_health.record_success("https://firma.pl/", 0.2)  # Only failures in a row trip the breaker.
+    host_health.record_failure("https://firma.pl/", "timeout")
+    host_health.record_failure("https://firma.pl/", "timeout")
+
+    assert host_health.allows("https://firma.pl/kariera")
+
+    host_health.record_failure("https://firma.pl/", "connection_error")
+
+    assert not host_health.allows("https://firma.pl/kariera")
+    assert not HostHealth().allows("http://firma.pl/")  # Tripped hosts are shared by all processes.
+    assert host_health.allows("https://inna-firma.pl/")
+    [tripped_host] = TrippedHostsStore().tripped()
+    assert tripped_host["host"] == "firma.pl"
+    assert tripped_host["failures"] == 3
+    assert tripped_host["last_error"] == "connection_error"
+    assert tripped_host["open"]
+
+
+def test_host_health_trial_request_after_cooldown():
+    host_health = HostHealth(breaker_failures=2, cooldown=0.0)
+    host_health.record_failure("https://firma.pl/", "timeout")
+    host_health.record_failure("https://firma.pl/", "timeout")
+
+    assert host_health.allows("https://firma.pl/")
+    host_health.record_failure("https://firma.pl/", "timeout")  # Failed trial trips the breaker again.
+    assert TrippedHostsStore().tripped()[0]["failures"] == 1
+
+    assert host_health.allows("https://firma.pl/")
+    host_health.record_success("https://firma.pl/", 0.2)  # Successful trial closes the breaker.
+    assert TrippedHostsStore().tripped() == []
+
+
+def test_host_health_trial_request_is_sent_by_one_process():
+    TrippedHostsStore().trip("firma.pl", 3, "timeout", cooldown=0.0)
+
+    assert HostHealth(cooldown=60.0).allows("https://firma.pl/")
+    assert not HostHealth(cooldown=60.0).allows("https://firma.pl/")  # Another process waits for the trial result.
+    assert TrippedHostsStore().tripped()[0]["open"]
+
+
+def test_url_fetcher_skips_requests_to_tripped_host(monkeypatch):
+    crawl_metrics = CrawlMetrics()
+    monkeypatch.setattr("metrics._crawl_metrics", crawl_metrics)
+    monkeypatch.setattr("jobs.get_politeness_policy", lambda: None)
+    url_fetcher = UrlFetcher(configure_logger("TestLogger"), host_health=HostHealth(breaker_failures=2))
+    dead_host_link = "http://127.0.0.1:9/kariera"  # Nothing listens on discard port.
+
+    assert url_fetcher.fetch(dead_host_link) is None
+    assert url_fetcher.fetch(dead_host_link) is None
+    assert url_fetcher.fetch(dead_host_link) is None
+
+    assert crawl_metrics.value("finder_fetches_total", "connection_error") == 2
+    assert crawl_metrics.value("finder_fetches_total", "circuit_open") == 1
+    assert crawl_metrics.value("finder_host_breaker_trips_total") == 1
+
+
+def test_url_fetcher_does_not_fetch_after_deadline(monkeypatch, setup_www_page):
+    crawl_metrics = CrawlMetrics()
+    monkeypatch.setattr("metrics._crawl_metrics", crawl_metrics)
+    url_fetcher = UrlFetcher(configure_logger("TestLogger"))
+
+    url_fetcher.deadline = time.monotonic() + 10.0
+    assert url_fetcher.fetch("http://127.0.0.1:9999/") is not None
+
+    url_fetcher.deadline = time.monotonic() - 1.0
+    assert url_fetcher.fetch("http://127.0.0.1:9999/") is None
+    assert crawl_metrics.value("finder_fetches_total", "deadline") == 1
+
+
+def test_url_fetcher_does_not_count_deadline_timeouts_as_host_failures(monkeypatch):
+    crawl_metrics = CrawlMetrics()
+    monkeypatch.setattr("metrics._crawl_metrics", crawl_metrics)
+    monkeypatch.setattr("jobs.get_politeness_policy", lambda: None)
+    url_fetcher = UrlFetcher(configure_logger("TestLogger"), host_health=HostHealth(breaker_failures=1))
+
+    with socket.create_server(("127.0.0.1", 0)) as server:  # Connections are accepted, but never answered.
+        hanging_host_link = f"http://127.0.0.1:{server.getsockname()[1]}/kariera"
+        url_fetcher.deadline = time.monotonic() + 0.3
+        assert url_fetcher.fetch(hanging_host_link) is None
+
+    assert crawl_metrics.value("finder_fetches_total", "deadline") == 1
+    assert crawl_metrics.value("finder_fetches_total", "timeout") == 0
+    assert TrippedHostsStore().tripped() == []
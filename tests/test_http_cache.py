@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import time
+
+import requests
+
+from helpers import configure_logger
+from http_cache import ResponseCache
+from http_session import create_session
+from jobs import UrlFetcher
+
+
+def cache_entries(directory):
+    return sorted(entry for entry in directory.glob("*/*") if entry.is_file())
+
+
+def build_response(content, headers):
+    response = requests.Response()
+    response.status_code = 200
+    response.encoding = "utf-8"
+    response.headers.update(headers)
+    response._content = content
+    return response
+
+
+def test_response_cache_store_and_get(tmp_path):
+    cache = ResponseCache(str(tmp_path))
+    headers = {"ETag": '"v1"', "Last-Modified": "Mon, 01 Jan 2024 00:00:00 GMT"}
+    response = build_response(b"<html>kariera</html>", headers)
+
+    assert cache.store("https://xyz.com/kariera", response)
+
+    cached_response = cache.get("https://xyz.com/kariera")
+    assert cached_response.body == b"<html>kariera</html>"
+    assert cached_response.conditional_headers() == {
+        "If-None-Match": '"v1"',
+        "If-Modified-Since": "Mon, 01 Jan 2024 00:00:00 GMT",
+    }
+    assert cached_response.to_response().text == "<html>kariera</html>"
+    assert cache.get("https://xyz.com/other") is None
+
+
+def test_response_cache_does_not_store_response_without_validators(tmp_path):
+    cache = ResponseCache(str(tmp_path))
+
+    assert not cache.store("https://xyz.com/", build_response(b"<html></html>", {}))
+    assert cache.get("https://xyz.com/") is None
+
+
+def test_response_cache_compresses_body(tmp_path):
+    cache = ResponseCache(str(tmp_path))
+    cache.store("https://xyz.com/", build_response(b"python " * 10_000, {"ETag": '"v1"'}))
+
+    stored_size = sum(entry.stat().st_size for entry in cache_entries(tmp_path))
+    assert stored_size < 10_000
+
+
+def test_response_cache_drops_expired_entries(tmp_path):
+    cache = ResponseCache(str(tmp_path), ttl=0.01)
+    cache.store("https://xyz.com/", build_response(b"<html></html>", {"ETag": '"v1"'}))
+    time.sleep(0.02)
+
+    assert cache.get("https://xyz.com/") is None
+    assert cache_entries(tmp_path) == []
+    assert cache.connection.execute("SELECT count(*) FROM entries").fetchone() == (0,)
+
+
+def test_response_cache_evicts_least_recently_used_entries(tmp_path):
+    cache = ResponseCache(str(tmp_path), max_size=1)
+    for page_number in range(3):
+        cache.store(f"https://xyz.com/{page_number}", build_response(b"x" * 100, {"ETag": '"v1"'}))
+    cache.max_size = sum(entry.stat().st_size for entry in cache_entries(tmp_path)) - 1
+
+    cache.get("https://xyz.com/0")  # Page 1 becomes the least recently used one.
+    cache.get("https://xyz.com/2")
+    cache.evict()
+
+    assert len(cache_entries(tmp_path)) == 2
+    assert cache.get("https://xyz.com/1") is None
+    assert cache.get("https://xyz.com/0") is not None
+    assert cache.get("https://xyz.com/2") is not None
+    query_plan = cache.connection.execute("EXPLAIN QUERY PLAN SELECT path, size FROM entries ORDER BY used_at")
+    assert "entries_used_at" in str(query_plan.fetchall())
+
+
+def test_url_fetcher_revalidates_cached_response(tmp_path, setup_cacheable_www_page):
+    url, received_requests = setup_cacheable_www_page
+    url_fetcher = UrlFetcher(configure_logger("TestLogger"), create_session(), ResponseCache(str(tmp_path)))
+
+    first_text = url_fetcher.fetch(url)
+    second_text = url_fetcher.fetch(url)
+
+    assert received_requests == [200, 304]
+    assert "Firma XYZ to lider w dostarczaniu innowacyjnych" in first_text
+    assert second_text == first_text
+
+
+def test_url_fetcher_iter_text_uses_cache(tmp_path, setup_cacheable_www_page, mock_company_html):
+    url, received_requests = setup_cacheable_www_page
+    url_fetcher = UrlFetcher(configure_logger("TestLogger"), create_session(), ResponseCache(str(tmp_path)))
+
+    assert "".join(url_fetcher.iter_text(url, chunk_size=100)) == mock_company_html
+    assert "".join(url_fetcher.iter_text(url, chunk_size=100)) == mock_company_html
+    assert received_requests == [200, 304]
+
+
+def test_url_fetcher_iter_text_does_not_cache_partially_downloaded_body(tmp_path, setup_cacheable_www_page):
+    url, received_requests = setup_cacheable_www_page
+    url_fetcher = UrlFetcher(configure_logger("TestLogger"), create_session(), ResponseCache(str(tmp_path)))
+
+    text_chunks = url_fetcher.iter_text(url, chunk_size=100)
+    next(text_chunks)
+    text_chunks.close()
+    url_fetcher.fetch(url)
+
+    assert received_requests == [200, 200]
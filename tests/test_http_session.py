@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import multiprocessing
+
+from helpers import configure_logger
+from http_session import CONNECTION_STATS
+from http_session import create_session
+from http_session import get_session
+from jobs import CareerLinksFetcher
+from jobs import JobsChecker
+from jobs import UrlFetcher
+from politeness import PolitenessPolicy
+
+
+def test_get_session_is_reused_in_the_same_process():
+    assert get_session() is get_session()
+
+
+def test_get_session_is_not_shared_with_forked_process():
+    parent_session = get_session()
+    result_queue = multiprocessing.Queue()
+
+    def check_session_in_child_process():
+        result_queue.put(get_session() is not parent_session and get_session() is get_session())
+
+    process = multiprocessing.Process(target=check_session_in_child_process)
+    process.start()
+    process.join()
+
+    assert result_queue.get(timeout=5)
+
+
+def test_create_session_without_keep_alive():
+    assert create_session(keep_alive=False).headers["Connection"] == "close"
+
+
+def test_url_fetcher_reuses_connections(setup_keep_alive_www_page):
+    session = create_session()
+    url_fetcher = UrlFetcher(configure_logger("TestLogger"), session, politeness=PolitenessPolicy(session=session))
+    CONNECTION_STATS.reset()
+
+    for _ in range(3):
+        assert url_fetcher.fetch(setup_keep_alive_www_page) is not None
+
+    # robots.txt request and 3 page requests.
+    assert CONNECTION_STATS.requests == 4
+    assert CONNECTION_STATS.new_connections == 1
+    assert CONNECTION_STATS.reused_connections == 3
+
+
+def test_url_fetcher_without_keep_alive_opens_new_connections(setup_keep_alive_www_page):
+    session = create_session(keep_alive=False)
+    url_fetcher = UrlFetcher(configure_logger("TestLogger"), session, politeness=PolitenessPolicy(session=session))
+    CONNECTION_STATS.reset()
+
+    for _ in range(3):
+        assert url_fetcher.fetch(setup_keep_alive_www_page) is not None
+
+    assert CONNECTION_STATS.new_connections == 4
+    assert CONNECTION_STATS.reused_connections == 0
+
+
+def test_career_links_fetcher_and_jobs_checker_share_process_session(monkeypatch, setup_www_page):
+    monkeypatch.setattr("jobs.JOB_ROLES", ["Software developer (python)"])
+    logger = configure_logger("TestLogger")
+
+    assert CareerLinksFetcher(logger).url_fetcher.session is JobsChecker(logger).url_fetcher.session
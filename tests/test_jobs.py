@@ -1,18 +1,26 @@
 from __future__ import annotations
 
-import multiprocessing
+import os
 from os.path import dirname
 from time import sleep
 
 import pytest
 import requests
 
+from checkpoint import CrawlCheckpoint
 from helpers import configure_logger
+from helpers import CrawlTask
 from jobs import CareerLinksFetcher
+from jobs import CareerLinksFilter
+from jobs import CareerLinksRanker
+from jobs import FetchBudget
 from jobs import JobScanner
 from jobs import JobsChecker
 from jobs import LinksExtractor
 from jobs import UrlFetcher
+from metrics import CrawlMetrics
+from results_writer import ResultsWriter
+from storage import CsvResultStore
 
 
 def test_job_scanner_initiate_object():
@@ -25,25 +33,16 @@ def test_job_scanner_run_www_check_for_the_needed_jobs(
 ):
     monkeypatch.setattr("helpers.DB_FILEPATH", mock_db_filepath)
     monkeypatch.setattr("jobs.JOB_ROLES", ["Software developer (python)"])
-    monkeypatch.setattr("jobs.CRAWLED_JOBS_OUTPUT_FILE", "tests/TEST_RESULT_CRAWLED_JOBS_OUTPUT_FILE.csv")
+    monkeypatch.setattr("storage.CRAWLED_JOBS_OUTPUT_FILE", "tests/TEST_RESULT_CRAWLED_JOBS_OUTPUT_FILE.csv")
 
     url_fixture_link = "http://127.0.0.1:9999/"
-    lock = multiprocessing.Lock()
-
-    company_data = [
-        "1",
-        '"FIRMA 1" SPÓŁKA Z OGRANICZONĄ ODPOWIEDZIALNOŚCIĄ',
-        "101",
-        "['ZARZĄDZANIE NIERUCHOMOŚCIAMI WYKONYWANE NA ZLECENIE', '68', '32', 'Z']",
-        "[{'opis': 'DZIAŁALNOŚĆ POMOCNICZA ZWIĄZANA Z UTRZYMANIEM PORZĄDKU W BUDYNKACH', "
-        "'kodDzial': '81', 'kodKlasa': '10', 'kodPodklasa': 'Z'}]",
-        "brak_email",
-        "http://127.0.0.1:9999/",
-        "małopolskie",
-        "Borsucza,16,Kraków,30-40-408,Kraków,Polska",
-    ]
+    results_writer = ResultsWriter(configure_logger("TestLogger"), CsvResultStore(configure_logger("TestLogger")))
+    results_writer.start()
+
+    crawl_task = CrawlTask(0, 1, "101", url_fixture_link)
 
-    JobScanner()._JobScanner__run_www_check_for_the_needed_jobs(url_fixture_link, company_data, lock)
+    JobScanner()._JobScanner__run_www_check_for_the_needed_jobs(crawl_task, results_writer)
+    results_writer.stop()
     result_file = dirname(__file__) + "/TEST_RESULT_CRAWLED_JOBS_OUTPUT_FILE.csv"
 
     with open(result_file, "r") as file_result:
@@ -58,7 +57,7 @@ def test_job_scanner_run_www_check_for_the_needed_jobs(
 def test_job_scanner_run(monkeypatch, mock_db_filepath, setup_www_page, removes_result_test_files):
     monkeypatch.setattr("helpers.DB_FILEPATH", mock_db_filepath)
     monkeypatch.setattr("jobs.JOB_ROLES", ["Software developer (python)"])
-    monkeypatch.setattr("jobs.CRAWLED_JOBS_OUTPUT_FILE", "tests/TEST_RESULT_CRAWLED_JOBS_OUTPUT_FILE.csv")
+    monkeypatch.setattr("storage.CRAWLED_JOBS_OUTPUT_FILE", "tests/TEST_RESULT_CRAWLED_JOBS_OUTPUT_FILE.csv")
 
     assert JobScanner().run() is None
     sleep(1)  # this is tricky case, from some reason without that - requests are failing (threading ..)
@@ -77,7 +76,7 @@ def test_job_scanner_run(monkeypatch, mock_db_filepath, setup_www_page, removes_
 def test_job_scanner_run_not_found_job(monkeypatch, mock_db_filepath, setup_www_page):
     monkeypatch.setattr("helpers.DB_FILEPATH", mock_db_filepath)
     monkeypatch.setattr("jobs.JOB_ROLES", ["Software developer (unknown)"])
-    monkeypatch.setattr("jobs.CRAWLED_JOBS_OUTPUT_FILE", "tests/TEST_RESULT_CRAWLED_JOBS_OUTPUT_FILE.csv")
+    monkeypatch.setattr("storage.CRAWLED_JOBS_OUTPUT_FILE", "tests/TEST_RESULT_CRAWLED_JOBS_OUTPUT_FILE.csv")
 
     assert JobScanner().run() is None
     sleep(1)  # this is tricky case, from some reason without that - requests are failing (threading ..)
@@ -89,6 +88,135 @@ def test_job_scanner_run_not_found_job(monkeypatch, mock_db_filepath, setup_www_
             pass
 
 
+def test_job_scanner_worker_pool_settings(monkeypatch):
+    monkeypatch.setattr("jobs.WORKERS_COUNT", 5)
+    monkeypatch.setattr("jobs.WORK_QUEUE_SIZE", 7)
+
+    assert JobScanner().workers_count == 5
+    assert JobScanner().work_queue_size == 7
+    assert JobScanner(workers_count=2, work_queue_size=3).workers_count == 2
+    assert JobScanner(workers_count=2, work_queue_size=3).work_queue_size == 3
+
+
+def test_job_scanner_run_single_worker_multiple_rows(
+    monkeypatch, mock_db_filepath, t_file, setup_www_page, removes_result_test_files
+):
+    with open(mock_db_filepath, "r") as mock_db_file:
+        company_line = mock_db_file.readline().rstrip("\n")
+
+    with open(t_file, "w") as db_file:
+        db_file.write(company_line + "\n")
+        db_file.write(company_line.replace("1;", "2;", 1).replace(";101;", ";102;") + "\n")
+        db_file.write(company_line.replace("1;", "3;", 1).replace("http://127.0.0.1:9999/", "brak_www") + "\n")
+
+    monkeypatch.setattr("helpers.DB_FILEPATH", t_file)
+    monkeypatch.setattr("jobs.JOB_ROLES", ["Software developer (python)"])
+    monkeypatch.setattr("storage.CRAWLED_JOBS_OUTPUT_FILE", "tests/TEST_RESULT_CRAWLED_JOBS_OUTPUT_FILE.csv")
+
+    assert JobScanner(workers_count=1, work_queue_size=1).run() is None
+
+    result_file = dirname(__file__) + "/TEST_RESULT_CRAWLED_JOBS_OUTPUT_FILE.csv"
+
+    with open(result_file, "r") as file_result:
+        result_lines = file_result.read().splitlines()
+        assert [line.split(";")[1] for line in result_lines] == ["101", "102"]
+
+
+def test_job_scanner_run_resumes_unfinished_rows(
+    monkeypatch, mock_db_filepath, t_file, checkpoint_filepath, setup_www_page, removes_result_test_files
+):
+    with open(mock_db_filepath, "r") as mock_db_file:
+        company_line = mock_db_file.readline().rstrip("\n")
+
+    with open(t_file, "w") as db_file:
+        for line_number in (1, 2, 3, 4):
+            db_file.write(
+                company_line.replace("1;", f"{line_number};", 1).replace(";101;", f";10{line_number};") + "\n"
+            )
+
+    # Previous run finished rows 1 and 3, saved row 2 and crashed while saving row 4.
+    with open(checkpoint_filepath, "w") as checkpoint_file:
+        checkpoint_file.write('{"low_water_mark": 1, "finished_rows": [3]}')
+    with open("tests/TEST_RESULT_CRAWLED_JOBS_OUTPUT_FILE.csv", "w") as result_file:
+        result_file.write("FIRMA 1;101;x\nFIRMA 2;102;x\nFIRMA 4;1")
+
+    monkeypatch.setattr("helpers.DB_FILEPATH", t_file)
+    monkeypatch.setattr("jobs.JOB_ROLES", ["Software developer (python)"])
+    monkeypatch.setattr("storage.CRAWLED_JOBS_OUTPUT_FILE", "tests/TEST_RESULT_CRAWLED_JOBS_OUTPUT_FILE.csv")
+
+    assert JobScanner(workers_count=1).run() is None
+
+    with open("tests/TEST_RESULT_CRAWLED_JOBS_OUTPUT_FILE.csv", "r") as file_result:
+        result_lines = file_result.read().splitlines()
+        assert [line.split(";")[1] for line in result_lines] == ["101", "102", "104"]
+
+    with pytest.raises(FileNotFoundError):
+        with open(checkpoint_filepath, "r"):
+            pass
+
+
+def test_job_scanner_run_without_resume_ignores_checkpoint(
+    monkeypatch, mock_db_filepath, checkpoint_filepath, setup_www_page, removes_result_test_files
+):
+    with open(checkpoint_filepath, "w") as checkpoint_file:
+        checkpoint_file.write('{"low_water_mark": 1, "finished_rows": []}')
+
+    monkeypatch.setattr("helpers.DB_FILEPATH", mock_db_filepath)
+    monkeypatch.setattr("jobs.JOB_ROLES", ["Software developer (python)"])
+    monkeypatch.setattr("storage.CRAWLED_JOBS_OUTPUT_FILE", "tests/TEST_RESULT_CRAWLED_JOBS_OUTPUT_FILE.csv")
+
+    assert JobScanner(workers_count=1).run(resume=False) is None
+
+    with open("tests/TEST_RESULT_CRAWLED_JOBS_OUTPUT_FILE.csv", "r") as file_result:
+        assert [line.split(";")[1] for line in file_result.read().splitlines()] == ["101"]
+
+
+def test_job_scanner_run_keeps_checkpoint_when_results_writer_fails(
+    monkeypatch, mock_db_filepath, checkpoint_filepath, setup_www_page, tmp_path
+):
+    def failing_write(self, records, fsync):
+        raise OSError("No space left on device")
+
+    monkeypatch.setattr("helpers.DB_FILEPATH", mock_db_filepath)
+    monkeypatch.setattr("jobs.JOB_ROLES", ["Software developer (python)"])
+    monkeypatch.setattr(CsvResultStore, "write", failing_write)
+    result_store = CsvResultStore(configure_logger("TestLogger"), str(tmp_path / "RESULT.csv"))
+
+    assert JobScanner(workers_count=1, result_store=result_store).run(resume=False) is None
+
+    checkpoint = CrawlCheckpoint()
+    assert checkpoint.load()
+    assert not checkpoint.is_finished(1)
+
+
+def test_job_scanner_run_fails_when_results_writer_dies_while_rows_wait_for_their_host(
+    monkeypatch, mock_db_filepath, t_file, checkpoint_filepath, setup_www_page, tmp_path
+):
+    with open(mock_db_filepath, "r") as mock_db_file:
+        company_line = mock_db_file.readline().rstrip("\n")
+
+    with open(t_file, "w") as db_file:
+        for line_number in (1, 2, 3):
+            db_file.write(
+                company_line.replace("1;", f"{line_number};", 1).replace(";101;", f";10{line_number};") + "\n"
+            )
+
+    monkeypatch.setattr("helpers.DB_FILEPATH", t_file)
+    monkeypatch.setattr("jobs.JOB_ROLES", ["Software developer (python)"])
+    monkeypatch.setattr("jobs.WORKERS_LIVENESS_INTERVAL", 0.1)
+    monkeypatch.setattr("politeness.POLITENESS_CRAWL_DELAY", 0)
+    # Writer never passes finished rows to the scheduler, so rows 2 and 3 never get their host.
+    monkeypatch.setattr(ResultsWriter, "_ResultsWriter__run", lambda self: os._exit(1))
+    result_store = CsvResultStore(configure_logger("TestLogger"), str(tmp_path / "RESULT.csv"))
+
+    with pytest.raises(RuntimeError):
+        JobScanner(workers_count=1, result_store=result_store, dedup_websites=False).run(resume=False)
+
+    checkpoint = CrawlCheckpoint()
+    assert checkpoint.load()
+    assert not checkpoint.is_finished(1)
+
+
 def test_career_links_fetcher_keywords():
     assert CareerLinksFetcher.CAREER_KEYWORDS == [
         "career",
@@ -165,7 +293,7 @@ def test_career_links_fetcher_keywords():
 def test_url_fetcher_fetch(monkeypatch, mock_db_filepath, setup_www_page):
     monkeypatch.setattr("helpers.DB_FILEPATH", mock_db_filepath)
     monkeypatch.setattr("jobs.JOB_ROLES", ["Software developer (python)"])
-    monkeypatch.setattr("jobs.CRAWLED_JOBS_OUTPUT_FILE", "tests/TEST_RESULT_CRAWLED_JOBS_OUTPUT_FILE.csv")
+    monkeypatch.setattr("storage.CRAWLED_JOBS_OUTPUT_FILE", "tests/TEST_RESULT_CRAWLED_JOBS_OUTPUT_FILE.csv")
 
     logger = configure_logger("TestLogger")
     url_fetcher = UrlFetcher(logger)
@@ -184,7 +312,7 @@ def test_url_fetcher_fetch(monkeypatch, mock_db_filepath, setup_www_page):
 def test_url_fetcher_fetch_non_existing_www(monkeypatch, mock_db_filepath):
     monkeypatch.setattr("helpers.DB_FILEPATH", mock_db_filepath)
     monkeypatch.setattr("jobs.JOB_ROLES", ["Software developer (python)"])
-    monkeypatch.setattr("jobs.CRAWLED_JOBS_OUTPUT_FILE", "tests/TEST_RESULT_CRAWLED_JOBS_OUTPUT_FILE.csv")
+    monkeypatch.setattr("storage.CRAWLED_JOBS_OUTPUT_FILE", "tests/TEST_RESULT_CRAWLED_JOBS_OUTPUT_FILE.csv")
 
     logger = configure_logger("TestLogger")
     url_fetcher = UrlFetcher(logger)
@@ -195,10 +323,10 @@ def test_url_fetcher_fetch_non_existing_www(monkeypatch, mock_db_filepath):
 
 
 def test_url_fetcher_fetch_ssl_issue_www(monkeypatch, mock_db_filepath, logs_directory):
-    def get_raising_ssl_error(url, allow_redirects=True, timeout=5):
+    def get_raising_ssl_error(self, url, **kwargs):
         raise requests.exceptions.SSLError("There is SSL issue.")
 
-    monkeypatch.setattr("jobs.requests.get", get_raising_ssl_error)
+    monkeypatch.setattr("jobs.requests.Session.get", get_raising_ssl_error)
 
     logger = configure_logger("TestLogger")
     url_fetcher = UrlFetcher(logger)
@@ -220,10 +348,10 @@ def test_url_fetcher_fetch_ssl_issue_www(monkeypatch, mock_db_filepath, logs_dir
 
 
 def test_url_fetcher_fetch_value_error_www(monkeypatch, mock_db_filepath):
-    def get_raising_ssl_error(url, allow_redirects=True, timeout=5):
+    def get_raising_ssl_error(self, url, **kwargs):
         raise ValueError("There is strange value error issue.")
 
-    monkeypatch.setattr("jobs.requests.get", get_raising_ssl_error)
+    monkeypatch.setattr("jobs.requests.Session.get", get_raising_ssl_error)
 
     logger = configure_logger("TestLogger")
     url_fetcher = UrlFetcher(logger)
@@ -236,7 +364,7 @@ def test_url_fetcher_fetch_value_error_www(monkeypatch, mock_db_filepath):
 def test_links_extractor_extract_links(monkeypatch, mock_db_filepath, setup_www_page):
     # monkeypatch.setattr("helpers.DB_FILEPATH", mock_db_filepath)
     # monkeypatch.setattr("jobs.JOB_ROLES", ["Software developer (python)"])
-    # monkeypatch.setattr("jobs.CRAWLED_JOBS_OUTPUT_FILE", "tests/TEST_RESULT_CRAWLED_JOBS_OUTPUT_FILE.csv")
+    # monkeypatch.setattr("storage.CRAWLED_JOBS_OUTPUT_FILE", "tests/TEST_RESULT_CRAWLED_JOBS_OUTPUT_FILE.csv")
 
     logger = configure_logger("TestLogger")
     url_fetcher = UrlFetcher(logger)
@@ -266,6 +394,107 @@ def test_career_links_extractor_extract_links(monkeypatch, mock_db_filepath, set
     assert links == ["http://127.0.0.1:9999/#careers"]
 
 
+def test_career_links_ranker_orders_most_likely_career_page_first():
+    links = [
+        "https://facebook.com/firma-team",
+        "https://firma.pl/blog/2020/05/team-building",
+        "https://www.pracuj.pl/praca/firma;kp",
+        "https://firma.pl/apply",
+        "https://kariera.firma.pl/",
+        "https://firma.pl/apply",
+    ]
+
+    assert CareerLinksRanker().rank("http://www.firma.pl", links) == [
+        "https://kariera.firma.pl/",
+        "https://www.pracuj.pl/praca/firma;kp",
+        "https://firma.pl/apply",
+        "https://firma.pl/blog/2020/05/team-building",
+        "https://facebook.com/firma-team",
+    ]
+
+
+def test_career_links_filter_skips_links_not_worth_a_request(monkeypatch):
+    crawl_metrics = CrawlMetrics()
+    monkeypatch.setattr("metrics._crawl_metrics", crawl_metrics)
+    links = [
+        "https://firma.pl/kariera#oferty",
+        "mailto:kariera@firma.pl",
+        "javascript:void(0)",
+        "tel:+48123456789",
+        "https://firma.pl/kariera?utm_source=facebook&utm_medium=post",
+        "HTTPS://Firma.PL/kariera#top",
+        "https://firma.pl/files/Praca.PDF",
+        "https://firma.pl/praca?id=7&fbclid=abc",
+        "https://firma.pl/praca?id=8",
+    ]
+
+    assert CareerLinksFilter().filter(links) == [
+        "https://firma.pl/kariera#oferty",
+        "https://firma.pl/praca?id=7",
+        "https://firma.pl/praca?id=8",
+    ]
+    assert crawl_metrics.value("finder_links_skipped_total", "scheme") == 3
+    assert crawl_metrics.value("finder_links_skipped_total", "extension") == 1
+    assert crawl_metrics.value("finder_links_skipped_total", "duplicate") == 2
+
+
+def test_career_links_filter_html_content_types():
+    assert CareerLinksFilter.is_html_content_type("text/html; charset=utf-8")
+    assert CareerLinksFilter.is_html_content_type("application/xhtml+xml")
+    assert CareerLinksFilter.is_html_content_type(None)
+    assert not CareerLinksFilter.is_html_content_type("application/pdf")
+    assert not CareerLinksFilter.is_html_content_type("image/png")
+
+
+def test_job_checker_head_check(monkeypatch, setup_www_page):
+    monkeypatch.setattr("jobs.JOB_ROLES", ["Software developer (python)"])
+    jobs_checker = JobsChecker(configure_logger("TestLogger"), head_check=True)
+
+    # Mock server does not support HEAD requests, so content type is unknown and the page is checked.
+    assert jobs_checker.url_fetcher.get_content_type("http://127.0.0.1:9999/") is None
+    assert jobs_checker.may_company_have_the_needed_jobs("http://127.0.0.1:9999/")
+
+    monkeypatch.setattr(jobs_checker.url_fetcher, "get_content_type", lambda url: "application/pdf")
+    monkeypatch.setattr(jobs_checker.url_fetcher, "iter_text", lambda url: pytest.fail("Not html page downloaded."))
+
+    assert not jobs_checker.may_company_have_the_needed_jobs("http://127.0.0.1:9999/")
+
+
+def test_fetch_budget_limits():
+    budget = FetchBudget(max_fetches=2, max_bytes=0, max_seconds=0)
+    budget.spend()
+    assert budget.exhausted() is None
+    budget.spend()
+    assert budget.exhausted() == "fetches"
+
+    downloaded_bytes = [100]
+    budget = FetchBudget(max_fetches=0, max_bytes=50, max_seconds=0, downloaded_bytes=lambda: downloaded_bytes[0])
+    downloaded_bytes[0] += 49
+    assert budget.exhausted() is None
+    downloaded_bytes[0] += 1
+    assert budget.exhausted() == "bytes"
+
+    budget = FetchBudget(max_fetches=0, max_bytes=0, max_seconds=0.01)
+    sleep(0.02)
+    assert budget.exhausted() == "seconds"
+
+
+def test_job_scanner_run_abandons_company_over_budget(monkeypatch, tmp_path, mock_db_filepath, setup_www_page):
+    crawl_metrics = CrawlMetrics()
+    monkeypatch.setattr("metrics._crawl_metrics", crawl_metrics)
+    monkeypatch.setattr("jobs.COMPANY_MAX_FETCHES", 1)
+    monkeypatch.setattr("helpers.DB_FILEPATH", mock_db_filepath)
+    monkeypatch.setattr("jobs.JOB_ROLES", ["Software developer (python)"])
+    monkeypatch.setattr("storage.CRAWLED_JOBS_OUTPUT_FILE", str(tmp_path / "RESULT.csv"))
+
+    assert JobScanner(workers_count=1).run() is None
+
+    assert crawl_metrics.value("finder_company_fetches_total") == 1
+    assert crawl_metrics.value("finder_budget_skipped_fetches_total") == 1
+    assert crawl_metrics.value("finder_companies_over_budget_total", "fetches") == 1
+    assert not (tmp_path / "RESULT.csv").exists()
+
+
 def test_job_checker_may_company_have_the_needed_jobs(monkeypatch, mock_db_filepath, setup_www_page):
     monkeypatch.setattr("jobs.JOB_ROLES", ["Software developer (python)"])
 
@@ -288,3 +517,150 @@ def test_job_checker_may_company_have_the_needed_jobs_not_have(monkeypatch, mock
     does_have_the_needed_job = jobs_checker.may_company_have_the_needed_jobs(url_fixture_link)
 
     assert not does_have_the_needed_job
+
+
+def test_url_fetcher_iter_text(setup_keep_alive_www_page, mock_company_html):
+    logger = configure_logger("TestLogger")
+    url_fetcher = UrlFetcher(logger)
+
+    text_chunks = list(url_fetcher.iter_text(setup_keep_alive_www_page, chunk_size=100))
+
+    assert len(text_chunks) > 1
+    assert "".join(text_chunks) == mock_company_html
+
+
+def test_url_fetcher_iter_text_max_body_size(setup_keep_alive_www_page, mock_company_html):
+    logger = configure_logger("TestLogger")
+    url_fetcher = UrlFetcher(logger)
+
+    website_text = "".join(url_fetcher.iter_text(setup_keep_alive_www_page, chunk_size=128, max_body_size=300))
+
+    assert website_text == mock_company_html.encode()[:300].decode(errors="replace")
+
+
+def test_url_fetcher_iter_text_non_existing_www():
+    logger = configure_logger("TestLogger")
+    url_fetcher = UrlFetcher(logger)
+
+    assert list(url_fetcher.iter_text("http://127.0.0.1:9999/")) == []
+
+
+@pytest.mark.parametrize("chunk_size", [7, 64, 1024 * 1024])
+def test_job_checker_streaming_finds_job_role_split_between_chunks(monkeypatch, setup_www_page, chunk_size):
+    monkeypatch.setattr("jobs.JOB_ROLES", ["Software developer (python)"])
+    monkeypatch.setattr("jobs.STREAMING_CHUNK_SIZE", chunk_size)
+
+    jobs_checker = JobsChecker(configure_logger("TestLogger"), streaming=True)
+
+    assert jobs_checker.may_company_have_the_needed_jobs("http://127.0.0.1:9999/")
+
+
+def test_job_checker_streaming_stops_download_after_job_role_is_found(monkeypatch, setup_www_page):
+    monkeypatch.setattr("jobs.JOB_ROLES", ["Firma XYZ"])
+    monkeypatch.setattr("jobs.STREAMING_CHUNK_SIZE", 64)
+
+    jobs_checker = JobsChecker(configure_logger("TestLogger"), streaming=True)
+    text_chunks = []
+    iter_text = jobs_checker.url_fetcher.iter_text
+
+    def recording_iter_text(url):
+        for text_chunk in iter_text(url):
+            text_chunks.append(text_chunk)
+            yield text_chunk
+
+    monkeypatch.setattr(jobs_checker.url_fetcher, "iter_text", recording_iter_text)
+
+    assert jobs_checker.may_company_have_the_needed_jobs("http://127.0.0.1:9999/")
+    assert "Firma XYZ" in "".join(text_chunks)
+    assert "Wszelkie prawa zastrzeżone" not in "".join(text_chunks)
+
+
+def test_job_checker_streaming_respects_max_body_size(monkeypatch, setup_www_page):
+    monkeypatch.setattr("jobs.JOB_ROLES", ["Software developer (python)"])
+    monkeypatch.setattr("jobs.MAX_BODY_SIZE", 300)
+
+    jobs_checker = JobsChecker(configure_logger("TestLogger"), streaming=True)
+
+    assert not jobs_checker.may_company_have_the_needed_jobs("http://127.0.0.1:9999/")
+
+
+def test_job_checker_not_streaming(monkeypatch, setup_www_page):
+    monkeypatch.setattr("jobs.JOB_ROLES", ["Software developer (python)"])
+    monkeypatch.setattr("jobs.MAX_BODY_SIZE", 300)
+
+    jobs_checker = JobsChecker(configure_logger("TestLogger"), streaming=False)
+
+    assert jobs_checker.may_company_have_the_needed_jobs("http://127.0.0.1:9999/")
+
+
+@pytest.mark.parametrize("backend", ["lxml", "bs4"])
+def test_links_extractor_extract_links_backends(mock_company_html, backend):
+    links_extractor = LinksExtractor(configure_logger("TestLogger"), backend=backend)
+
+    links = links_extractor.extract_links("http://127.0.0.1:9999/", mock_company_html)
+
+    assert links == [
+        "http://127.0.0.1:9999/#about",
+        "http://127.0.0.1:9999/#services",
+        "http://127.0.0.1:9999/#contact",
+        "http://127.0.0.1:9999/#careers",
+        "mailto:contact@xyz.com",
+    ]
+
+
+@pytest.mark.parametrize("backend", ["lxml", "bs4"])
+def test_links_extractor_extract_links_skips_a_tags_without_href(backend):
+    links_extractor = LinksExtractor(configure_logger("TestLogger"), backend=backend)
+    website_html_text = '<html><body><a name="top">top</a><A HREF="/kariera">Kariera</A></body></html>'
+
+    assert links_extractor.extract_links("http://127.0.0.1:9999/", website_html_text) == [
+        "http://127.0.0.1:9999/kariera"
+    ]
+
+
+def test_links_extractor_extract_links_falls_back_to_bs4(monkeypatch):
+    links_extractor = LinksExtractor(configure_logger("TestLogger"), backend="lxml")
+    # lxml refuses str input with encoding declaration.
+    website_html_text = '<?xml version="1.0" encoding="utf-8"?><html><body><a href="/jobs">Jobs</a></body></html>'
+
+    assert links_extractor.extract_links("http://127.0.0.1:9999/", website_html_text) == ["http://127.0.0.1:9999/jobs"]
+
+
+def test_links_extractor_unknown_backend():
+    with pytest.raises(ValueError):
+        LinksExtractor(configure_logger("TestLogger"), backend="regex")
+
+
+@pytest.mark.parametrize("dedup_websites, rows_processed", [(True, 1), (False, 3)])
+def test_job_scanner_run_crawls_shared_website_once(
+    monkeypatch, mock_db_filepath, t_file, setup_www_page, removes_result_test_files, dedup_websites, rows_processed
+):
+    crawl_metrics = CrawlMetrics()
+    monkeypatch.setattr("metrics._crawl_metrics", crawl_metrics)
+    with open(mock_db_filepath, "r") as mock_db_file:
+        company_line = mock_db_file.readline().rstrip("\n")
+
+    with open(t_file, "w") as db_file:
+        for line_number, www in (
+            (1, "http://127.0.0.1:9999/"),
+            (2, "HTTP://127.0.0.1:9999"),
+            (3, "http://127.0.0.1:9999"),
+        ):
+            db_file.write(
+                company_line.replace("1;", f"{line_number};", 1)
+                .replace(";101;", f";10{line_number};")
+                .replace("http://127.0.0.1:9999/", www)
+                + "\n"
+            )
+
+    monkeypatch.setattr("helpers.DB_FILEPATH", t_file)
+    monkeypatch.setattr("jobs.JOB_ROLES", ["Software developer (python)"])
+    monkeypatch.setattr("storage.CRAWLED_JOBS_OUTPUT_FILE", "tests/TEST_RESULT_CRAWLED_JOBS_OUTPUT_FILE.csv")
+
+    assert JobScanner(workers_count=2, dedup_websites=dedup_websites).run() is None
+
+    with open("tests/TEST_RESULT_CRAWLED_JOBS_OUTPUT_FILE.csv", "r") as file_result:
+        result_lines = file_result.read().splitlines()
+        assert sorted(line.split(";")[1] for line in result_lines) == ["101", "102", "103"]
+    assert crawl_metrics.value("finder_rows_processed_total") == rows_processed
+    assert crawl_metrics.value("finder_rows_deduplicated_total") == 3 - rows_processed
@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+import pytest
+
+from jobs import CareerLinksFetcher
+from keyword_matcher import get_keyword_matcher
+from keyword_matcher import KeywordMatcher
+
+
+def test_keyword_matcher_deduplicates_keywords():
+    matcher = KeywordMatcher(CareerLinksFetcher.CAREER_KEYWORDS)
+
+    assert len(matcher.keywords) == len(set(CareerLinksFetcher.CAREER_KEYWORDS))
+    assert matcher.keywords.count("praca") == 1
+    assert matcher.keywords.count("team") == 1
+    assert matcher.keywords.count("vacancy") == 1
+
+
+def test_keyword_matcher_find_all_reports_overlapping_keywords():
+    matcher = KeywordMatcher(["he", "she", "his", "hers", "job", "jobs", "job-openings"])
+
+    assert matcher.find_all("ushers") == {"she", "he", "hers"}
+    assert matcher.find_all("https://xyz.com/jobs/job-openings") == {"job", "jobs", "job-openings"}
+    assert matcher.find_all("no match at all") == set()
+
+
+@pytest.mark.parametrize("text", ["x" * 10, "x" * 10_000])
+def test_keyword_matcher_search_short_and_long_texts(text):
+    matcher = KeywordMatcher(["Software developer (python)"] + [f"keyword-{i}" for i in range(200)])
+
+    assert matcher.search(text) is None
+    assert matcher.search(text + "SOFTWARE DEVELOPER (PYTHON)" + text) == "software developer (python)"
+
+
+def test_keyword_matcher_case_sensitive():
+    matcher = KeywordMatcher(["Careers"], case_sensitive=True)
+
+    assert matcher.search("https://xyz.com/Careers") == "Careers"
+    assert matcher.search("https://xyz.com/careers") is None
+    assert matcher.find_all("https://xyz.com/careers") == set()
+
+
+def test_keyword_matcher_without_keywords():
+    matcher = KeywordMatcher(["", ""])
+
+    assert matcher.keywords == ()
+    assert matcher.search("text") is None
+    assert matcher.find_all("text") == set()
+
+
+def test_get_keyword_matcher_is_compiled_once():
+    assert get_keyword_matcher(("python",)) is get_keyword_matcher(("python",))
+    assert get_keyword_matcher(("python",)) is not get_keyword_matcher(("python",), case_sensitive=True)
@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import logging
+import multiprocessing
+
+from live_events import LiveEvent
+from live_events import LiveEvents
+from live_events import LiveEventsHandler
+
+
+def test_live_events_wait_returns_events_newer_than_the_given_one():
+    live_events = LiveEvents(capacity=10)
+
+    live_events.publish("log", "line 1")
+    live_events.publish("result", {"krs_number": "101"})
+
+    assert live_events.wait(0, timeout=1) == [
+        LiveEvent(1, "log", "line 1"),
+        LiveEvent(2, "result", {"krs_number": "101"}),
+    ]
+    assert live_events.wait(1, timeout=1) == [LiveEvent(2, "result", {"krs_number": "101"})]
+    assert live_events.wait(2, timeout=0.1) == []
+
+
+def test_live_events_buffer_keeps_only_the_latest_events():
+    live_events = LiveEvents(capacity=3)
+
+    for line_number in range(1, 6):
+        live_events.publish("log", f"line {line_number}")
+
+    assert [event.id for event in live_events.wait(0, timeout=1)] == [3, 4, 5]
+    assert [event.id for event in live_events.wait(4, timeout=1)] == [5]
+    # Id from the stream of the previous run.
+    assert [event.id for event in live_events.wait(100, timeout=1)] == [3, 4, 5]
+
+
+def test_live_events_published_by_forked_process():
+    live_events = LiveEvents(capacity=10)
+
+    process = multiprocessing.Process(target=live_events.publish, args=("log", "line from worker"))
+    process.start()
+    process.join()
+
+    assert live_events.wait(0, timeout=5) == [LiveEvent(1, "log", "line from worker")]
+
+
+def test_live_events_handler(monkeypatch):
+    live_events = LiveEvents(capacity=10)
+    monkeypatch.setattr("live_events._live_events", live_events)
+    logger = logging.getLogger("TestLiveEventsLogger")
+    logger.setLevel(logging.INFO)
+    logger.addHandler(LiveEventsHandler())
+
+    logger.info("Found potential job.")
+
+    (event,) = live_events.wait(0, timeout=1)
+    assert event.kind == "log"
+    assert event.data.endswith(" - INFO - Found potential job.")
+
+
+def test_live_events_handler_drops_lines_below_its_level(monkeypatch):
+    live_events = LiveEvents(capacity=10)
+    monkeypatch.setattr("live_events._live_events", live_events)
+    logger = logging.getLogger("TestLiveEventsLevelLogger")
+    logger.setLevel(logging.DEBUG)
+    logger.addHandler(LiveEventsHandler("INFO"))
+
+    logger.debug("Fetching the given url.")
+    logger.info("Found potential job.")
+
+    (event,) = live_events.wait(0, timeout=1)
+    assert event.data.endswith(" - INFO - Found potential job.")
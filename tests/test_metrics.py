@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import multiprocessing
+
+import requests
+
+from helpers import configure_logger
+from jobs import JobScanner
+from jobs import UrlFetcher
+from metrics import CrawlMetrics
+
+
+def test_crawl_metrics_render():
+    crawl_metrics = CrawlMetrics(buckets=(0.1, 1.0))
+
+    crawl_metrics.inc("finder_fetches_total", label="ok")
+    crawl_metrics.inc("finder_fetches_total", label="ok")
+    crawl_metrics.inc("finder_fetches_total", label="timeout")
+    crawl_metrics.set("finder_workers", 4)
+    crawl_metrics.inc("finder_workers_busy")
+    crawl_metrics.inc("finder_workers_busy", -1)
+    for duration in (0.05, 0.5, 0.7, 3.0):
+        crawl_metrics.observe("finder_fetch_duration_seconds", duration)
+
+    assert crawl_metrics.value("finder_fetches_total", "ok") == 2
+    assert crawl_metrics.value("finder_fetch_duration_seconds") == 4
+    rendered_lines = crawl_metrics.render().splitlines()
+    assert "# TYPE finder_fetches_total counter" in rendered_lines
+    assert 'finder_fetches_total{outcome="ok"} 2.0' in rendered_lines
+    assert 'finder_fetches_total{outcome="timeout"} 1.0' in rendered_lines
+    assert 'finder_fetches_total{outcome="non_2xx"} 0.0' in rendered_lines
+    assert "finder_workers 4.0" in rendered_lines
+    assert "finder_workers_busy 0.0" in rendered_lines
+    assert "# TYPE finder_fetch_duration_seconds histogram" in rendered_lines
+    assert 'finder_fetch_duration_seconds_bucket{le="0.1"} 1.0' in rendered_lines
+    assert 'finder_fetch_duration_seconds_bucket{le="1.0"} 3.0' in rendered_lines
+    assert 'finder_fetch_duration_seconds_bucket{le="+Inf"} 4.0' in rendered_lines
+    assert "finder_fetch_duration_seconds_sum 4.25" in rendered_lines
+    assert "finder_fetch_duration_seconds_count 4.0" in rendered_lines
+
+
+def test_crawl_metrics_quantile():
+    crawl_metrics = CrawlMetrics(buckets=(0.1, 1.0))
+
+    assert crawl_metrics.quantile("finder_row_duration_seconds", 0.5) is None
+    for duration in (0.05, 0.05, 0.5, 0.5, 0.5, 0.5, 0.5, 0.5, 0.5, 5.0):
+        crawl_metrics.observe("finder_row_duration_seconds", duration)
+
+    assert crawl_metrics.quantile("finder_row_duration_seconds", 0.2) == 0.1
+    assert crawl_metrics.quantile("finder_row_duration_seconds", 0.55) == 0.55
+    assert crawl_metrics.quantile("finder_row_duration_seconds", 0.99) == 1.0
+
+
+def test_crawl_metrics_updated_by_forked_processes():
+    crawl_metrics = CrawlMetrics()
+
+    processes = [
+        multiprocessing.Process(target=crawl_metrics.inc, args=("finder_rows_processed_total",)) for _ in range(4)
+    ]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+
+    assert crawl_metrics.value("finder_rows_processed_total") == 4
+
+
+def test_url_fetcher_counts_fetches_by_outcome(monkeypatch):
+    crawl_metrics = CrawlMetrics()
+    monkeypatch.setattr("metrics._crawl_metrics", crawl_metrics)
+
+    def get_raising_ssl_error(self, url, **kwargs):
+        raise requests.exceptions.SSLError("There is SSL issue.")
+
+    monkeypatch.setattr("jobs.requests.Session.get", get_raising_ssl_error)
+
+    assert UrlFetcher(configure_logger("TestLogger")).fetch("https://127.0.0.1:9999/") is None
+    assert crawl_metrics.value("finder_fetches_total", "ssl_error") == 2
+    assert crawl_metrics.value("finder_ssl_fallbacks_total") == 1
+    assert crawl_metrics.value("finder_fetch_duration_seconds") == 2
+
+
+def test_job_scanner_run_updates_metrics(monkeypatch, tmp_path, mock_db_filepath, setup_www_page):
+    crawl_metrics = CrawlMetrics()
+    monkeypatch.setattr("metrics._crawl_metrics", crawl_metrics)
+    monkeypatch.setattr("helpers.DB_FILEPATH", mock_db_filepath)
+    monkeypatch.setattr("jobs.JOB_ROLES", ["Software developer (python)"])
+    monkeypatch.setattr("storage.CRAWLED_JOBS_OUTPUT_FILE", str(tmp_path / "RESULT.csv"))
+
+    JobScanner(workers_count=2).run()
+
+    assert crawl_metrics.value("finder_rows_processed_total") == 1
+    assert crawl_metrics.value("finder_jobs_checks_total", "found") == 1
+    assert crawl_metrics.value("finder_fetches_total", "ok") >= 2
+    assert crawl_metrics.value("finder_worker_busy_seconds_total") > 0
+    assert crawl_metrics.value("finder_workers") == 0
+    assert crawl_metrics.value("finder_workers_busy") == 0
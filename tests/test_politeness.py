@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import time
+
+from helpers import configure_logger
+from helpers import CrawlTask
+from jobs import UrlFetcher
+from politeness import host_of
+from politeness import HostScheduler
+from politeness import PolitenessPolicy
+from politeness import RobotsTxtStore
+
+
+def company_row(line_number, www):
+    return CrawlTask(line_number - 1, line_number, f"10{line_number}", www)
+
+
+def test_host_of():
+    assert host_of("https://WWW.Firma.pl/kariera") == "www.firma.pl"
+    assert host_of("www.firma.pl") == "www.firma.pl"
+    assert host_of("http://127.0.0.1:9999/") == "127.0.0.1"
+
+
+def test_robots_txt_store_save_get_and_clear(robots_txt_filepath):
+    robots_txt_store = RobotsTxtStore()
+    robots_txt_store.save("http://xyz.com", 200, "User-agent: *\nDisallow: /private")
+
+    assert robots_txt_store.get("http://xyz.com") == (200, "User-agent: *\nDisallow: /private")
+    assert robots_txt_store.get("http://abc.com") is None
+
+    robots_txt_store.clear()
+
+    assert robots_txt_store.get("http://xyz.com") is None
+
+
+def test_politeness_policy_respects_robots_txt_rules(robots_txt_filepath):
+    robots_txt_store = RobotsTxtStore()
+    robots_txt_store.save("http://xyz.com", 200, "User-agent: *\nDisallow: /private\nCrawl-delay: 3")
+    politeness = PolitenessPolicy(robots_txt_store)
+
+    assert politeness.allows("http://xyz.com/kariera")
+    assert not politeness.allows("http://xyz.com/private/kariera")
+    assert politeness.get_crawl_delay("http://xyz.com/") == 3
+
+
+def test_politeness_policy_robots_txt_status_codes(monkeypatch, robots_txt_filepath):
+    monkeypatch.setattr("politeness.POLITENESS_MAX_CRAWL_DELAY", 10)
+    robots_txt_store = RobotsTxtStore()
+    robots_txt_store.save("http://forbidden.com", 403, "")
+    robots_txt_store.save("http://missing.com", 404, "")
+    robots_txt_store.save("http://slow.com", 200, "User-agent: *\nCrawl-delay: 600")
+    politeness = PolitenessPolicy(robots_txt_store, crawl_delay=0.5)
+
+    assert not politeness.allows("http://forbidden.com/")
+    assert politeness.allows("http://missing.com/")
+    assert politeness.get_crawl_delay("http://missing.com/") == 0.5
+    assert politeness.get_crawl_delay("http://slow.com/") == 10
+
+
+def test_politeness_policy_fetches_robots_txt_once(monkeypatch, robots_txt_filepath, setup_www_page):
+    requested_urls = []
+    politeness = PolitenessPolicy()
+    original_get = politeness.session.get
+
+    def recording_get(url, **kwargs):
+        requested_urls.append(url)
+        return original_get(url, **kwargs)
+
+    monkeypatch.setattr(politeness.session, "get", recording_get)
+
+    assert politeness.allows("http://127.0.0.1:9999/")
+    assert politeness.allows("http://127.0.0.1:9999/#careers")
+    assert PolitenessPolicy().allows("http://127.0.0.1:9999/")
+    assert requested_urls == ["http://127.0.0.1:9999/robots.txt"]
+
+
+def test_politeness_policy_wait_paces_requests_to_the_same_host(monkeypatch, robots_txt_filepath):
+    RobotsTxtStore().save("http://xyz.com", 404, "")
+    RobotsTxtStore().save("http://abc.com", 404, "")
+    sleeps = []
+    monkeypatch.setattr("politeness.time.sleep", sleeps.append)
+    politeness = PolitenessPolicy(crawl_delay=5)
+
+    politeness.wait("http://xyz.com/")
+    politeness.wait("http://abc.com/")
+    politeness.wait("http://xyz.com/kariera")
+
+    assert len(sleeps) == 1
+    assert 4 < sleeps[0] <= 5
+
+
+def test_url_fetcher_does_not_fetch_url_disallowed_by_robots_txt(robots_txt_filepath, setup_www_page):
+    RobotsTxtStore().save("http://127.0.0.1:9999", 200, "User-agent: *\nDisallow: /")
+
+    assert UrlFetcher(configure_logger("TestLogger")).fetch("http://127.0.0.1:9999/") is None
+
+
+def test_host_scheduler_limits_concurrency_per_host():
+    scheduler = HostScheduler(max_concurrency_per_host=1, crawl_delay=0, group_by_ip=False)
+    for line_number, www in enumerate(["http://a.pl/", "a.pl", "http://b.pl/"], start=1):
+        scheduler.add(company_row(line_number, www))
+
+    assert scheduler.next_row().line_number == 1
+    assert scheduler.next_row().line_number == 3
+
+    scheduler.finish(1)
+
+    assert scheduler.next_row().line_number == 2
+    assert len(scheduler) == 0
+    assert scheduler.next_row() is None
+
+
+def test_host_scheduler_waits_for_crawl_delay():
+    scheduler = HostScheduler(max_concurrency_per_host=1, crawl_delay=0, group_by_ip=False)
+    scheduler.add(company_row(1, "http://a.pl/"))
+    scheduler.add(company_row(2, "http://a.pl/"))
+
+    scheduler.next_row()
+    scheduler.finish(1, crawl_delay=0.3)
+    started_at = time.monotonic()
+
+    assert scheduler.next_row().line_number == 2
+    assert time.monotonic() - started_at >= 0.3
+
+
+def test_host_scheduler_next_row_timeout_while_host_is_busy():
+    scheduler = HostScheduler(max_concurrency_per_host=1, crawl_delay=0, group_by_ip=False)
+    scheduler.add(company_row(1, "http://a.pl/"))
+    scheduler.add(company_row(2, "http://a.pl/"))
+    scheduler.next_row()
+
+    assert scheduler.next_row(timeout=0.1) is None
+    assert len(scheduler) == 1
+
+    scheduler.finish(1)
+
+    assert scheduler.next_row(timeout=0.1).line_number == 2
+
+
+def test_host_scheduler_groups_hosts_by_resolved_ip():
+    scheduler = HostScheduler(max_concurrency_per_host=1, crawl_delay=0, group_by_ip=True)
+    scheduler.add(company_row(1, "http://localhost/"))
+    scheduler.add(company_row(2, "http://127.0.0.1/"))
+    scheduler.add(company_row(3, "http://unresolvable.invalid/"))
+
+    first_rows = sorted(scheduler.next_row().line_number for _ in range(2))
+
+    assert first_rows in ([1, 3], [2, 3])
+
+    scheduler.finish(first_rows[0])
+
+    assert scheduler.next_row().line_number == 3 - first_rows[0]
+    scheduler.close()
@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+import multiprocessing
+
+import pytest
+
+from helpers import configure_logger
+from helpers import CrawlTask
+from live_events import LiveEvents
+from results_writer import FinishedRow
+from results_writer import ResultsWriter
+from storage import CsvResultStore
+
+
+@pytest.fixture
+def db_filepath(tmp_path):
+    """Provides DB file with 5 company rows"""
+    db_filepath = tmp_path / "DB.csv"
+    db_filepath.write_text(
+        "".join(
+            f"{line_number};FIRMA {line_number};10{line_number};;;brak_email;www;pl;adres\n"
+            for line_number in range(1, 6)
+        )
+    )
+    return str(db_filepath)
+
+
+def company_row(line_number):
+    return CrawlTask(line_number - 1, line_number, f"10{line_number}", "www")
+
+
+def test_results_writer_writes_all_buffered_lines_on_stop(tmp_path, db_filepath):
+    result_file = tmp_path / "RESULT.csv"
+    results_writer = ResultsWriter(
+        configure_logger("TestLogger"),
+        CsvResultStore(configure_logger("TestLogger"), str(result_file)),
+        batch_size=1000,
+        flush_interval=60,
+        db_filepath=db_filepath,
+    )
+    results_writer.start()
+
+    for line_number in range(1, 6):
+        results_writer.save_found_job(company_row(line_number), f"http://firma{line_number}.pl/kariera")
+    results_writer.stop()
+
+    assert result_file.read_text().splitlines() == [
+        f"FIRMA {line_number};10{line_number};brak_email;www;pl;adres;http://firma{line_number}.pl/kariera"
+        for line_number in range(1, 6)
+    ]
+
+
+def test_results_writer_passes_finished_row_after_its_line_is_written(tmp_path, db_filepath):
+    result_file = tmp_path / "RESULT.csv"
+    done_queue = multiprocessing.Queue()
+    results_writer = ResultsWriter(
+        configure_logger("TestLogger"),
+        CsvResultStore(configure_logger("TestLogger"), str(result_file)),
+        done_queue,
+        flush_interval=0.2,
+        db_filepath=db_filepath,
+    )
+    results_writer.start()
+
+    results_writer.finish_row(FinishedRow(1, None))
+    assert done_queue.get(timeout=5) == FinishedRow(1, None)
+    assert not result_file.exists()
+
+    results_writer.save_found_job(company_row(2), "http://firma2.pl/kariera")
+    results_writer.finish_row(FinishedRow(2, 1.5))
+    assert done_queue.get(timeout=5) == FinishedRow(2, 1.5)
+    assert result_file.read_text().count("\n") == 1
+
+    results_writer.stop()
+
+
+def test_results_writer_flushes_full_batch(tmp_path, db_filepath):
+    result_file = tmp_path / "RESULT.csv"
+    done_queue = multiprocessing.Queue()
+    results_writer = ResultsWriter(
+        configure_logger("TestLogger"),
+        CsvResultStore(configure_logger("TestLogger"), str(result_file)),
+        done_queue,
+        batch_size=2,
+        flush_interval=60,
+        fsync=False,
+        db_filepath=db_filepath,
+    )
+    results_writer.start()
+
+    for line_number in (1, 2):
+        results_writer.save_found_job(company_row(line_number), "http://firma.pl/kariera")
+        results_writer.finish_row(FinishedRow(line_number, None))
+
+    assert done_queue.get(timeout=5) == FinishedRow(1, None)
+    assert result_file.read_text().count("\n") == 2
+
+    results_writer.stop()
+
+
+def test_results_writer_publishes_saved_records(tmp_path, db_filepath):
+    live_events = LiveEvents(capacity=10)
+    results_writer = ResultsWriter(
+        configure_logger("TestLogger"),
+        CsvResultStore(configure_logger("TestLogger"), str(tmp_path / "RESULT.csv")),
+        live_events=live_events,
+        db_filepath=db_filepath,
+    )
+    results_writer.start()
+
+    results_writer.save_found_job(company_row(1), "http://firma1.pl/kariera")
+    results_writer.stop()
+
+    (event,) = live_events.wait(0, timeout=5)
+    assert event.kind == "result"
+    assert event.data["krs_number"] == "101"
+    assert event.data["link"] == "http://firma1.pl/kariera"
+
+
+def test_results_writer_finishes_duplicate_rows_with_verdict_of_crawled_row(tmp_path, db_filepath):
+    result_file = tmp_path / "RESULT.csv"
+    done_queue = multiprocessing.Queue()
+    results_writer = ResultsWriter(
+        configure_logger("TestLogger"),
+        CsvResultStore(configure_logger("TestLogger"), str(result_file)),
+        done_queue,
+        flush_interval=0.2,
+        db_filepath=db_filepath,
+    )
+    results_writer.start()
+
+    # Row 2 waits for verdict of row 1, row 3 gets verdict of already finished row 1.
+    results_writer.share_verdict(company_row(2), "firma.pl")
+    results_writer.save_found_job(company_row(1), "http://firma.pl/kariera")
+    results_writer.finish_row(FinishedRow(1, None, "firma.pl", "http://firma.pl/kariera"))
+    results_writer.share_verdict(company_row(3), "firma.pl")
+    results_writer.finish_row(FinishedRow(4, None, "inna.pl", None))
+    results_writer.share_verdict(company_row(5), "inna.pl")
+    results_writer.stop()
+
+    finished_line_numbers = sorted(done_queue.get(timeout=5).line_number for _ in range(5))
+    assert finished_line_numbers == [1, 2, 3, 4, 5]
+    assert sorted(line.split(";")[1] for line in result_file.read_text().splitlines()) == ["101", "102", "103"]
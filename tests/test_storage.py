@@ -0,0 +1,221 @@
+from __future__ import annotations
+
+import os
+import threading
+from unittest.mock import MagicMock
+
+import pytest
+
+from helpers import CompanyRecord
+from helpers import configure_logger
+from jobs import JobScanner
+from storage import CsvResultStore
+from storage import get_result_store
+from storage import PostgresResultStore
+from storage import ResultRecord
+from storage import SqliteResultStore
+
+
+def result_record(krs_number, voivodeship="małopolskie"):
+    return ResultRecord(
+        f"FIRMA {krs_number}", krs_number, "brak_email", "www", voivodeship, "adres", "http://firma.pl/kariera", 1.0
+    )
+
+
+def test_result_record_from_company_record():
+    company_record = CompanyRecord.from_fields(
+        ["1", "FIRMA", "101", "pkd", "pkd", "brak_email", "www", "małopolskie", "adres"]
+    )
+
+    assert ResultRecord.from_company_record(company_record, "http://firma.pl/kariera", 2.0) == ResultRecord(
+        "FIRMA", "101", "brak_email", "www", "małopolskie", "adres", "http://firma.pl/kariera", 2.0
+    )
+
+
+def test_csv_result_store_save(tmp_path):
+    result_store = CsvResultStore(configure_logger("TestLogger"), str(tmp_path / "RESULT.csv"))
+
+    result_store.save([result_record("101"), result_record("102")])
+
+    assert (tmp_path / "RESULT.csv").read_text() == (
+        "FIRMA 101;101;brak_email;www;małopolskie;adres;http://firma.pl/kariera\n"
+        "FIRMA 102;102;brak_email;www;małopolskie;adres;http://firma.pl/kariera\n"
+    )
+    assert result_store.read_saved_krs_numbers() == {"101", "102"}
+
+
+def test_csv_result_store_prepare_resume(tmp_path):
+    (tmp_path / "RESULT.csv").write_text("FIRMA 101;101;x\nFIRMA 102;1")
+    result_store = CsvResultStore(configure_logger("TestLogger"), str(tmp_path / "RESULT.csv"))
+
+    result_store.prepare_resume()
+    result_store.save([result_record("101"), result_record("102")])
+
+    assert [line.split(";")[1] for line in (tmp_path / "RESULT.csv").read_text().splitlines()] == ["101", "102"]
+
+
+def test_csv_result_store_prepare_resume_truncates_long_partial_line(monkeypatch, tmp_path):
+    monkeypatch.setattr(CsvResultStore, "TAIL_BLOCK_SIZE", 4)
+    (tmp_path / "RESULT.csv").write_text("FIRMA 101;101;x\nFIRMA 102;102;partially written line")
+    result_store = CsvResultStore(configure_logger("TestLogger"), str(tmp_path / "RESULT.csv"))
+
+    result_store.prepare_resume()
+
+    assert (tmp_path / "RESULT.csv").read_text() == "FIRMA 101;101;x\n"
+
+
+@pytest.mark.parametrize("store_class", [CsvResultStore, SqliteResultStore])
+def test_result_store_prepare_resume_skips_only_records_of_unfinished_run(tmp_path, store_class):
+    result_store = store_class(configure_logger("TestLogger"), str(tmp_path / "RESULT"))
+    result_store.save([result_record("101")])  # Saved by the previous (finished) run.
+    run_start_position = result_store.end_position()
+    result_store.save([result_record("102")])  # Saved by the unfinished run.
+
+    result_store.prepare_resume(run_start_position)
+
+    assert result_store.save([result_record("101"), result_record("102")]) == [result_record("101")]
+    assert result_store.read_saved_krs_numbers(run_start_position) == {"101", "102"}
+    assert result_store.query().total == 3
+
+
+def test_sqlite_result_store_save(tmp_path):
+    result_store = SqliteResultStore(configure_logger("TestLogger"), str(tmp_path / "RESULTS.sqlite3"))
+
+    result_store.save([result_record("101"), result_record("102", "mazowieckie")], fsync=True)
+
+    assert result_store.read_saved_krs_numbers() == {"101", "102"}
+    assert result_store.connection.execute("PRAGMA journal_mode").fetchone() == ("wal",)
+    assert result_store.connection.execute(
+        "SELECT krs_number FROM results WHERE voivodeship = ?", ("mazowieckie",)
+    ).fetchall() == [("102",)]
+
+
+def test_sqlite_result_store_query_from_many_threads(tmp_path):
+    result_store = SqliteResultStore(configure_logger("TestLogger"), str(tmp_path / "RESULTS.sqlite3"))
+    result_store.save([result_record("101"), result_record("102")])
+    totals = []
+
+    # Monitoring API serves requests on many threads with one (cached) store.
+    threads = [threading.Thread(target=lambda: totals.append(result_store.query().total)) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+        thread.join()
+
+    assert totals == [2, 2]
+    assert result_store.query().total == 2
+
+
+def test_sqlite_result_store_indexes(tmp_path):
+    result_store = SqliteResultStore(configure_logger("TestLogger"), str(tmp_path / "RESULTS.sqlite3"))
+
+    query_plan = result_store.connection.execute(
+        "EXPLAIN QUERY PLAN SELECT * FROM results WHERE krs_number = ?", ("101",)
+    ).fetchall()
+
+    assert "results_krs_number" in str(query_plan)
+
+
+def test_sqlite_result_store_prepare_resume(tmp_path):
+    SqliteResultStore(configure_logger("TestLogger"), str(tmp_path / "RESULTS.sqlite3")).save([result_record("101")])
+    result_store = SqliteResultStore(configure_logger("TestLogger"), str(tmp_path / "RESULTS.sqlite3"))
+
+    result_store.prepare_resume()
+    result_store.save([result_record("101"), result_record("102")])
+
+    assert result_store.connection.execute("SELECT count(*) FROM results").fetchone() == (2,)
+
+
+@pytest.mark.parametrize("store_class", [CsvResultStore, SqliteResultStore])
+def test_result_store_query(tmp_path, store_class):
+    result_store = store_class(configure_logger("TestLogger"), str(tmp_path / "RESULT"))
+    result_store.save([result_record("101"), result_record("102", "mazowieckie"), result_record("103")])
+    version = result_store.version()
+    result_store.save([result_record("104", "mazowieckie")])
+
+    assert result_store.version() != version
+    assert [record_id for record_id, record in result_store.query().records] == [1, 2, 3, 4]
+    assert result_store.query().records[0][1][:7] == result_record("101")[:7]
+
+    results_page = result_store.query(offset=1, limit=2)
+    assert [record.krs_number for record_id, record in results_page.records] == ["102", "103"]
+    assert results_page.total == 4
+
+    results_page = result_store.query(after=2, voivodeship="małopolskie")
+    assert [record.krs_number for record_id, record in results_page.records] == ["103"]
+    assert results_page.total == 2
+
+    results_page = result_store.query(voivodeship="mazowieckie", krs_number="104")
+    assert [record_id for record_id, record in results_page.records] == [4]
+    assert result_store.query(krs_number="105") == ([], 0)
+
+
+def test_csv_result_store_query_skips_partial_line(tmp_path):
+    (tmp_path / "RESULT.csv").write_text(
+        "FIRMA; S.A.;101;brak_email;www;małopolskie;adres;http://firma.pl/kariera\nFIRMA 102;102;brak"
+    )
+    result_store = CsvResultStore(configure_logger("TestLogger"), str(tmp_path / "RESULT.csv"))
+
+    assert result_store.query().records == [
+        (
+            1,
+            ResultRecord(
+                "FIRMA; S.A.", "101", "brak_email", "www", "małopolskie", "adres", "http://firma.pl/kariera", None
+            ),
+        )
+    ]
+    with open(tmp_path / "RESULT.csv", "a") as jobs_file:
+        jobs_file.write(";www;małopolskie;adres;http://firma.pl/kariera\n")
+    assert [record.krs_number for record_id, record in result_store.query().records] == ["101", "102"]
+
+
+def test_get_result_store(monkeypatch):
+    monkeypatch.setattr("storage.RESULT_STORE_BACKEND", "sqlite")
+
+    assert isinstance(get_result_store(configure_logger("TestLogger")), SqliteResultStore)
+    assert isinstance(get_result_store(configure_logger("TestLogger"), "csv"), CsvResultStore)
+
+    with pytest.raises(ValueError):
+        get_result_store(configure_logger("TestLogger"), "unknown")
+
+
+def test_postgres_result_store_requires_psycopg2(monkeypatch):
+    monkeypatch.setattr("storage.psycopg2", None)
+
+    with pytest.raises(ImportError):
+        PostgresResultStore(configure_logger("TestLogger"))
+
+
+def test_postgres_result_store_connection_per_thread(monkeypatch):
+    monkeypatch.setattr("storage.psycopg2.connect", lambda dsn: MagicMock())
+    result_store = PostgresResultStore(configure_logger("TestLogger"), "postgresql://test")
+    connections = []
+
+    # Monitoring API serves requests on many threads with one (cached) store.
+    threads = [threading.Thread(target=lambda: connections.append(result_store.connection)) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+        thread.join()
+
+    assert result_store.connection is result_store.connection
+    assert len({id(connection) for connection in [*connections, result_store.connection]}) == 3
+
+
+@pytest.mark.skipif(not os.getenv("FINDER_TEST_POSTGRESQL_DSN"), reason="FINDER_TEST_POSTGRESQL_DSN is not set")
+def test_postgres_result_store_save():
+    result_store = PostgresResultStore(configure_logger("TestLogger"), os.getenv("FINDER_TEST_POSTGRESQL_DSN"))
+
+    result_store.save([result_record("postgres-test-101")])
+
+    assert "postgres-test-101" in result_store.read_saved_krs_numbers()
+
+
+def test_job_scanner_run_with_sqlite_result_store(monkeypatch, tmp_path, mock_db_filepath, setup_www_page):
+    monkeypatch.setattr("helpers.DB_FILEPATH", mock_db_filepath)
+    monkeypatch.setattr("jobs.JOB_ROLES", ["Software developer (python)"])
+    result_store = SqliteResultStore(configure_logger("TestLogger"), str(tmp_path / "RESULTS.sqlite3"))
+
+    assert JobScanner(workers_count=1, result_store=result_store).run() is None
+
+    assert result_store.connection.execute("SELECT krs_number, link FROM results").fetchall() == [
+        ("101", "http://127.0.0.1:9999/#careers")
+    ]
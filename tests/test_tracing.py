@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import json
+
+from jobs import JobScanner
+from tracing import summarize_trace
+from tracing import Tracer
+
+
+def read_spans(trace_filepath):
+    with open(trace_filepath, "r") as trace_file:
+        return [json.loads(line) for line in trace_file]
+
+
+def test_tracer_records_nested_spans_of_traced_row(tmp_path):
+    trace_filepath = str(tmp_path / "TRACE.jsonl")
+    tracer = Tracer(trace_filepath, enabled=True)
+
+    with tracer.span("request"):
+        pass  # Outside of traced row.
+    with tracer.trace_row(7, "https://www.Firma.pl/o-nas"):
+        with tracer.span("career_links") as span_attributes:
+            with tracer.span("request", url="https://www.firma.pl/"):
+                pass
+            span_attributes["career_links"] = 2
+
+    spans = read_spans(trace_filepath)
+    assert [(span["stage"], span["depth"]) for span in spans] == [("request", 2), ("career_links", 1), ("company", 0)]
+    assert all(span["row"] == 7 and span["host"] == "www.firma.pl" for span in spans)
+    assert spans[0]["url"] == "https://www.firma.pl/"
+    assert spans[1]["career_links"] == 2
+    assert spans[2]["duration"] >= spans[1]["duration"] >= spans[0]["duration"]
+
+
+def test_tracer_disabled(tmp_path):
+    tracer = Tracer(str(tmp_path / "TRACE.jsonl"), enabled=False)
+
+    with tracer.trace_row(7, "https://www.firma.pl/"):
+        with tracer.span("career_links"):
+            pass
+
+    assert not (tmp_path / "TRACE.jsonl").exists()
+
+
+def test_summarize_trace(tmp_path):
+    trace_filepath = tmp_path / "TRACE.jsonl"
+    spans = [
+        {"row": 1, "host": "wolna.pl", "stage": "company", "depth": 0, "duration": 3.0},
+        {"row": 1, "host": "wolna.pl", "stage": "request", "depth": 1, "duration": 2.5, "time_to_headers": 2.0},
+        {"row": 2, "host": "szybka.pl", "stage": "company", "depth": 0, "duration": 1.0},
+        {"row": 2, "host": "szybka.pl", "stage": "request", "depth": 1, "duration": 0.5, "time_to_headers": 0.25},
+    ]
+    trace_filepath.write_text("".join(json.dumps(span) + "\n" for span in spans))
+
+    report_lines = summarize_trace(str(trace_filepath)).splitlines()
+
+    assert report_lines[1].split() == ["company", "2", "4.00", "100.0%", "2000.0", "1000.0", "3000.0", "3000.0"]
+    assert report_lines[2].split() == ["request", "2", "3.00", "75.0%", "1500.0", "500.0", "2500.0", "2500.0"]
+    assert report_lines[3].split() == [
+        "request:time_to_headers",
+        "2",
+        "2.25",
+        "56.2%",
+        "1125.0",
+        "250.0",
+        "2000.0",
+        "2000.0",
+    ]
+    assert report_lines[-2].split() == ["wolna.pl", "1", "3.00", "3000.0"]
+    assert report_lines[-1].split() == ["szybka.pl", "1", "1.00", "1000.0"]
+
+
+def test_job_scanner_run_with_tracing(monkeypatch, tmp_path, trace_filepath, mock_db_filepath, setup_www_page):
+    monkeypatch.setattr("tracing.TRACING_ENABLED", True)
+    monkeypatch.setattr("helpers.DB_FILEPATH", mock_db_filepath)
+    monkeypatch.setattr("jobs.JOB_ROLES", ["Software developer (python)"])
+    monkeypatch.setattr("storage.CRAWLED_JOBS_OUTPUT_FILE", str(tmp_path / "RESULT.csv"))
+
+    JobScanner(engine="sync").run()
+
+    stages = {span["stage"] for span in read_spans(trace_filepath)}
+    assert stages == {
+        "company",
+        "career_links",
+        "request",
+        "extract_links",
+        "filter_career_links",
+        "jobs_check",
+        "jobs_scan",
+    }
+
+
+def test_job_scanner_run_of_next_shards_keeps_trace(
+    monkeypatch, tmp_path, trace_filepath, mock_db_filepath, setup_www_page
+):
+    monkeypatch.setattr("tracing.TRACING_ENABLED", True)
+    monkeypatch.setattr("helpers.DB_FILEPATH", mock_db_filepath)
+    monkeypatch.setattr("jobs.JOB_ROLES", ["Software developer (python)"])
+    monkeypatch.setattr("storage.CRAWLED_JOBS_OUTPUT_FILE", str(tmp_path / "RESULT.csv"))
+    job_scanner = JobScanner(engine="sync")
+
+    job_scanner.run(resume=False, rows=range(0, 1), new_run=False)
+    job_scanner.run(resume=False, rows=range(0, 1), new_run=False)
+
+    assert [span["stage"] for span in read_spans(trace_filepath)].count("company") == 2
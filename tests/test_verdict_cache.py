@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import multiprocessing
+
+import requests
+
+from helpers import configure_logger
+from http_session import get_session
+from jobs import JobsChecker
+from jobs import UrlFetcher
+from verdict_cache import JobsVerdictCache
+from verdict_cache import verdict_key
+
+
+def test_verdict_key():
+    assert verdict_key("https://WWW.Praca.pl/oferty/?firma=1#top") == "praca.pl/oferty?firma=1"
+    assert verdict_key("http://praca.pl/oferty") == verdict_key("https://www.praca.pl/oferty/")
+    assert verdict_key("https://praca.pl/oferty?firma=1") != verdict_key("https://praca.pl/oferty?firma=2")
+
+
+def test_verdict_cache_save_get_and_clear():
+    verdict_cache = JobsVerdictCache()
+    verdict_cache.save("https://praca.pl/oferty", True)
+    verdict_cache.save("https://praca.pl/archiwum", False)
+
+    assert verdict_cache.get("https://www.praca.pl/oferty/") is True
+    assert verdict_cache.get("https://praca.pl/archiwum") is False
+    assert verdict_cache.get("https://praca.pl/") is None
+
+    verdict_cache.clear()
+
+    assert verdict_cache.get("https://praca.pl/oferty") is None
+    assert len(verdict_cache) == 0
+
+
+def test_verdict_cache_evicts_least_recently_used_verdicts():
+    verdict_cache = JobsVerdictCache(max_entries=2)
+    verdict_cache.save("https://praca.pl/1", True)
+    verdict_cache.save("https://praca.pl/2", True)
+    verdict_cache.get("https://praca.pl/1")
+
+    verdict_cache.save("https://praca.pl/3", False)
+
+    assert len(verdict_cache) == 2
+    assert verdict_cache.get("https://praca.pl/1") is True
+    assert verdict_cache.get("https://praca.pl/2") is None
+    assert verdict_cache.get("https://praca.pl/3") is False
+
+
+def test_verdict_cache_is_shared_by_processes():
+    verdict_cache = JobsVerdictCache()
+    verdict_cache.get("https://praca.pl/oferty")  # Connection of the parent is not reused by the child process.
+
+    process = multiprocessing.Process(target=verdict_cache.save, args=("https://praca.pl/oferty", True))
+    process.start()
+    process.join()
+
+    assert verdict_cache.get("https://praca.pl/oferty") is True
+
+
+def test_job_checker_checks_external_link_once(monkeypatch, setup_www_page):
+    monkeypatch.setattr("jobs.JOB_ROLES", ["Software developer (python)"])
+    fetched_urls = []
+    fetch = UrlFetcher.fetch
+    monkeypatch.setattr(UrlFetcher, "fetch", lambda self, url: fetched_urls.append(url) or fetch(self, url))
+    logger = configure_logger("TestLogger")
+    verdict_cache = JobsVerdictCache()
+    job_board_link = "http://127.0.0.1:9999/oferty"
+
+    for www in ("https://firma1.pl", "https://firma2.pl"):
+        jobs_checker = JobsChecker(logger, streaming=False, verdict_cache=verdict_cache)
+        assert jobs_checker.may_company_have_the_needed_jobs(job_board_link, www)
+
+    assert fetched_urls == [job_board_link]
+
+    # Links of company website are checked as usual.
+    jobs_checker = JobsChecker(logger, streaming=False, verdict_cache=verdict_cache)
+    assert jobs_checker.may_company_have_the_needed_jobs(job_board_link, "http://127.0.0.1:9999/")
+    assert fetched_urls == [job_board_link, job_board_link]
+
+
+def test_job_checker_does_not_share_verdict_of_failed_fetch(monkeypatch, setup_www_page):
+    monkeypatch.setattr("jobs.JOB_ROLES", ["Software developer (python)"])
+    job_board_link = "http://127.0.0.1:9999/oferty"
+    fetched_urls = []
+    session = get_session()
+    original_get = session.get
+
+    def timing_out_get(url, **kwargs):
+        if url == job_board_link:
+            fetched_urls.append(url)
+            if len(fetched_urls) == 1:
+                raise requests.exceptions.ReadTimeout("Read timed out.")
+        return original_get(url, **kwargs)
+
+    monkeypatch.setattr(session, "get", timing_out_get)
+    logger = configure_logger("TestLogger")
+    verdict_cache = JobsVerdictCache()
+
+    for streaming in (True, False):
+        verdict_cache.clear()
+        fetched_urls.clear()
+
+        jobs_checker = JobsChecker(logger, streaming=streaming, verdict_cache=verdict_cache)
+        assert not jobs_checker.may_company_have_the_needed_jobs(job_board_link, "https://firma1.pl")
+        assert verdict_cache.get(job_board_link) is None
+
+        jobs_checker = JobsChecker(logger, streaming=streaming, verdict_cache=verdict_cache)
+        assert jobs_checker.may_company_have_the_needed_jobs(job_board_link, "https://firma2.pl")
+        assert fetched_urls == [job_board_link, job_board_link]
+        assert verdict_cache.get(job_board_link) is True
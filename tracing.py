@@ -0,0 +1,204 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Any
+from typing import Iterator
+from typing import Optional
+
+from configuration.config import TRACE_FILEPATH
+from configuration.config import TRACING_ENABLED
+from politeness import host_of
+
+
+class Tracer:
+    """Opt-in recorder of per-stage timings of company rows processing.
+
+    Spans (stages) are recorded only inside a traced row, nested spans get greater depth.
+    Spans of a row are buffered and appended to the trace file (JSON lines) with one write
+    when the row is finished, so lines of rows traced by different workers never interleave.
+    With tracing disabled every span is a no-op.
+
+    Recorded stages: "company" (whole row), "career_links", "request" (http request, with time
+    to response headers, which includes DNS lookup and connecting), "extract_links",
+    "filter_career_links", "jobs_check" and "jobs_scan" (searching for job roles in page content).
+
+    Usage:
+        tracer = get_tracer()
+        with tracer.trace_row(line_number, www):
+            with tracer.span("career_links") as attributes:
+                attributes["links"] = len(links)
+
+    Args:
+        filepath: trace filepath (TRACE_FILEPATH by default)
+        enabled: whether spans are recorded (TRACING_ENABLED by default)
+
+    Attributes:
+        filepath (str): trace filepath
+        enabled (bool): whether spans are recorded
+    """
+
+    def __init__(self, filepath: Optional[str] = None, enabled: Optional[bool] = None) -> None:
+        self.filepath = filepath or TRACE_FILEPATH
+        self.enabled = TRACING_ENABLED if enabled is None else enabled
+        self.__row: Optional[dict[str, Any]] = None
+        self.__depth = 0
+        self.__spans: list[dict[str, Any]] = []
+
+    @contextmanager
+    def trace_row(self, line_number: int, www: str) -> Iterator[None]:
+        """Traces processing of company row as the "company" span.
+
+        Args:
+            line_number: row line number
+            www: company website
+
+        Yields:
+            None
+        """
+        if not self.enabled:
+            yield
+            return
+
+        self.__row = {"row": line_number, "host": host_of(www)}
+        try:
+            with self.span("company"):
+                yield
+        finally:
+            self.__flush()
+            self.__row = None
+
+    @contextmanager
+    def span(self, stage: str, **attributes: Any) -> Iterator[dict[str, Any]]:
+        """Records duration of the stage (ignored outside of traced row).
+
+        Args:
+            stage: stage name
+            attributes: additional span attributes
+
+        Yields:
+            Span attributes, which may be updated until the stage ends.
+        """
+        if self.__row is None:
+            yield attributes
+            return
+
+        started_at = time.time()
+        started = time.perf_counter()
+        depth = self.__depth
+        self.__depth += 1
+        try:
+            yield attributes
+        finally:
+            self.__depth = depth
+            self.__spans.append(
+                {
+                    **self.__row,
+                    "stage": stage,
+                    "depth": depth,
+                    "start": round(started_at, 6),
+                    "duration": round(time.perf_counter() - started, 6),
+                    **attributes,
+                }
+            )
+
+    def clear(self) -> None:
+        """Removes trace file (spans of previous run)."""
+        if os.path.exists(self.filepath):
+            os.remove(self.filepath)
+
+    def __flush(self) -> None:
+        lines = "".join(json.dumps(span, ensure_ascii=False) + "\n" for span in self.__spans)
+        self.__spans = []
+        # Single append write per row, so rows written by concurrent workers stay whole.
+        trace_fd = os.open(self.filepath, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(trace_fd, lines.encode())
+        finally:
+            os.close(trace_fd)
+
+
+_tracers: dict[int, Tracer] = {}
+
+
+def get_tracer() -> Tracer:
+    """Returns tracer of the current process.
+
+    Returns:
+        Tracer object.
+    """
+    pid = os.getpid()
+    if pid not in _tracers:
+        _tracers.clear()
+        _tracers[pid] = Tracer()
+    return _tracers[pid]
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    """Returns nearest-rank percentile of sorted values.
+
+    Args:
+        values: sorted values
+        fraction: percentile as a fraction (e.g. 0.95)
+
+    Returns:
+        Percentile value.
+    """
+    return values[max(0, min(len(values) - 1, round(fraction * len(values)) - 1))]
+
+
+def summarize_trace(filepath: Optional[str] = None, hosts_count: int = 10) -> str:
+    """Summarizes where time was spent during traced run.
+
+    Args:
+        filepath: trace filepath (TRACE_FILEPATH by default)
+        hosts_count: number of the slowest hosts listed
+
+    Returns:
+        Text report with stage timings and the slowest hosts.
+    """
+    durations: defaultdict[str, list[float]] = defaultdict(list)
+    hosts_durations: defaultdict[str, list[float]] = defaultdict(list)
+    with open(filepath or TRACE_FILEPATH, "r") as trace_file:
+        for line in trace_file:
+            span = json.loads(line)
+            durations[span["stage"]].append(span["duration"])
+            if span["stage"] == "company":
+                hosts_durations[span["host"]].append(span["duration"])
+            if span.get("time_to_headers") is not None:
+                durations["request:time_to_headers"].append(span["time_to_headers"])
+
+    companies_time = sum(durations["company"]) or 1.0
+    report_lines = [
+        f"{'Stage':<24}{'Spans':>8}{'Total [s]':>12}{'Share':>8}{'Mean [ms]':>12}"
+        f"{'p50 [ms]':>12}{'p95 [ms]':>12}{'Max [ms]':>12}"
+    ]
+    for stage, stage_durations in sorted(durations.items(), key=lambda item: sum(item[1]), reverse=True):
+        stage_durations.sort()
+        total = sum(stage_durations)
+        report_lines.append(
+            f"{stage:<24}{len(stage_durations):>8}{total:>12.2f}{total / companies_time:>8.1%}"
+            f"{1000 * total / len(stage_durations):>12.1f}{1000 * percentile(stage_durations, 0.5):>12.1f}"
+            f"{1000 * percentile(stage_durations, 0.95):>12.1f}{1000 * stage_durations[-1]:>12.1f}"
+        )
+
+    report_lines.extend(["", f"{'Slowest hosts':<40}{'Rows':>8}{'Total [s]':>12}{'Mean [ms]':>12}"])
+    slowest_hosts = sorted(hosts_durations.items(), key=lambda item: sum(item[1]), reverse=True)[:hosts_count]
+    for host, host_durations in slowest_hosts:
+        total = sum(host_durations)
+        report_lines.append(
+            f"{host:<40}{len(host_durations):>8}{total:>12.2f}{1000 * total / len(host_durations):>12.1f}"
+        )
+    return "\n".join(report_lines)
+
+
+if __name__ == "__main__":
+    arguments_parser = argparse.ArgumentParser(description="Summarizes trace file recorded with TRACING_ENABLED.")
+    arguments_parser.add_argument("trace_filepath", nargs="?", default=TRACE_FILEPATH, help="trace filepath")
+    arguments_parser.add_argument("--hosts", type=int, default=10, help="number of the slowest hosts listed")
+    arguments = arguments_parser.parse_args()
+    print(summarize_trace(arguments.trace_filepath, arguments.hosts))
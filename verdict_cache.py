@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import os
+import sqlite3
+import threading
+import time
+from typing import cast
+from typing import Optional
+from urllib.parse import urlsplit
+
+from configuration.config import VERDICT_CACHE_FILEPATH
+from configuration.config import VERDICT_CACHE_MAX_ENTRIES
+
+
+def verdict_key(url: str) -> str:
+    """Normalizes url, so that addresses differing only in scheme, "www." prefix, host letter case,
+    trailing slash or fragment share the verdict.
+
+    Args:
+        url: checked link
+
+    Returns:
+        Verdict key, e.g. "praca.pl/oferty?firma=1" for "https://WWW.Praca.pl/oferty/?firma=1#top".
+    """
+    split_url = urlsplit(url.strip())
+    host = (split_url.netloc or "").lower().removeprefix("www.")
+    key = host + split_url.path.rstrip("/")
+    return f"{key}?{split_url.query}" if split_url.query else key
+
+
+class JobsVerdictCache:
+    """SQLite store of jobs check verdicts of external pages (e.g. job boards) checked during the current run,
+    shared by all worker processes, so the page linked by many companies is fetched and checked once.
+
+    The store keeps VERDICT_CACHE_MAX_ENTRIES most recently used verdicts. Two workers checking the same page
+    at once may both fetch it, the later verdict wins.
+
+    Usage:
+        verdict_cache = JobsVerdictCache()
+        has_needed_jobs = verdict_cache.get(url)
+        if has_needed_jobs is None:
+            ...
+            verdict_cache.save(url, has_needed_jobs)
+
+    Args:
+        filepath: SQLite database filepath (VERDICT_CACHE_FILEPATH by default)
+        max_entries: max number of kept verdicts (VERDICT_CACHE_MAX_ENTRIES by default)
+
+    Attributes:
+        filepath (str): SQLite database filepath
+        max_entries (int): max number of kept verdicts, the least recently used ones are evicted above it
+    """
+
+    def __init__(self, filepath: Optional[str] = None, max_entries: Optional[int] = None) -> None:
+        self.filepath = filepath or VERDICT_CACHE_FILEPATH
+        self.max_entries = max_entries or VERDICT_CACHE_MAX_ENTRIES
+        # Connection of a finished thread is closed with its thread-local data.
+        self.__local = threading.local()
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        """Connection of the current process and thread (async engine uses the cache from executor threads)."""
+        pid = os.getpid()
+        # Thread-local data of the forking thread is inherited, so the pid tells whether it belongs to this process.
+        if getattr(self.__local, "pid", None) != pid:
+            connection = sqlite3.connect(self.filepath, timeout=30)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            with connection:
+                connection.execute(
+                    "CREATE TABLE IF NOT EXISTS verdicts ("
+                    " key TEXT PRIMARY KEY, has_needed_jobs INTEGER NOT NULL, used_at REAL NOT NULL)"
+                )
+                connection.execute("CREATE INDEX IF NOT EXISTS verdicts_used_at ON verdicts (used_at)")
+            self.__local.pid, self.__local.connection = pid, connection
+        return cast(sqlite3.Connection, self.__local.connection)
+
+    def get(self, url: str) -> Optional[bool]:
+        """Returns jobs check verdict of the given page, marking it as recently used.
+
+        Args:
+            url: checked link
+
+        Returns:
+            Verdict or None if the page was not checked yet (or its verdict was evicted).
+        """
+        key = verdict_key(url)
+        with self.connection:
+            row = self.connection.execute("SELECT has_needed_jobs FROM verdicts WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            self.connection.execute("UPDATE verdicts SET used_at = ? WHERE key = ?", (time.time(), key))
+        return bool(row[0])
+
+    def save(self, url: str, has_needed_jobs: bool) -> None:
+        """Saves jobs check verdict of the given page, evicting the least recently used verdicts above the limit.
+
+        Args:
+            url: checked link
+            has_needed_jobs: jobs check verdict
+
+        Returns:
+            None
+        """
+        with self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO verdicts (key, has_needed_jobs, used_at) VALUES (?, ?, ?)",
+                (verdict_key(url), int(has_needed_jobs), time.time()),
+            )
+            (entries_count,) = self.connection.execute("SELECT COUNT(*) FROM verdicts").fetchone()
+            if entries_count > self.max_entries:
+                self.connection.execute(
+                    "DELETE FROM verdicts WHERE key IN (SELECT key FROM verdicts ORDER BY used_at LIMIT ?)",
+                    (entries_count - self.max_entries,),
+                )
+
+    def clear(self) -> None:
+        """Removes all verdicts (every run checks pages again)."""
+        with self.connection:
+            self.connection.execute("DELETE FROM verdicts")
+
+    def __len__(self) -> int:
+        (entries_count,) = self.connection.execute("SELECT COUNT(*) FROM verdicts").fetchone()
+        return int(entries_count)